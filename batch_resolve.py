@@ -0,0 +1,159 @@
+"""Resolves shopping lists in bulk: JSONL in, JSONL out.
+
+Each input line is a shopping list, either {"id": ..., "items": {"Iron Ingot": 10, ...}} or just
+{"Iron Ingot": 10, ...}. Each output line, in input order, holds what POST /materials/batch returns
+for it (materials per item, totals, crafting plan, per-item errors) plus the list's id (its line number
+if it has none). Lines are read and written as a stream, so memory stays flat however long the input is:
+
+    python batch_resolve.py lists.jsonl --output resolved.jsonl --workers 4
+    cat lists.jsonl | python batch_resolve.py > resolved.jsonl
+
+With --workers, chunks of lines are spread over processes that each compile the recipe graph once.
+With --store, they read the recipes from the memory-mapped binary store (one shared page-cached copy)
+instead of each parsing recipes.json.
+"""
+import argparse
+import collections
+import itertools
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import binary_store
+import calculator
+
+_resolver = None # Per-process BatchResolver, set up by _init_worker
+
+class BatchResolver:
+    """The recipe data compiled once: acyclic graph and per-unit costs of every recipe."""
+
+    def __init__(self, recipes_file="recipes.json", raw_materials_file="raw_materials.json", store_file=None):
+        if store_file:
+            with binary_store.BinaryRecipeStore(store_file) as store:
+                recipes, self.raw_materials = store.costing_recipes(), store.raw_materials()
+        else:
+            recipes, self.raw_materials = calculator.load_recipe_data(recipes_file, raw_materials_file)
+        self.graph = calculator.compile_recipe_graph(recipes, self.raw_materials)
+        if self.graph["cycles"]:
+            recipes = calculator.without_cycles(recipes, self.graph)
+            self.graph = calculator.compile_recipe_graph(recipes, self.raw_materials)
+        self.recipes = recipes
+        self.unit_costs = calculator.compute_unit_costs(recipes, self.raw_materials, self.graph)
+
+    def resolve(self, shopping_list):
+        """Materials per item (rounded per item, like the page), totals, crafting plan and per-item errors."""
+        quantities = {}
+        errors = {}
+        for item_name, value in shopping_list.items():
+            if item_name not in self.recipes and item_name not in self.raw_materials:
+                errors[item_name] = "Unknown item"
+            elif isinstance(value, bool) or not isinstance(value, (int, float)) or (isinstance(value, float) and not (math.isfinite(value) and value.is_integer())) or value < 1:
+                errors[item_name] = f"Quantity must be a whole number of at least 1, got {value!r}"
+            else:
+                quantities[item_name] = int(value)
+
+        per_item = {}
+        totals = collections.Counter()
+        for item_name, quantity in list(quantities.items()):
+            try:
+                per_item[item_name] = calculator.scale_unit_cost(self.unit_costs.get(item_name, {item_name: 1.0}), quantity)
+            except OverflowError:
+                # A whole number too large to price (e.g. 1e308) only fails its own item
+                errors[item_name] = "Quantity is too large"
+                del quantities[item_name]
+                continue
+            totals.update(per_item[item_name])
+        return {
+            "items": per_item,
+            "totals": dict(sorted(totals.items())),
+            "plan": calculator.plan_crafting(quantities, self.recipes, self.raw_materials, self.graph),
+            "errors": errors,
+        }
+
+    def resolve_line(self, line_number, line):
+        """One input line to one output line (JSON text, no newline). Malformed lines become {"id", "error"}, with the list's own id when it has one."""
+        payload = None
+        try:
+            payload = json.loads(line)
+            if not isinstance(payload, dict):
+                raise ValueError("expected a JSON object")
+            list_id = payload.get("id", line_number)
+            items = payload["items"] if "items" in payload else {name: qty for name, qty in payload.items() if name != "id"}
+            if not isinstance(items, dict):
+                raise ValueError("'items' must be an object of item names to quantities")
+            result = dict(id=list_id, **self.resolve(items))
+        except (ValueError, OverflowError) as e: # Too-large quantities are per-item errors; this only guards the plan
+            list_id = payload.get("id", line_number) if isinstance(payload, dict) else line_number
+            result = {"id": list_id, "error": f"Line {line_number}: {e}"}
+        return json.dumps(result, ensure_ascii=False)
+
+def _init_worker(recipes_file, raw_materials_file, store_file):
+    global _resolver
+    _resolver = BatchResolver(recipes_file, raw_materials_file, store_file)
+
+def _resolve_chunk(chunk):
+    """Process-pool task: [(line_number, line)] -> [output line]."""
+    return [_resolver.resolve_line(line_number, line) for line_number, line in chunk]
+
+def _numbered_lines(source):
+    """(line number, line) for every non-blank line."""
+    for line_number, line in enumerate(source, 1):
+        if line.strip():
+            yield line_number, line
+
+def resolve_stream(source, output, recipes_file="recipes.json", raw_materials_file="raw_materials.json", workers=1, chunk_size=64, store_file=None):
+    """Reads shopping lists from the source line iterator and writes one result line each to output, in order.
+
+    With workers > 1, chunks of chunk_size lines go to a process pool. At most 2 x workers chunks are
+    in flight and results are written as soon as the oldest is done, so memory does not grow with
+    the input. With store_file, recipes come from that binary store instead of the JSON files.
+    Returns the number of lists resolved.
+    """
+    lines = _numbered_lines(source)
+    count = 0
+    if workers <= 1:
+        resolver = BatchResolver(recipes_file, raw_materials_file, store_file)
+        for line_number, line in lines:
+            output.write(resolver.resolve_line(line_number, line) + "\n")
+            count += 1
+        return count
+
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+    in_flight = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(recipes_file, raw_materials_file, store_file)) as executor:
+        for chunk in chunks:
+            in_flight.append(executor.submit(_resolve_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                results = in_flight.popleft().result()
+                output.write("".join(result + "\n" for result in results))
+                count += len(results)
+        while in_flight:
+            results = in_flight.popleft().result()
+            output.write("".join(result + "\n" for result in results))
+            count += len(results)
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolves JSONL shopping lists into raw totals and crafting plans, streaming JSONL out.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file of shopping lists, or - for stdin (default: -)")
+    parser.add_argument("--output", default="-", help="Where to write the results, or - for stdout (default: -)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes; output stays in input order (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Lists per task sent to a worker (default: 64)")
+    parser.add_argument("--recipes", default="recipes.json", help="Recipes file (default: recipes.json)")
+    parser.add_argument("--raw-materials", default="raw_materials.json", help="Raw materials file (default: raw_materials.json)")
+    parser.add_argument("--store", help=f"Read the recipes from this binary store (e.g. {binary_store.RECIPE_STORE_FILE}) instead of --recipes/--raw-materials")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, 'r', encoding='utf-8')
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding='utf-8')
+        with source, output:
+            count = resolve_stream(source, output, args.recipes, args.raw_materials, args.workers, max(1, args.chunk_size), args.store)
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    # Progress goes to stderr so stdout stays pure JSONL
+    print(f"Resolved {count} shopping lists in {time.perf_counter() - start:.2f} s with {args.workers} worker(s).", file=sys.stderr)
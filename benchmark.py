@@ -0,0 +1,184 @@
+"""Benchmark suite for the data pipeline and the cost resolution.
+
+Times the wiki parsers on the committed HTML exports, recipe-page extraction on the saved pages in
+fixtures/recipe_pages (trimmed copies of the gaming.tools markup the scraper reads) and resolution of
+every item in recipes.json at several quantities. Results are written as JSON so runs from different
+commits can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --baseline before.json --threshold 0.2
+
+With --baseline the run fails (exit code 1) if any benchmark got slower than the threshold allows.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import binary_store
+import calculator
+import parse_data
+
+try:
+    import cost_engine
+except ImportError:
+    cost_engine = None # NumPy not installed: the matrix engine is not benchmarked
+
+FIXTURE_DIR = os.path.join("fixtures", "recipe_pages")
+RESOLVE_QUANTITIES = [1, 10, 100]
+
+def _quiet(fn, *args, **kwargs):
+    """Runs fn with its progress prints suppressed, so they neither clutter nor slow the timings."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+def _load_fixture_pages():
+    """Returns [(filename, html)] for the saved recipe pages and the fields each should produce."""
+    with open(os.path.join(FIXTURE_DIR, "expected.json"), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html"))):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages, expected
+
+def _extract_fixture_pages(pages):
+    """One pass of the static recipe-page extraction over every fixture page."""
+    return {
+        filename: parse_data.extract_recipe_fields_html(html, "https://vrising.gaming.tools/recipes/" + filename[:-len(".html")])
+        for filename, html in pages
+    }
+
+def _resolve_all_items(recipes, raw_materials):
+    """Resolves every recipe to raw materials at each of RESOLVE_QUANTITIES."""
+    for item_name in recipes:
+        for quantity in RESOLVE_QUANTITIES:
+            calculator.get_base_materials(item_name, quantity, recipes, raw_materials)
+
+def _store_lookup(store_file, item_name):
+    with binary_store.BinaryRecipeStore(store_file) as store:
+        return store.inputs(item_name)
+
+def _store_costing_recipes(store_file):
+    with binary_store.BinaryRecipeStore(store_file) as store:
+        return store.costing_recipes()
+
+def build_benchmarks():
+    """Returns {name: zero-argument callable}. Inputs are loaded up front so only the work itself is timed."""
+    pages, expected = _load_fixture_pages()
+    extracted = _extract_fixture_pages(pages)
+    if extracted != expected:
+        mismatched = sorted(name for name in expected if extracted.get(name) != expected[name])
+        raise SystemExit(f"Recipe extraction no longer matches {FIXTURE_DIR}/expected.json for: {', '.join(mismatched)}")
+
+    recipes, raw_materials = calculator.load_recipe_data()
+    benchmarks = {
+        "parse_raw_resources": lambda: _quiet(parse_data.parse_raw_resources),
+        "parse_item_recipes_file": lambda: _quiet(parse_data.parse_item_recipes_file),
+        "parse_additional_recipes_file": lambda: _quiet(parse_data.parse_additional_recipes_file),
+        "stream_item_recipes": lambda: _quiet(lambda: sum(1 for _ in parse_data.iter_item_recipes())),
+        "stream_additional_recipes": lambda: _quiet(lambda: sum(1 for _ in parse_data.iter_additional_recipes())),
+        "extract_recipe_fields_html": lambda: _extract_fixture_pages(pages),
+        "resolve_all_items": lambda: _resolve_all_items(recipes, raw_materials),
+    }
+    # Incremental cost table: re-applying one widely used recipe recomputes it and all of its consumers
+    cost_table = calculator.CostTable(recipes, raw_materials)
+    patched_item = max(recipes, key=lambda name: len(cost_table.consumers.get(name, ())))
+    benchmarks["cost_table_full_build"] = lambda: calculator.CostTable(recipes, raw_materials)
+    benchmarks["cost_table_update_one"] = lambda: cost_table.update({patched_item: recipes[patched_item]})
+    # Startup cost of a consumer: parse the JSON files vs. map the binary store (one lookup, or every recipe's costing fields)
+    store_file = os.path.join(tempfile.gettempdir(), "benchmark_recipes.bin")
+    binary_store.write_binary_store(recipes, raw_materials, store_file)
+    lookup_item = next(iter(recipes))
+    benchmarks["load_recipe_json"] = calculator.load_recipe_data
+    benchmarks["binary_store_open_lookup"] = lambda: _store_lookup(store_file, lookup_item)
+    benchmarks["binary_store_costing_recipes"] = lambda: _store_costing_recipes(store_file)
+    if cost_engine:
+        # Compile and solve the whole matrix, then price one list per recipe at every quantity
+        shopping_lists = [{item_name: quantity} for item_name in recipes for quantity in RESOLVE_QUANTITIES]
+        benchmarks["cost_engine_all_items"] = lambda: cost_engine.CostEngine(recipes, raw_materials).raw_totals_batch(shopping_lists)
+    return benchmarks
+
+def run_benchmarks(benchmarks, repeat=5, only=None):
+    """Times each benchmark repeat times (after one warm-up call). Returns {name: stats}."""
+    results = {}
+    for name, fn in benchmarks.items():
+        if only and name not in only:
+            continue
+        fn() # Warm-up: imports, regex and selector caches
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        results[name] = {
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "max_s": max(timings),
+            "repeat": repeat,
+        }
+        print(f"  {name:32} min {min(timings) * 1000:9.2f} ms   median {statistics.median(timings) * 1000:9.2f} ms")
+    return results
+
+def _git_commit():
+    """The current commit, so results files say what they measured."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_to_baseline(results, baseline, threshold):
+    """Compares min times against a baseline run. Returns the names that regressed by more than threshold."""
+    regressions = []
+    print(f"--- Compared to baseline {baseline.get('commit') or '(unknown commit)'} (threshold +{threshold:.0%}) ---")
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"  {name:32} (new, no baseline)")
+            continue
+        change = stats["min_s"] / base["min_s"] - 1 if base["min_s"] else 0.0
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:32} {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the parsers, recipe extraction and cost resolution.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    parser.add_argument("--only", nargs="*", help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs. the baseline before failing, as a fraction (default: 0.2)")
+    args = parser.parse_args()
+
+    print(f"--- Running benchmarks (best of {args.repeat}) ---")
+    results = run_benchmarks(build_benchmarks(), repeat=args.repeat, only=args.only)
+    report = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding='utf-8') as f:
+            json.dump(report, f, indent=4, sort_keys=True)
+        print(f"Saved results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"FAILED: {len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,303 @@
+"""Compact binary copy of recipes.json and raw_materials.json, read through mmap.
+
+Opening a store maps the file and decodes nothing: a recipe's inputs are looked up straight from
+the mapped arrays, so a short-lived process can answer its first query without json.load-ing the
+whole dataset, and every process reading the same file shares one page-cached copy of it.
+
+The file is a header, a section table ({offset, item count} per section, in SECTIONS order) and
+the sections, each 8-byte aligned and little-endian:
+
+    string table    every name (recipes, raw materials, ingredients, workstations) once, sorted
+                    by its UTF-8 bytes, so a name's ID is found by binary search
+    recipe table    per recipe (in name order): name ID, output_qty and workstation ID
+    inputs (CSR)    recipe r's ingredients are input_ids/input_qty[input_offsets[r]:input_offsets[r + 1]]
+    metadata        per recipe: compact JSON of its other fields (description, image path, rarity, ...)
+
+    python binary_store.py "Iron Ingot" "Alucard's Boots"
+"""
+import argparse
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+RECIPE_STORE_FILE = "recipes.bin"
+MAGIC = b"VRRB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sII") # Magic, format version, number of sections
+SECTION_ENTRY = struct.Struct("<QQ") # Offset, number of items
+
+RAW_FLAG = 1 # String is a raw material
+RECIPE_FLAG = 2 # String has a recipe
+EMPTY_FLAG = 4 # String's recipe is empty (counts as raw, as in calculator); its metadata holds the value as written
+
+# (section, array typecode), in file order
+SECTIONS = (
+    ("string_offsets", "I"), # Number of strings + 1 byte offsets into string_data
+    ("string_data", "B"),
+    ("string_flags", "B"),
+    ("string_recipe", "i"), # Recipe index of each string, -1 if it has none
+    ("recipe_names", "I"),
+    ("recipe_output_qty", "d"),
+    ("recipe_workstation", "i"), # String ID, -1 if the recipe has none
+    ("input_offsets", "I"), # Number of recipes + 1
+    ("input_ids", "I"),
+    ("input_qty", "d"),
+    ("meta_offsets", "I"), # Number of recipes + 1 byte offsets into meta_data
+    ("meta_data", "B"),
+)
+CORE_FIELDS = ("inputs", "output_qty", "workstation") # Kept in the arrays; every other field goes to the metadata
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+def _number(value):
+    """Quantities are stored as doubles; whole numbers come back as ints, as they are in recipes.json."""
+    return int(value) if value.is_integer() else value
+
+def write_binary_store(recipes, raw_materials, filename=RECIPE_STORE_FILE):
+    """Writes recipes ({name: recipe}) and raw_materials as a binary store. Returns its size in bytes.
+
+    The file is written next to filename and renamed over it, so processes that still have the old
+    file mapped keep reading the old version instead of a half-written one.
+    """
+    names = set(recipes) | set(raw_materials)
+    for recipe in recipes.values():
+        if recipe:
+            names.update(recipe.get("inputs") or {})
+            if isinstance(recipe.get("workstation"), str):
+                names.add(recipe["workstation"])
+    encoded = sorted(name.encode('utf-8') for name in names)
+    string_ids = {name.decode('utf-8'): string_id for string_id, name in enumerate(encoded)}
+    recipe_names = sorted(recipes, key=string_ids.get) # Recipe index order = string ID order
+
+    sections = {name: array.array(typecode) for name, typecode in SECTIONS}
+    sections["string_offsets"].append(0)
+    for name in encoded:
+        sections["string_data"].frombytes(name)
+        sections["string_offsets"].append(len(sections["string_data"]))
+    sections["string_flags"].extend([0] * len(encoded))
+    sections["string_recipe"].extend([-1] * len(encoded))
+    for name in raw_materials:
+        sections["string_flags"][string_ids[name]] |= RAW_FLAG
+
+    sections["input_offsets"].append(0)
+    sections["meta_offsets"].append(0)
+    for index, name in enumerate(recipe_names):
+        recipe = recipes[name]
+        string_id = string_ids[name]
+        sections["string_recipe"][string_id] = index
+        sections["string_flags"][string_id] |= RECIPE_FLAG
+        sections["recipe_names"].append(string_id)
+        if recipe:
+            workstation = recipe.get("workstation")
+            sections["recipe_output_qty"].append(float(recipe.get("output_qty") or 1))
+            sections["recipe_workstation"].append(string_ids[workstation] if isinstance(workstation, str) else -1)
+            for ingredient, qty in (recipe.get("inputs") or {}).items():
+                sections["input_ids"].append(string_ids[ingredient])
+                sections["input_qty"].append(float(qty))
+            meta = {field: value for field, value in recipe.items() if field not in CORE_FIELDS or (field == "workstation" and not isinstance(value, str))}
+        else:
+            sections["string_flags"][string_id] |= EMPTY_FLAG
+            sections["recipe_output_qty"].append(1.0)
+            sections["recipe_workstation"].append(-1)
+            meta = recipe
+        sections["input_offsets"].append(len(sections["input_ids"]))
+        sections["meta_data"].frombytes(json.dumps(meta, separators=(',', ':'), ensure_ascii=False, sort_keys=True).encode('utf-8'))
+        sections["meta_offsets"].append(len(sections["meta_data"]))
+
+    table = []
+    offset = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+    for name, _ in SECTIONS:
+        offset = _align(offset)
+        table.append((offset, len(sections[name])))
+        offset += len(sections[name]) * sections[name].itemsize
+
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS)))
+        for entry in table:
+            f.write(SECTION_ENTRY.pack(*entry))
+        for (name, _), (offset, _) in zip(SECTIONS, table):
+            f.write(b"\0" * (offset - f.tell()))
+            if sys.byteorder != "little":
+                sections[name].byteswap()
+            sections[name].tofile(f)
+    os.replace(temp_filename, filename)
+    return os.path.getsize(filename)
+
+class BinaryRecipeStore:
+    """Read-only view of a binary store; lookups read the mapped file directly.
+
+    name in store is true for names with a recipe, as for the recipes dict. Use as a context
+    manager, or call close(), to unmap the file.
+    """
+
+    def __init__(self, filename=RECIPE_STORE_FILE):
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = [memoryview(self._mmap)]
+        try:
+            magic, version, count = HEADER.unpack_from(self._views[0])
+            if magic != MAGIC or version != FORMAT_VERSION or count != len(SECTIONS):
+                raise ValueError(f"{filename} is not a version {FORMAT_VERSION} recipe store")
+            for index, (name, typecode) in enumerate(SECTIONS):
+                offset, length = SECTION_ENTRY.unpack_from(self._views[0], HEADER.size + index * SECTION_ENTRY.size)
+                end = offset + length * array.array(typecode).itemsize
+                if end > len(self._mmap):
+                    raise ValueError(f"{filename} is truncated (section {name})")
+                section = self._views[0][offset:end]
+                self._views.append(section)
+                if sys.byteorder == "little":
+                    section = section.cast(typecode)
+                    self._views.append(section)
+                else:
+                    # No zero-copy view of little-endian numbers on this machine: read a swapped copy
+                    section = array.array(typecode, bytes(section))
+                    section.byteswap()
+                setattr(self, "_" + name, section)
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+    def close(self):
+        # The mmap cannot be closed while memoryviews of it are alive; derived views go first
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _string(self, string_id):
+        return str(self._string_data[self._string_offsets[string_id]:self._string_offsets[string_id + 1]], 'utf-8')
+
+    def _string_id(self, name):
+        """Binary search of the string table. Returns -1 for an unknown name."""
+        key = name.encode('utf-8')
+        low, high = 0, len(self._string_flags)
+        while low < high:
+            middle = (low + high) // 2
+            candidate = bytes(self._string_data[self._string_offsets[middle]:self._string_offsets[middle + 1]])
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return middle
+        return -1
+
+    def _recipe_index(self, name):
+        string_id = self._string_id(name)
+        index = self._string_recipe[string_id] if string_id >= 0 else -1
+        if index < 0:
+            raise KeyError(name)
+        return index
+
+    def __len__(self):
+        return len(self._recipe_names)
+
+    def __contains__(self, name):
+        string_id = self._string_id(name)
+        return string_id >= 0 and bool(self._string_flags[string_id] & RECIPE_FLAG)
+
+    def knows(self, name):
+        """True for names with a recipe or that are raw materials."""
+        string_id = self._string_id(name)
+        return string_id >= 0 and bool(self._string_flags[string_id] & (RECIPE_FLAG | RAW_FLAG))
+
+    def is_raw(self, name):
+        string_id = self._string_id(name)
+        return string_id >= 0 and bool(self._string_flags[string_id] & RAW_FLAG)
+
+    def names(self):
+        """Recipe names, sorted by their UTF-8 bytes."""
+        return (self._string(string_id) for string_id in self._recipe_names)
+
+    def raw_materials(self):
+        return {self._string(string_id) for string_id, flags in enumerate(self._string_flags) if flags & RAW_FLAG}
+
+    def _inputs(self, index):
+        start, end = self._input_offsets[index], self._input_offsets[index + 1]
+        return {self._string(string_id): _number(qty) for string_id, qty in zip(self._input_ids[start:end], self._input_qty[start:end])}
+
+    def _workstation(self, index):
+        string_id = self._recipe_workstation[index]
+        return self._string(string_id) if string_id >= 0 else None
+
+    def inputs(self, name):
+        """{ingredient: quantity per craft} of a recipe. Raises KeyError if name has no recipe."""
+        return self._inputs(self._recipe_index(name))
+
+    def output_qty(self, name):
+        return _number(self._recipe_output_qty[self._recipe_index(name)])
+
+    def workstation(self, name):
+        return self._workstation(self._recipe_index(name))
+
+    def metadata(self, name):
+        """The recipe's fields other than inputs, output_qty and workstation, decoded from JSON on demand."""
+        index = self._recipe_index(name)
+        return json.loads(str(self._meta_data[self._meta_offsets[index]:self._meta_offsets[index + 1]], 'utf-8'))
+
+    def recipe(self, name):
+        """The recipe as in recipes.json (output_qty comes back as 1 where it was missing)."""
+        index = self._recipe_index(name)
+        meta = self.metadata(name)
+        if self._string_flags[self._recipe_names[index]] & EMPTY_FLAG:
+            return meta
+        recipe = dict(meta, inputs=self._inputs(index), output_qty=_number(self._recipe_output_qty[index]))
+        if self._recipe_workstation[index] >= 0:
+            recipe["workstation"] = self._workstation(index)
+        return recipe
+
+    def costing_recipes(self):
+        """{name: {"inputs", "output_qty", "workstation"}} for every recipe, without touching the metadata.
+
+        Enough for calculator's graph compilation, costing and crafting plans ({} for an empty recipe).
+        """
+        # Whole arrays at once: tolist() and one decode per string beat indexing the views item by item
+        data = bytes(self._string_data)
+        offsets = self._string_offsets.tolist()
+        strings = [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+        flags = self._string_flags.tolist()
+        input_offsets = self._input_offsets.tolist()
+        input_names = [strings[string_id] for string_id in self._input_ids.tolist()]
+        input_qty = [_number(qty) for qty in self._input_qty.tolist()]
+        workstations = self._recipe_workstation.tolist()
+        recipes = {}
+        for index, (string_id, output_qty) in enumerate(zip(self._recipe_names.tolist(), self._recipe_output_qty.tolist())):
+            if flags[string_id] & EMPTY_FLAG:
+                recipes[strings[string_id]] = {}
+                continue
+            start, end = input_offsets[index], input_offsets[index + 1]
+            recipe = {"inputs": dict(zip(input_names[start:end], input_qty[start:end])), "output_qty": _number(output_qty)}
+            if workstations[index] >= 0:
+                recipe["workstation"] = strings[workstations[index]]
+            recipes[strings[string_id]] = recipe
+        return recipes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Looks up recipes in a binary recipe store.")
+    parser.add_argument("items", nargs="+", help="Item names to look up")
+    parser.add_argument("--store", default=RECIPE_STORE_FILE, help=f"Store file (default: {RECIPE_STORE_FILE})")
+    args = parser.parse_args()
+
+    try:
+        with BinaryRecipeStore(args.store) as store:
+            for item_name in args.items:
+                if item_name in store:
+                    print(f"{item_name}: {store.output_qty(item_name)} from {store.inputs(item_name)} at {store.workstation(item_name)}")
+                elif store.is_raw(item_name):
+                    print(f"{item_name}: raw material")
+                else:
+                    print(f"{item_name}: unknown item")
+    except (IOError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
@@ -0,0 +1,465 @@
+"""Python side of the crafting calculator: the raw-material math from static/js/script.js over recipes.json."""
+import functools
+import hashlib
+import inspect
+import json
+import math
+
+COST_TABLE_FORMAT = 2 # Layout of CostTable.save(); bump it when the saved fields change
+
+def load_recipe_data(recipes_file="recipes.json", raw_materials_file="raw_materials.json"):
+    """Loads the generated data files. Returns (recipes dict, raw materials set)."""
+    with open(recipes_file, 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+    with open(raw_materials_file, 'r', encoding='utf-8') as f:
+        raw_materials = set(json.load(f))
+    return recipes, raw_materials
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (0.0 when empty): the value at rank ceil(fraction * n)."""
+    if not sorted_values:
+        return 0.0
+    # Rounding first keeps float noise (0.7 * 10 = 7.000000000000001) from adding a rank
+    index = max(0, min(len(sorted_values) - 1, math.ceil(round(fraction * len(sorted_values), 9)) - 1))
+    return sorted_values[index]
+
+def round_quantity(value):
+    """Rounds like the frontend's Math.round(value + 0.00001) (halves round up, not to even)."""
+    return math.floor(value + 0.00001 + 0.5)
+
+def get_base_materials(item_name, quantity, recipes, raw_materials, max_steps=1000000):
+    """Port of getBaseMaterials: the raw materials needed for quantity x item_name, rounded.
+
+    Items that are neither raw nor craftable count as raw, as in the frontend. Unlike the frontend there
+    is no 100-step cap; max_steps only guards against cyclic recipe data.
+    """
+    base_materials = {}
+    materials_to_process = [(item_name, float(quantity))] # Stack: (item, quantity_needed)
+    steps = 0
+
+    while materials_to_process:
+        current_item, current_qty_needed = materials_to_process.pop()
+        steps += 1
+        if steps > max_steps:
+            raise ValueError(f"Gave up resolving '{item_name}' after {max_steps} steps; the recipe data may contain a cycle.")
+
+        recipe = recipes.get(current_item)
+        if current_item in raw_materials or not recipe:
+            # Raw material (or unknown item, treated as raw)
+            base_materials[current_item] = base_materials.get(current_item, 0) + current_qty_needed
+            continue
+
+        # How many times we need to craft this recipe
+        craft_count = current_qty_needed / (recipe.get("output_qty") or 1)
+        for ingredient, amount_per_craft in (recipe.get("inputs") or {}).items():
+            if ingredient:
+                materials_to_process.append((ingredient, amount_per_craft * craft_count))
+
+    final_materials = {}
+    for material, amount in base_materials.items():
+        rounded = round_quantity(amount)
+        if rounded > 0:
+            final_materials[material] = rounded
+    return final_materials
+
+def compile_recipe_graph(recipes, raw_materials):
+    """Checks the recipe graph and orders it, in one linear-time pass (iterative Tarjan SCC).
+
+    Nodes are the recipes that get expanded (not raw, with a recipe); edges run from a recipe to its
+    craftable inputs. Returns {"order": recipes with every input before its consumers, "depth": {recipe:
+    level} (1 + the deepest input; raw and unknown items are 0 and not listed), "cycles": [sorted
+    members of each cycle], "unresolved": {input: [recipes using it]} for inputs that are neither a
+    recipe nor raw}. Recipes on a cycle are left out of order and depth and their consumers treat them
+    as raw, so the rest of the graph stays usable; drop them with without_cycles.
+    """
+    def is_node(name):
+        return name not in raw_materials and bool(recipes.get(name))
+
+    def successors(name):
+        return [ingredient for ingredient in (recipes[name].get("inputs") or {}) if ingredient and is_node(ingredient)]
+
+    index = {}
+    low = {}
+    stack = []
+    on_stack = set()
+    components = [] # Emitted inputs first: a component only closes once everything it reaches has
+    for root in recipes:
+        if root in index or not is_node(root):
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            node, pending = work[-1]
+            for successor in pending:
+                if successor not in index:
+                    index[successor] = low[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(successors(successor))))
+                    break
+                if successor in on_stack:
+                    low[node] = min(low[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    order = []
+    depth = {}
+    cycles = []
+    for component in components:
+        name = component[0]
+        if len(component) > 1 or name in successors(name):
+            cycles.append(sorted(component))
+            continue
+        order.append(name)
+        depth[name] = 1 + max((depth.get(ingredient, 0) for ingredient in successors(name)), default=0)
+
+    unresolved = {}
+    for name, recipe in recipes.items():
+        if name in raw_materials or not recipe:
+            continue
+        for ingredient in recipe.get("inputs") or {}:
+            if ingredient and ingredient not in recipes and ingredient not in raw_materials:
+                unresolved.setdefault(ingredient, []).append(name)
+    return {
+        "order": order,
+        "depth": depth,
+        "cycles": sorted(cycles),
+        "unresolved": {name: sorted(users) for name, users in sorted(unresolved.items())},
+    }
+
+def without_cycles(recipes, graph):
+    """recipes minus every recipe on a cycle reported by compile_recipe_graph (their consumers then treat them as raw)."""
+    cyclic = {name for cycle in graph["cycles"] for name in cycle}
+    return {name: recipe for name, recipe in recipes.items() if name not in cyclic}
+
+def make_unit_cost_resolver(recipes, raw_materials, maxsize=None):
+    """Returns unit_cost(item) -> {raw_material: float} for a single unit of item, memoized in an LRU cache.
+
+    Ingredients resolve through the same cache, so shared subtrees are computed once. The returned
+    dicts are shared between calls and must not be modified. The function has lru_cache's
+    cache_info()/cache_clear(). recipes must be acyclic: check them with compile_recipe_graph first.
+    """
+    @functools.lru_cache(maxsize=maxsize)
+    def unit_cost(item):
+        recipe = recipes.get(item)
+        if item in raw_materials or not recipe:
+            return {item: 1.0}
+        per_craft = 1.0 / (recipe.get("output_qty") or 1)
+        cost = {}
+        for ingredient, amount_per_craft in (recipe.get("inputs") or {}).items():
+            if not ingredient:
+                continue
+            for material, amount in unit_cost(ingredient).items():
+                cost[material] = cost.get(material, 0) + amount * amount_per_craft * per_craft
+        return cost
+
+    return unit_cost
+
+def compute_unit_costs(recipes, raw_materials, graph=None):
+    """Raw materials per single unit of every recipe, as {item: {raw_material: float}}.
+
+    Multiplying a vector by a quantity and rounding with round_quantity gives get_base_materials'
+    result without walking the tree. Computed in one pass over the compiled topological order.
+    Raises ValueError if the recipe data contains a cycle.
+    """
+    graph = graph or compile_recipe_graph(recipes, raw_materials)
+    if graph["cycles"]:
+        raise ValueError(f"Recipe cycle through {', '.join(graph['cycles'][0])}; unit costs are undefined.")
+    costs = {}
+    for item in graph["order"]:
+        recipe = recipes[item]
+        per_craft = 1.0 / (recipe.get("output_qty") or 1)
+        cost = {}
+        for ingredient, amount_per_craft in (recipe.get("inputs") or {}).items():
+            if not ingredient:
+                continue
+            for material, amount in costs.get(ingredient, {ingredient: 1.0}).items():
+                cost[material] = cost.get(material, 0) + amount * amount_per_craft * per_craft
+        costs[item] = cost
+    return {item: costs.get(item, {item: 1.0}) for item in recipes}
+
+def _costing_view(recipe):
+    """The fields of a recipe that its raw-material cost depends on ({} for an empty recipe, which counts as raw)."""
+    if not recipe:
+        return {}
+    return {"output_qty": recipe.get("output_qty") or 1, "inputs": {name: qty for name, qty in (recipe.get("inputs") or {}).items() if name}}
+
+class CostTable:
+    """Materialized per-unit raw costs of every recipe, updated incrementally.
+
+    costs is {recipe: {raw_material: float}}, as compute_unit_costs returns. update() takes changed
+    recipes and recomputes only them and their transitive consumers, found through a reverse
+    dependency index, so a small patch costs in proportion to the part of the graph it reaches.
+    """
+
+    def __init__(self, recipes, raw_materials, graph=None):
+        self.recipes = {name: _costing_view(recipe) for name, recipe in recipes.items()}
+        self.raw_materials = set(raw_materials)
+        self.consumers = {} # ingredient -> recipes listing it
+        for name, recipe in self.recipes.items():
+            self._link(name, recipe)
+        self.costs = compute_unit_costs(self.recipes, self.raw_materials, graph)
+
+    def _link(self, name, recipe):
+        for ingredient in recipe.get("inputs", {}):
+            self.consumers.setdefault(ingredient, set()).add(name)
+
+    def _unlink(self, name, recipe):
+        for ingredient in recipe.get("inputs", {}):
+            users = self.consumers.get(ingredient)
+            if users:
+                users.discard(name)
+                if not users:
+                    del self.consumers[ingredient]
+
+    def _expanded(self, name):
+        return name not in self.raw_materials and bool(self.recipes.get(name))
+
+    def _unit_cost(self, name):
+        if not self._expanded(name):
+            return {name: 1.0}
+        recipe = self.recipes[name]
+        per_craft = 1.0 / recipe["output_qty"]
+        cost = {}
+        for ingredient, amount_per_craft in recipe["inputs"].items():
+            for material, amount in self.costs.get(ingredient, {ingredient: 1.0}).items():
+                cost[material] = cost.get(material, 0) + amount * amount_per_craft * per_craft
+        return cost
+
+    def _topological(self, names):
+        """names ordered inputs first (Kahn's algorithm over the subgraph). Raises ValueError on a cycle."""
+        pending = {name: sum(1 for ingredient in self.recipes[name]["inputs"] if ingredient in names) if self._expanded(name) else 0 for name in names}
+        ready = sorted(name for name, count in pending.items() if count == 0)
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for consumer in self.consumers.get(name, ()):
+                if consumer in pending and self._expanded(consumer):
+                    pending[consumer] -= 1
+                    if pending[consumer] == 0:
+                        ready.append(consumer)
+        if len(order) < len(names):
+            raise ValueError(f"Recipe cycle among {', '.join(sorted(set(names) - set(order))[:5])}; rebuild the table after fixing it.")
+        return order
+
+    def update(self, changes, raw_materials=None):
+        """Applies {name: new recipe, or None to remove it} and, if given, a new raw materials set.
+
+        Recomputes the changed recipes and every recipe that transitively uses one of them (or a raw
+        material that was added or removed), inputs first. Returns the recomputed names in that order.
+        """
+        seeds = set()
+        for name, recipe in changes.items():
+            old = self.recipes.pop(name, None)
+            if old is not None:
+                self._unlink(name, old)
+            if recipe is not None:
+                self.recipes[name] = _costing_view(recipe)
+                self._link(name, self.recipes[name])
+            seeds.add(name)
+        if raw_materials is not None:
+            raw_materials = set(raw_materials)
+            seeds |= raw_materials ^ self.raw_materials
+            self.raw_materials = raw_materials
+
+        affected = {name for name in seeds if name in self.recipes}
+        stack = list(seeds)
+        while stack:
+            for consumer in self.consumers.get(stack.pop(), ()):
+                if consumer not in affected:
+                    affected.add(consumer)
+                    stack.append(consumer)
+        for name in seeds:
+            if name not in self.recipes:
+                self.costs.pop(name, None)
+
+        order = self._topological(affected)
+        for name in order:
+            self.costs[name] = self._unit_cost(name)
+        return order
+
+    def refresh(self, recipes, raw_materials):
+        """Brings the table in line with a full recipes dict by diffing it against the stored recipes. Returns update()'s result."""
+        changes = {name: recipe for name, recipe in recipes.items() if self.recipes.get(name) != _costing_view(recipe)}
+        changes.update({name: None for name in self.recipes if name not in recipes})
+        raw_materials = set(raw_materials)
+        return self.update(changes, raw_materials if raw_materials != self.raw_materials else None)
+
+    @staticmethod
+    def code_version():
+        """Hash of the code the costs are computed with, so a table saved by other costing code is not reused."""
+        functions = (_costing_view, compute_unit_costs, CostTable._expanded, CostTable._unit_cost)
+        try:
+            sources = [inspect.getsource(function).encode('utf-8') for function in functions]
+        except (OSError, TypeError):
+            # No source shipped (e.g. a frozen build or .pyc only): hash the bytecode instead
+            sources = [function.__code__.co_code for function in functions]
+        return hashlib.sha256(b"\n".join([str(COST_TABLE_FORMAT).encode('utf-8')] + sources)).hexdigest()[:16]
+
+    @staticmethod
+    def _checksum(raw_materials, recipes, costs):
+        data = json.dumps([raw_materials, recipes, costs], sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]
+
+    def save(self, filename):
+        raw_materials = sorted(self.raw_materials)
+        with open(filename, "w", encoding='utf-8') as f:
+            json.dump({
+                "format": COST_TABLE_FORMAT,
+                "code_version": self.code_version(),
+                "checksum": self._checksum(raw_materials, self.recipes, self.costs),
+                "raw_materials": raw_materials,
+                "recipes": self.recipes,
+                "costs": self.costs,
+            }, f, separators=(',', ':'), ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename):
+        """Reads a table written by save() without recomputing anything.
+
+        Raises ValueError if the file was written by different costing code or its contents do not match
+        its checksum; the caller should then build the table from scratch.
+        """
+        with open(filename, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("format") != COST_TABLE_FORMAT:
+            raise ValueError(f"{filename} has an unknown format")
+        if data.get("code_version") != cls.code_version():
+            raise ValueError(f"{filename} was computed by different costing code")
+        if data.get("checksum") != cls._checksum(data["raw_materials"], data["recipes"], data["costs"]):
+            raise ValueError(f"{filename} does not match its checksum")
+        table = cls.__new__(cls)
+        table.recipes = data["recipes"]
+        table.raw_materials = set(data["raw_materials"])
+        table.costs = data["costs"]
+        table.consumers = {}
+        for name, recipe in table.recipes.items():
+            table._link(name, recipe)
+        return table
+
+def scale_unit_cost(unit_cost, quantity):
+    """Raw materials for quantity units from a per-unit vector, rounded like get_base_materials."""
+    materials = {}
+    for material, amount in unit_cost.items():
+        rounded = round_quantity(amount * quantity)
+        if rounded > 0:
+            materials[material] = rounded
+    return materials
+
+def plan_crafting(shopping_list, recipes, raw_materials, graph=None):
+    """Crafting plan for a {item: quantity} shopping list.
+
+    Demand for every item is summed over the whole list first, visiting items from the deepest down
+    so each is complete before it is expanded; then ceil(demand / output_qty) crafts are made in one
+    batch, so shared intermediates are crafted once in the right amount. Returns {"steps" (inputs
+    first), "by_workstation": {workstation: [item]}, "raw_materials": {item: quantity},
+    "surplus": {item: quantity crafted beyond demand}}. graph is compile_recipe_graph's result for recipes.
+    """
+    depth = (graph or compile_recipe_graph(recipes, raw_materials))["depth"]
+    demand = {}
+    buckets = {} # depth -> items first demanded at that depth
+    def add_demand(item, quantity):
+        if item not in demand:
+            demand[item] = 0
+            buckets.setdefault(depth.get(item, 0), []).append(item)
+        demand[item] += quantity
+
+    for item_name, quantity in shopping_list.items():
+        if quantity > 0:
+            add_demand(item_name, quantity)
+
+    steps = []
+    surplus = {}
+    # A recipe's inputs are strictly shallower, so everything feeding an item is added before it is reached
+    for level in range(max(buckets, default=0), 0, -1):
+        for item in buckets.get(level, []):
+            recipe = recipes[item]
+            output_qty = recipe.get("output_qty") or 1
+            crafts = math.ceil(demand[item] / output_qty)
+            inputs = []
+            for ingredient, amount in (recipe.get("inputs") or {}).items():
+                if ingredient:
+                    add_demand(ingredient, amount * crafts)
+                    inputs.append({"name": ingredient, "qty": amount * crafts})
+            if crafts * output_qty > demand[item]:
+                surplus[item] = crafts * output_qty - demand[item]
+            steps.append({
+                "item": item,
+                "crafts": crafts,
+                "quantity": crafts * output_qty,
+                "inputs": inputs,
+                "workstation": recipe.get("workstation") or "Unknown",
+                "depth": level,
+            })
+
+    steps.sort(key=lambda step: (step["depth"], step["item"])) # Inputs first
+    by_workstation = {}
+    for step in steps:
+        by_workstation.setdefault(step["workstation"], []).append(step["item"])
+    return {
+        "steps": steps,
+        "by_workstation": by_workstation,
+        "raw_materials": {item: quantity for item, quantity in sorted(demand.items()) if item not in depth},
+        "surplus": surplus,
+    }
+
+def compute_where_used(recipes, raw_materials, graph=None):
+    """Reverse dependency index: ({ingredient: {recipe: qty}} direct, {ingredient: {recipe: qty}} transitive).
+
+    qty is the amount of the ingredient used per unit of the recipe's output. The transitive index
+    counts every level below a recipe (Iron Ore per unit of an item made from Iron Ingots). It is built
+    in one pass in topological order: a recipe's full usage is its inputs plus their already-computed
+    usage, scaled. Recipes that are also raw materials are not expanded, as elsewhere.
+    """
+    graph = graph or compile_recipe_graph(recipes, raw_materials)
+    usage = {} # recipe -> {item: qty per unit}, over all levels
+    direct = {}
+    transitive = {}
+    for recipe_name in graph["order"]:
+        recipe = recipes[recipe_name]
+        per_craft = 1.0 / (recipe.get("output_qty") or 1)
+        total = {}
+        for ingredient, amount in (recipe.get("inputs") or {}).items():
+            if not ingredient:
+                continue
+            per_unit = amount * per_craft
+            direct.setdefault(ingredient, {})[recipe_name] = per_unit
+            total[ingredient] = total.get(ingredient, 0) + per_unit
+            for item, qty in usage.get(ingredient, {}).items():
+                total[item] = total.get(item, 0) + qty * per_unit
+        usage[recipe_name] = total
+        for item, qty in total.items():
+            transitive.setdefault(item, {})[recipe_name] = qty
+    return direct, transitive
+
+def craftable_from(stockpile, recipes, direct):
+    """Recipes whose direct inputs are all in a {item: quantity} stockpile, as {recipe: units craftable}.
+
+    Only recipes that use something in the stockpile are looked at, via the direct where-used index.
+    """
+    craftable = {}
+    for item in stockpile:
+        for recipe_name in direct.get(item, {}):
+            if recipe_name in craftable:
+                continue
+            recipe = recipes[recipe_name]
+            inputs = {name: amount for name, amount in (recipe.get("inputs") or {}).items() if name}
+            crafts = min((stockpile.get(name, 0) // amount for name, amount in inputs.items()), default=0)
+            if crafts > 0:
+                craftable[recipe_name] = int(crafts) * (recipe.get("output_qty") or 1)
+    return craftable
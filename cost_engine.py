@@ -0,0 +1,116 @@
+"""Vectorized raw-material costs: the recipe graph as a NumPy matrix, solved in closed form.
+
+A[i, j] is how many units of item j one unit of item i consumes (recipe inputs divided by output_qty).
+Raw materials and unknown items are leaves with no inputs. The total amount of every leaf needed per
+unit of every item is the solution X of (I - A) X = E, where E selects the leaf columns, so one solve
+prices all items at once with no depth limit. Shopping lists are then a matrix product: Q @ X.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import calculator
+
+class CostEngine:
+    """Compiled recipe matrix and per-unit raw costs of every item."""
+
+    def __init__(self, recipes, raw_materials):
+        # Items: every recipe plus every ingredient that is not one (raw or unknown)
+        names = set(recipes)
+        for recipe in recipes.values():
+            names.update(ingredient for ingredient in (recipe.get("inputs") or {}) if ingredient)
+        self.items = sorted(names)
+        self.index = {name: i for i, name in enumerate(self.items)}
+        # Leaves are treated as raw, as in calculator.get_base_materials
+        self.leaves = [i for i, name in enumerate(self.items) if name in raw_materials or not recipes.get(name)]
+        self.leaf_names = [self.items[i] for i in self.leaves]
+
+        n = len(self.items)
+        self.coefficients = np.zeros((n, n))
+        for name, recipe in recipes.items():
+            if name in raw_materials or not recipe:
+                continue
+            row = self.index[name]
+            per_craft = 1.0 / (recipe.get("output_qty") or 1)
+            for ingredient, amount in (recipe.get("inputs") or {}).items():
+                if ingredient:
+                    self.coefficients[row, self.index[ingredient]] += amount * per_craft
+
+        selector = np.zeros((n, len(self.leaves)))
+        selector[self.leaves, np.arange(len(self.leaves))] = 1.0
+        try:
+            self.unit_costs = np.linalg.solve(np.eye(n) - self.coefficients, selector)
+        except np.linalg.LinAlgError as e:
+            raise ValueError(f"Recipe matrix is singular (a recipe cycle with no net output?): {e}")
+        if not np.all(np.isfinite(self.unit_costs)) or (self.unit_costs < -1e-9).any():
+            raise ValueError("Recipe data contains a cycle that makes raw costs unbounded or negative.")
+        # Round-off from the solve leaves tiny non-zero costs for materials an item never uses
+        self.unit_costs[np.abs(self.unit_costs) < 1e-9] = 0.0
+
+    @classmethod
+    def from_files(cls, recipes_file="recipes.json", raw_materials_file="raw_materials.json"):
+        return cls(*calculator.load_recipe_data(recipes_file, raw_materials_file))
+
+    def _vector_to_dict(self, row, rounded):
+        materials = {}
+        for column in np.flatnonzero(row):
+            leaf, amount = self.leaf_names[column], row[column]
+            if rounded:
+                amount = calculator.round_quantity(amount)
+                if amount > 0:
+                    materials[leaf] = amount
+            elif amount > 0:
+                materials[leaf] = float(amount)
+        return materials
+
+    def unit_cost(self, item_name):
+        """Raw materials per unit of item_name, as {raw_material: float}."""
+        return self._vector_to_dict(self.unit_costs[self.index[item_name]], rounded=False)
+
+    def all_unit_costs(self):
+        """{item: {raw_material: float}} for every item in the matrix."""
+        return {name: self._vector_to_dict(row, rounded=False) for name, row in zip(self.items, self.unit_costs)}
+
+    def demand_matrix(self, shopping_lists):
+        """Stacks [{item: quantity}] into a (lists x items) quantity matrix. Raises KeyError for unknown items."""
+        demand = np.zeros((len(shopping_lists), len(self.items)))
+        for row, shopping_list in enumerate(shopping_lists):
+            for item_name, quantity in shopping_list.items():
+                demand[row, self.index[item_name]] += quantity
+        return demand
+
+    def raw_totals_batch(self, shopping_lists, rounded=True):
+        """Raw totals for many shopping lists in one matrix product. Returns one {raw_material: amount} per list.
+
+        Each list is summed exactly and rounded once per material, so shared ingredients are not
+        rounded up item by item as on the page.
+        """
+        totals = self.demand_matrix(shopping_lists) @ self.unit_costs
+        return [self._vector_to_dict(row, rounded) for row in totals]
+
+    def raw_totals(self, shopping_list, rounded=True):
+        """Raw totals for one {item: quantity} shopping list."""
+        return self.raw_totals_batch([shopping_list], rounded)[0]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prices every recipe with the matrix cost engine.")
+    parser.add_argument("items", nargs="*", help="Items to price, as NAME or NAME=QUANTITY (default: report timings only)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = CostEngine.from_files()
+    elapsed = time.perf_counter() - start
+    print(f"Compiled and solved {len(engine.items)} items ({len(engine.leaves)} raw) in {elapsed * 1000:.1f} ms")
+
+    if args.items:
+        shopping_list = {}
+        for entry in args.items:
+            name, _, quantity = entry.partition("=")
+            shopping_list[name] = int(quantity or 1)
+        try:
+            totals = engine.raw_totals(shopping_list)
+        except KeyError as e:
+            parser.error(f"Unknown item {e}")
+        for material, amount in sorted(totals.items()):
+            print(f"  {material}: {amount}")
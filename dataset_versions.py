@@ -0,0 +1,253 @@
+"""Versioned snapshots of the dataset (recipes.json + raw_materials.json) and delta patches between them.
+
+Every build publishes into snapshots/:
+
+    manifest.json                     {"latest": N, "versions": [{"version", "hash", "snapshot", "delta", ...}]}
+    dataset-<hash>.json.gz            the full dataset at that version, named by its content hash
+    delta-<old hash>-<new hash>.json  added, removed and changed recipes and raw materials between versions
+
+A client identifies the version it holds by hashing its own files, then only fetches the deltas from
+there to the latest version (or the full snapshot if it holds a version the manifest does not know):
+
+    python dataset_versions.py publish
+    python dataset_versions.py sync --source https://example.org/snapshots
+"""
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+
+import requests
+
+SNAPSHOT_DIR = "snapshots"
+MANIFEST_FILE = "manifest.json"
+
+def load_dataset(recipes_file="recipes.json", raw_materials_file="raw_materials.json"):
+    """Reads the data files as {"recipes": {...}, "raw_materials": [sorted names]}."""
+    with open(recipes_file, 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+    with open(raw_materials_file, 'r', encoding='utf-8') as f:
+        raw_materials = sorted(set(json.load(f)))
+    return {"recipes": recipes, "raw_materials": raw_materials}
+
+def save_dataset(dataset, recipes_file="recipes.json", raw_materials_file="raw_materials.json"):
+    """Writes a dataset back in the layout parse_data writes."""
+    with open(recipes_file, "w", encoding='utf-8') as f:
+        json.dump(dataset["recipes"], f, indent=4, sort_keys=True)
+    with open(raw_materials_file, "w", encoding='utf-8') as f:
+        json.dump(dataset["raw_materials"], f, indent=4)
+
+def _canonical_bytes(dataset):
+    return json.dumps(dataset, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def dataset_hash(dataset):
+    """Content hash of a dataset; equal data gives the same hash whatever the key order or file formatting."""
+    return hashlib.sha256(_canonical_bytes(dataset)).hexdigest()[:16]
+
+def _diff_recipe(old, new):
+    """Changed fields of one recipe: {"fields": {field: new value}, "removed_fields": [...], "inputs": {"set", "removed"}}.
+
+    inputs are diffed ingredient by ingredient only when both versions hold an inputs dict; otherwise
+    (added, removed, or not a dict) inputs is an ordinary field, so e.g. a missing key becoming {} is kept.
+    """
+    change = {}
+    per_ingredient = isinstance(old.get("inputs"), dict) and isinstance(new.get("inputs"), dict)
+    fields = {field: value for field, value in new.items() if not (per_ingredient and field == "inputs") and old.get(field, object()) != value}
+    removed_fields = sorted(field for field in old if field not in new)
+    if fields:
+        change["fields"] = fields
+    if removed_fields:
+        change["removed_fields"] = removed_fields
+    if per_ingredient and old["inputs"] != new["inputs"]:
+        old_inputs, new_inputs = old["inputs"], new["inputs"]
+        change["inputs"] = {
+            "set": {name: qty for name, qty in new_inputs.items() if old_inputs.get(name, object()) != qty},
+            "removed": sorted(name for name in old_inputs if name not in new_inputs),
+        }
+    return change
+
+def diff_datasets(old, new):
+    """Structural delta from dataset old to new: recipes added, removed and changed (field by field, inputs
+    ingredient by ingredient) and raw materials added and removed. Apply it with apply_delta."""
+    old_recipes, new_recipes = old["recipes"], new["recipes"]
+    changed = {}
+    for name in sorted(set(old_recipes) & set(new_recipes)):
+        if old_recipes[name] != new_recipes[name]:
+            changed[name] = _diff_recipe(old_recipes[name], new_recipes[name])
+    old_raw, new_raw = set(old["raw_materials"]), set(new["raw_materials"])
+    return {
+        "format": 1,
+        "from": dataset_hash(old),
+        "to": dataset_hash(new),
+        "recipes": {
+            "added": {name: new_recipes[name] for name in sorted(set(new_recipes) - set(old_recipes))},
+            "removed": sorted(set(old_recipes) - set(new_recipes)),
+            "changed": changed,
+        },
+        "raw_materials": {"added": sorted(new_raw - old_raw), "removed": sorted(old_raw - new_raw)},
+    }
+
+def apply_delta(dataset, delta):
+    """Returns dataset with delta applied; dataset is not modified. Raises ValueError if delta was made
+    for a different version or the result does not hash to the version it should produce."""
+    if dataset_hash(dataset) != delta["from"]:
+        raise ValueError(f"Delta {delta['from']} -> {delta['to']} does not apply to version {dataset_hash(dataset)}")
+    recipes = dict(dataset["recipes"])
+    for name in delta["recipes"]["removed"]:
+        recipes.pop(name, None)
+    recipes.update(copy.deepcopy(delta["recipes"]["added"]))
+    for name, change in delta["recipes"]["changed"].items():
+        recipe = copy.deepcopy(recipes[name])
+        if "inputs" in change:
+            inputs = recipe.setdefault("inputs", {})
+            for ingredient in change["inputs"]["removed"]:
+                inputs.pop(ingredient, None)
+            inputs.update(change["inputs"]["set"])
+        recipe.update(change.get("fields", {}))
+        for field in change.get("removed_fields", []):
+            recipe.pop(field, None)
+        recipes[name] = recipe
+    raw_materials = (set(dataset["raw_materials"]) - set(delta["raw_materials"]["removed"])) | set(delta["raw_materials"]["added"])
+    patched = {"recipes": recipes, "raw_materials": sorted(raw_materials)}
+    if dataset_hash(patched) != delta["to"]:
+        raise ValueError(f"Applying delta {delta['from']} -> {delta['to']} produced version {dataset_hash(patched)}")
+    return patched
+
+def _load_manifest(snapshot_dir):
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"format": 1, "latest": 0, "versions": []}
+
+def _read_snapshot(path):
+    with gzip.open(path, 'rb') as f:
+        return json.loads(f.read())
+
+def publish_snapshot(recipes_file="recipes.json", raw_materials_file="raw_materials.json", snapshot_dir=SNAPSHOT_DIR):
+    """Adds the current data files to snapshot_dir as a new version, with a delta from the previous one.
+
+    Returns the new manifest entry, or None if the data matches the latest version.
+    """
+    dataset = load_dataset(recipes_file, raw_materials_file)
+    digest = dataset_hash(dataset)
+    manifest = _load_manifest(snapshot_dir)
+    previous = manifest["versions"][-1] if manifest["versions"] else None
+    if previous and previous["hash"] == digest:
+        print(f"Dataset unchanged since version {previous['version']} ({digest}), no snapshot written.")
+        return None
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    entry = {
+        "version": manifest["latest"] + 1,
+        "hash": digest,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "recipes": len(dataset["recipes"]),
+        "snapshot": f"dataset-{digest}.json.gz",
+        "delta": None,
+    }
+    # mtime=0 keeps the gzip bytes a function of the content alone
+    with open(os.path.join(snapshot_dir, entry["snapshot"]), 'wb') as f:
+        f.write(gzip.compress(_canonical_bytes(dataset), mtime=0))
+    entry["snapshot_bytes"] = os.path.getsize(os.path.join(snapshot_dir, entry["snapshot"]))
+
+    if previous:
+        try:
+            previous_dataset = _read_snapshot(os.path.join(snapshot_dir, previous["snapshot"]))
+            delta = diff_datasets(previous_dataset, dataset)
+            # Never publish a delta clients could not apply: it must turn the previous version into this one
+            if apply_delta(previous_dataset, delta) != dataset:
+                raise ValueError("applying it does not reproduce the dataset")
+        except (IOError, ValueError) as e:
+            print(f"Warning: No delta from version {previous['version']} written, clients will fetch the full snapshot: {e}")
+        else:
+            entry["delta"] = f"delta-{previous['hash']}-{digest}.json"
+            with open(os.path.join(snapshot_dir, entry["delta"]), "w", encoding='utf-8') as f:
+                json.dump(delta, f, separators=(',', ':'), ensure_ascii=False)
+            entry["delta_bytes"] = os.path.getsize(os.path.join(snapshot_dir, entry["delta"]))
+            summary = delta["recipes"]
+            print(f"Delta from version {previous['version']}: {len(summary['added'])} added, {len(summary['removed'])} removed, "
+                  f"{len(summary['changed'])} changed recipes ({entry['delta_bytes']} bytes)")
+
+    manifest["latest"] = entry["version"]
+    manifest["versions"].append(entry)
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), "w", encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+    print(f"Saved dataset version {entry['version']} ({digest}, {entry['snapshot_bytes'] // 1024} KB) to {snapshot_dir}")
+    return entry
+
+def _fetch(source, name):
+    """Reads name from a snapshot directory or URL."""
+    if source.startswith(("http://", "https://")):
+        response = requests.get(urljoin(source.rstrip("/") + "/", name), timeout=30)
+        response.raise_for_status()
+        return response.content
+    with open(os.path.join(source, name), 'rb') as f:
+        return f.read()
+
+def sync_dataset(source, recipes_file="recipes.json", raw_materials_file="raw_materials.json"):
+    """Brings the local data files up to the latest version published at source.
+
+    The local version is found by hashing the files. From a known version only the deltas are fetched
+    and applied one by one; otherwise (or if a delta is missing) the latest full snapshot is fetched.
+    Returns the version now held.
+    """
+    manifest = json.loads(_fetch(source, MANIFEST_FILE))
+    if not manifest["versions"]:
+        raise ValueError(f"No versions published at {source}")
+    latest = manifest["versions"][-1]
+    try:
+        dataset = load_dataset(recipes_file, raw_materials_file)
+    except (IOError, ValueError):
+        dataset = None
+    local_hash = dataset_hash(dataset) if dataset else None
+    position = next((i for i, entry in enumerate(manifest["versions"]) if entry["hash"] == local_hash), None)
+
+    if position == len(manifest["versions"]) - 1:
+        print(f"Already at the latest version {latest['version']} ({local_hash}).")
+        return latest["version"]
+
+    if position is not None:
+        try:
+            fetched = 0
+            for entry in manifest["versions"][position + 1:]:
+                if not entry.get("delta"):
+                    raise ValueError(f"version {entry['version']} has no delta")
+                data = _fetch(source, entry["delta"])
+                fetched += len(data)
+                dataset = apply_delta(dataset, json.loads(data))
+            save_dataset(dataset, recipes_file, raw_materials_file)
+            print(f"Updated version {manifest['versions'][position]['version']} -> {latest['version']} with {len(manifest['versions']) - position - 1} delta(s), {fetched} bytes.")
+            return latest["version"]
+        except (IOError, ValueError, requests.RequestException) as e:
+            print(f"Warning: Could not apply deltas ({e}), fetching the full snapshot.")
+
+    data = _fetch(source, latest["snapshot"])
+    dataset = json.loads(gzip.decompress(data))
+    if dataset_hash(dataset) != latest["hash"]:
+        raise ValueError(f"Snapshot {latest['snapshot']} does not match its hash")
+    save_dataset(dataset, recipes_file, raw_materials_file)
+    print(f"Fetched full snapshot of version {latest['version']} ({len(data)} bytes).")
+    return latest["version"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publishes dataset snapshots and deltas, or updates local data files from them.")
+    parser.add_argument("command", choices=["publish", "sync"], help="publish: add the local data files as a new version; sync: update them to the latest published version")
+    parser.add_argument("--source", default=SNAPSHOT_DIR, help=f"Snapshot directory or URL to sync from (default: {SNAPSHOT_DIR})")
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR, help=f"Where publish writes (default: {SNAPSHOT_DIR})")
+    parser.add_argument("--recipes", default="recipes.json", help="Recipes file (default: recipes.json)")
+    parser.add_argument("--raw-materials", default="raw_materials.json", help="Raw materials file (default: raw_materials.json)")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "publish":
+            publish_snapshot(args.recipes, args.raw_materials, args.snapshot_dir)
+        else:
+            sync_dataset(args.source, args.recipes, args.raw_materials)
+    except (IOError, ValueError, requests.RequestException) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
@@ -2,22 +2,180 @@ import json
 import re
 import time # Import time for delays
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os # Import os for path operations
-from bs4 import BeautifulSoup, Tag, NavigableString
+import argparse
+import contextlib
+import io
+import sys
+import queue
+import threading
+import hashlib
+import http.server
+import shutil
+import tempfile
+import heapq
+from collections import Counter
+from itertools import groupby
+import gzip
+import unicodedata
+from datetime import datetime, timezone
+from email.utils import formatdate
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from urllib.parse import urljoin, urlsplit
+from bs4 import BeautifulSoup, Tag, NavigableString, SoupStrainer
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 
-def parse_raw_resources(filename="Raw_Resources.html"):
+import binary_store
+import calculator
+import dataset_versions
+
+try:
+    from lxml import etree # BeautifulSoup's fast tree builder, and incremental parsing of the wiki exports
+    DEFAULT_WIKI_ENGINE = "lxml"
+except ImportError:
+    etree = None
+    DEFAULT_WIKI_ENGINE = "html.parser"
+
+try:
+    import psutil
+except ImportError:
+    psutil = None # The scraper's browser memory watchdog is off without psutil; drivers still recycle by page count
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None # Sprite atlases are skipped without Pillow; the page falls back to the single icons
+
+# Evaluated in the browser: returns true once the title and at least one table caption are rendered
+RECIPE_PAGE_READY_SCRIPT = "return !!(document.querySelector('h1.header-title') && document.querySelector('table caption'));"
+
+# Evaluated in the browser: collects every field of a recipe page in one round trip.
+# Optional tables (Outputs, Requirements, Workstations) come back as null when absent.
+RECIPE_FIELDS_SCRIPT = """
+const captionedTable = (text) => {
+    for (const caption of document.querySelectorAll('caption')) {
+        if (caption.textContent.includes(text) && caption.parentElement && caption.parentElement.tagName === 'TABLE') {
+            return caption.parentElement;
+        }
+    }
+    return null;
+};
+const textOf = (el) => el ? el.innerText : null;
+
+const outputsTable = captionedTable('Outputs');
+const reqTable = captionedTable('Requirements');
+const wsTable = captionedTable('Workstations');
+const image = document.querySelector('div.tooltip-body > div.w-\\\\[128px\\\\].h-\\\\[128px\\\\].absolute img');
+
+let requirements = null;
+if (reqTable) {
+    requirements = [];
+    for (const row of reqTable.querySelectorAll('tbody tr')) {
+        const cols = row.querySelectorAll('td');
+        if (cols.length < 2) continue;
+        let name = textOf(cols[0].querySelector('a'));
+        if (!name || !name.trim()) {
+            const img = cols[0].querySelector('img');
+            name = img ? img.getAttribute('alt') : null;
+        }
+        requirements.push({name: name, qty: textOf(cols[cols.length - 1])});
+    }
+}
+
+return {
+    name: textOf(document.querySelector('h1.header-title')),
+    outputQty: outputsTable ? textOf(outputsTable.querySelector('tbody tr td:last-child')) : null,
+    requirements: requirements,
+    imageUrl: image ? image.src : null,
+    workstation: wsTable ? textOf(wsTable.querySelector('tbody tr td a')) : null,
+    description: textOf(document.querySelector('p.header-desc')),
+};
+"""
+
+PAGE_ARCHIVE_DIR = "page_archive" # Raw captures of every fetched page, for --replay
+RECIPE_FIXTURE_DIR = os.path.join("fixtures", "recipe_pages") # Saved recipe pages and the fields each should produce
+
+MERGE_REPORT_FILE = "merge_report.json" # Which source won each recipe in the last build
+
+RECIPE_JOURNAL_FILE = "recipes.journal.jsonl" # Checkpoint of every scraped page, for --resume
+WIKI_SPOOL_FILE = "{source}.recipes.jsonl" # Records streamed from a wiki export, read back name-sorted by the merge; kept in a temp dir for one run
+
+IMAGE_CACHE_FILENAME = ".image_cache.json" # ETag/Last-Modified/hash per image URL, kept next to the images
+
+RECIPE_BUNDLE_FILE = "recipes.bundle.json" # Compiled recipe graph the frontend starts from
+RECIPE_META_FILE = "recipes.meta.json" # Descriptions and image paths, fetched by the frontend after first render
+SEARCH_INDEX_FILE = "search_index.json" # Trigram/prefix index for the item picker's type-ahead
+ITEM_ALIASES_FILE = "item_aliases.json" # Optional {item: [other names players search for]}
+WHERE_USED_FILE = "where_used.json" # Ingredient -> recipes using it (direct and transitive), by bundle item ID
+COST_TABLE_FILE = "cost_table.json" # Per-unit raw costs of every recipe, updated incrementally from build to build
+GRAPH_REPORT_FILE = "graph_report.json" # Cycles, unresolved inputs and depth levels found by the last build
+
+SPRITE_INDEX_FILE = "sprites.json" # Item name -> icon position in the sprite atlases
+SPRITE_ATLAS_DIR = os.path.join("images", "atlas")
+SPRITE_SIZES = [32, 64] # Icon sizes in the atlases: 1x and 2x of the 32px list icons
+SPRITE_ATLAS_COLUMNS = 16
+SPRITE_ATLAS_ROWS = 16 # Icons per atlas = columns x rows
+
+SCRAPE_REPORT_FILE = "scrape_report.json" # Per-phase timings and events of the last scrape
+
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Chrome setups for the Selenium scraper (--browser-profile). "lean" runs headless, returns from
+# driver.get at DOMContentLoaded (readiness is waited for explicitly anyway) and blocks everything
+# the extraction does not read: images, fonts and media by URL, and every host not allowlisted.
+BROWSER_PROFILES = {
+    "standard": {"headless": False, "window_size": "1920,1080", "page_load_strategy": "normal", "block_resources": False},
+    "lean": {"headless": True, "window_size": "1280,800", "page_load_strategy": "eager", "block_resources": True},
+}
+# Stylesheets stay allowed: the extraction reads innerText, which depends on the computed styles
+LEAN_BLOCKED_EXTENSIONS = ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "woff", "woff2", "ttf", "otf", "eot", "mp4", "webm", "mp3"]
+LEAN_ALLOWED_HOSTS = ["vrising.gaming.tools", "*.gaming.tools"] # Plus the --base-url host and any --allow-host
+
+DRIVER_RECYCLE_PAGES = 100 # Pages per Chrome instance before a worker replaces it (--recycle-pages)
+DRIVER_MAX_RSS_MB = 1500 # Chrome + chromedriver memory at which a worker replaces its instance (--max-browser-rss-mb)
+PAGE_LOAD_TIMEOUT = 60 # Seconds before driver.get gives up on a page that never finishes loading
+MAX_PAGE_ATTEMPTS = 3 # Browser crashes or hangs on one page before it is recorded as failed
+
+# Wiki table patterns, compiled once instead of per node
+PLACEHOLDER_INGREDIENT_RE = re.compile(r'^(\d+)\s+([a-zA-Z ]+(?:Tier Weapon|Gem Stones?))(?=\s*<br|\s*$)', re.IGNORECASE) # "1 Copper Tier Weapon"
+PLACEHOLDER_NAME_RE = re.compile(r'Tier Weapon|Gem ?Stones?$|^Any ', re.IGNORECASE) # What placeholder ingredients become: "Copper Tier Weapon", "Any Gemstone"
+LEADING_QTY_RE = re.compile(r'^(\d+)(?:\s*\(\s*\d+\s*\))?') # "4" or "4 (8)"
+EXACT_QTY_RE = re.compile(r'^(\d+)\s*(?:\(\s*\d+\s*\))?$')
+OUTPUT_QTY_RE = re.compile(r"^\s*(\d+)\s*(&nbsp;|\s)?")
+DIGIT_RE = re.compile(r'\d')
+
+WIKI_CELL_CACHE_LIMIT = 4096 # Ingredient cells memoized while streaming a wiki export, so the cache cannot grow with the file
+
+def _tables_with_class(css_class):
+    """SoupStrainer for <table> elements carrying css_class among their (space-separated) classes."""
+    def has_class(value):
+        if not value:
+            return False
+        classes = value.split() if isinstance(value, str) else value
+        return css_class in classes
+    return SoupStrainer('table', class_=has_class)
+
+def _load_wiki_soup(f, engine, tables):
+    """Parses a wiki export. Fast engines (lxml) only build the tables matched by the `tables` SoupStrainer;
+    "html.parser" builds the whole document, as the parsers originally did."""
+    if engine == "html.parser":
+        return BeautifulSoup(f, 'html.parser')
+    return BeautifulSoup(f, engine, parse_only=tables)
+
+def parse_raw_resources(filename="Raw_Resources.html", engine=DEFAULT_WIKI_ENGINE):
     """Parses Raw_Resources.html to extract a list of raw material names."""
     raw_materials = set()
     try:
         with open(filename, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'html.parser')
+            soup = _load_wiki_soup(f, engine, _tables_with_class('fandom-table'))
 
         table = soup.find('table', class_='fandom-table')
         if not table:
@@ -67,12 +225,11 @@ def parse_ingredients_from_cell(materials_col):
     nodes = list(materials_col.children)
     # print(f"DEBUG Materials Col Children: {len(nodes)}")
     for j, node in enumerate(nodes):
-        node_str = str(node)
-        # print(f"  Node {j}: {node.name} | Text: '{node_str[:50]}...'")
+        # print(f"  Node {j}: {node.name} | Text: '{str(node)[:50]}...'")
         if isinstance(node, NavigableString):
-            node_text = node_str.strip().replace('&nbsp;', '')
+            node_text = str(node).strip().replace('&nbsp;', '') # Only text nodes are stringified; str(Tag) re-serializes markup
             # Handle specific placeholder text like "1 Copper Tier Weapon" or "2 Crude Gem Stones"
-            placeholder_match = re.match(r'^(\d+)\s+([a-zA-Z ]+(?:Tier Weapon|Gem Stones?))(?=\s*<br|\s*$)', node_text, re.IGNORECASE)
+            placeholder_match = PLACEHOLDER_INGREDIENT_RE.match(node_text)
             if placeholder_match:
                 # We capture this as a special input for now, maybe filter later
                 placeholder_qty = int(placeholder_match.group(1))
@@ -82,7 +239,7 @@ def parse_ingredients_from_cell(materials_col):
                 current_qty = None # Reset qty as this text consumed it
                 continue # Move to next node
             
-            qty_search = re.match(r'^(\d+)(?:\s*\(\s*\d+\s*\))?', node_text)
+            qty_search = LEADING_QTY_RE.match(node_text)
             if qty_search:
                 current_qty = int(qty_search.group(1))
                 # print(f"    Found quantity: {current_qty} from text: '{node_text}'")
@@ -97,12 +254,13 @@ def parse_ingredients_from_cell(materials_col):
 
         if temp_node:
             link = None
+            span_link = temp_node.find('a') if temp_node.name == 'span' else None
+            img = temp_node.find('img') if temp_node.name == 'span' and not span_link else None
             if temp_node.name == 'a':
                 link = temp_node
-            elif temp_node.name == 'span' and temp_node.find('a'):
-                link = temp_node.find('a')
-            elif temp_node.name == 'span' and temp_node.find('img'): # Handle span > img case
-                 img = temp_node.find('img')
+            elif span_link:
+                link = span_link
+            elif img: # Handle span > img case
                  potential_name = img.get('title', img.get('alt', '')).strip()
                  if potential_name and "border" not in potential_name.lower():
                     item_name = potential_name
@@ -122,12 +280,12 @@ def parse_ingredients_from_cell(materials_col):
             else:
                 if j + 1 < len(nodes) and isinstance(nodes[j+1], NavigableString):
                     next_node_text = str(nodes[j+1]).strip().replace('&nbsp;', '')
-                    qty_search = re.match(r'^(\d+)(?:\s*\(\s*\d+\s*\))?', next_node_text)
+                    qty_search = LEADING_QTY_RE.match(next_node_text)
                     if qty_search:
                         qty_to_assign = int(qty_search.group(1))
                 elif j + 2 < len(nodes) and isinstance(nodes[j+1], Tag) and nodes[j+1].name == 'br' and isinstance(nodes[j+2], NavigableString):
                     next_node_text = str(nodes[j+2]).strip().replace('&nbsp;', '')
-                    qty_search = re.match(r'^(\d+)(?:\s*\(\s*\d+\s*\))?', next_node_text)
+                    qty_search = LEADING_QTY_RE.match(next_node_text)
                     if qty_search:
                         qty_to_assign = int(qty_search.group(1))
             
@@ -153,7 +311,7 @@ def parse_ingredients_from_cell(materials_col):
         parts = [p.strip() for p in text_content.split('|') if p.strip()]
         current_qty = None
         for part in parts:
-            qty_search = re.match(r'^(\d+)\s*(?:\(\s*\d+\s*\))?$', part)
+            qty_search = EXACT_QTY_RE.match(part)
             if qty_search:
                 current_qty = int(qty_search.group(1))
             elif current_qty is not None:
@@ -173,13 +331,81 @@ def parse_ingredients_from_cell(materials_col):
 
     return inputs
 
-def parse_item_recipes_file(filename="Item_Recipes.html"):
+def _cell_cache_key(tag):
+    """Hashable copy of a cell's markup (tags, attributes and text); several times cheaper than str(tag)."""
+    attrs = tuple((k, ' '.join(v) if isinstance(v, list) else v) for k, v in tag.attrs.items())
+    children = tuple(str(child) if isinstance(child, NavigableString) else _cell_cache_key(child) for child in tag.children)
+    return (tag.name, attrs, children)
+
+def parse_ingredients_from_cell_cached(materials_col, cache):
+    """parse_ingredients_from_cell memoized on the cell's HTML; block tables repeat one ingredient cell for many items."""
+    key = _cell_cache_key(materials_col)
+    inputs = cache.get(key)
+    if inputs is None:
+        inputs = cache[key] = parse_ingredients_from_cell(materials_col)
+    return dict(inputs)
+
+def _parse_item_recipe_row(row, cell_cache):
+    """One row of the Item_Recipes.html table as (name, recipe), or None if it is not a recipe row."""
+    cols = row.find_all('td')
+    if len(cols) < 3: # Need at least item, station, materials
+        return None
+
+    output_col = cols[0]
+    materials_col = cols[-1]
+
+    # --- Output Item(s) ---
+    links = output_col.find_all('a')
+    spans = output_col.find_all('span', typeof='mw:File/Frameless')
+
+    primary_output_name = None
+    output_qty = 1
+
+    qty_match = OUTPUT_QTY_RE.match(output_col.get_text(strip=False))
+    if qty_match:
+        output_qty = int(qty_match.group(1))
+
+    # Find primary name
+    if links:
+        primary_output_name = links[0].get('title') or links[0].text
+    elif spans:
+         first_span_link = spans[0].find('a')
+         if first_span_link:
+             primary_output_name = first_span_link.get('title') or first_span_link.text
+
+    if not primary_output_name:
+        return None
+    primary_output_name = primary_output_name.strip()
+    if not primary_output_name: return None
+
+    # --- Workstation (first station listed; rows are item, [time,] station, materials) ---
+    station_link = cols[-2].find('a', title=True)
+    workstation = station_link['title'].strip() if station_link else None
+
+    # --- Input Materials ---
+    inputs = parse_ingredients_from_cell_cached(materials_col, cell_cache)
+
+    if not inputs:
+        # print(f"DEBUG (Standard): Skipping row, could not parse inputs for {primary_output_name}")
+        return None
+
+    recipe = {
+        "output_qty": output_qty,
+        "inputs": inputs
+    }
+    if workstation:
+        recipe["workstation"] = workstation
+    # print(f"  Successfully parsed (Standard): {primary_output_name} -> {inputs}")
+    return primary_output_name, recipe
+
+def parse_item_recipes_file(filename="Item_Recipes.html", engine=DEFAULT_WIKI_ENGINE):
     """Parses Item_Recipes.html using its specific table structure."""
     recipes = {}
+    cell_cache = {}
     print(f"--- Processing file (Standard Table): {filename} ---")
     try:
         with open(filename, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'html.parser')
+            soup = _load_wiki_soup(f, engine, _tables_with_class('jquery-tablesorter'))
 
         table = soup.find('table', class_='jquery-tablesorter')
         if not table:
@@ -194,55 +420,11 @@ def parse_item_recipes_file(filename="Item_Recipes.html"):
         rows = tbody.find_all('tr')
         print(f"Found {len(rows)} rows in standard recipe table.")
 
-        for i, row in enumerate(rows):
-            cols = row.find_all('td')
-            if len(cols) < 3: # Need at least item, station, materials
-                continue
-
-            output_col = cols[0]
-            materials_col = cols[-1]
-
-            # --- Output Item(s) ---
-            links = output_col.find_all('a')
-            spans = output_col.find_all('span', typeof='mw:File/Frameless')
-
-            primary_output_name = None
-            output_qty = 1
-
-            qty_match = re.match(r"^\s*(\d+)\s*(&nbsp;|\s)?", output_col.get_text(strip=False))
-            if qty_match:
-                output_qty = int(qty_match.group(1))
-            
-            # Find primary name
-            if links:
-                primary_output_name = links[0].get('title') or links[0].text
-            elif spans:
-                 first_span_link = spans[0].find('a')
-                 if first_span_link:
-                     primary_output_name = first_span_link.get('title') or first_span_link.text
-            
-            if not primary_output_name:
-                continue
-            primary_output_name = primary_output_name.strip()
-            if not primary_output_name: continue
-
-            # --- Input Materials ---
-            inputs = parse_ingredients_from_cell(materials_col)
-
-            if not inputs:
-                # print(f"DEBUG (Standard): Skipping row {i+1}, could not parse inputs for {primary_output_name}")
-                continue
-
-            # Add to recipes dictionary
-            if primary_output_name and inputs:
-                 if primary_output_name in recipes:
-                     # print(f"Warning (Standard): Duplicate recipe for '{primary_output_name}'. Overwriting.")
-                     pass
-                 recipes[primary_output_name] = {
-                     "output_qty": output_qty,
-                     "inputs": inputs
-                 }
-                 # print(f"  Successfully parsed (Standard): {primary_output_name} -> {inputs}")
+        for row in rows:
+            record = _parse_item_recipe_row(row, cell_cache)
+            if record:
+                # A later row for the same item overwrites the earlier one
+                recipes[record[0]] = record[1]
 
     except FileNotFoundError:
         print(f"Error: {filename} not found.")
@@ -256,13 +438,126 @@ def parse_item_recipes_file(filename="Item_Recipes.html"):
     print(f"Found {len(recipes)} recipes in {filename}.")
     return recipes
 
-def parse_additional_recipes_file(filename="AdditionalRecipes.html"):
+def _iter_additional_table_recipes(rows, cell_cache):
+    """Yields (name, recipe) from the rows of one AdditionalRecipes.html table, in order.
+
+    Block tables put several items in one row and their shared ingredients in the next; other rows
+    are read as simple item/materials rows. Recipes with placeholder ingredients are skipped.
+    """
+    block_items_row_data = None # Store data like { "row_index": i, "items": [name1, name2,...] }
+
+    for i, row in enumerate(rows):
+        th = row.find('th')
+        if th and ('Gear Level' in th.get_text() or 'Crafting Costs' in th.get_text()):
+            block_items_row_data = None # Reset when header found
+            continue
+
+        cols = row.find_all('td')
+        if not cols:
+            continue
+
+        # --- Try to detect item row (multiple items displayed horizontally) ---
+        potential_items = []
+        potential_item_cells = [col for col in cols if col.find('a') and col.find('img')]
+        if len(potential_item_cells) > 1: 
+            for col in potential_item_cells:
+                link = col.find('a')
+                if link:
+                   item_name = (link.get('title') or link.text).strip() 
+                   if item_name:
+                       potential_items.append(item_name)
+            if potential_items:
+                block_items_row_data = {"row_index": i, "items": potential_items}
+                # print(f"   Detected item row {i+1}: {potential_items}")
+                continue # Expect ingredients in the next row(s)
+
+        # --- Try to detect ingredient row (if we are expecting one) ---
+        if block_items_row_data and i > block_items_row_data["row_index"]:
+            ingredient_col = None
+            for col in cols:
+                if (col.find('a') or col.find('span', style=lambda v: v and 'position: relative' in v)) and DIGIT_RE.search(col.get_text()):
+                    ingredient_col = col
+                    break 
+
+            if ingredient_col:
+                # print(f"   Detected ingredient row {i+1} for previous item row {block_items_row_data['row_index']+1}")
+                inputs = parse_ingredients_from_cell_cached(ingredient_col, cell_cache)
+                if inputs:
+                    # Check if these are base ingredients or placeholders
+                    is_base_recipe = True
+                    for ingredient in inputs.keys():
+                        if "Tier Weapon" in ingredient or "Gem Stones" in ingredient:
+                            is_base_recipe = False
+                            # print(f"    Detected placeholder ingredient '{ingredient}', treating as upgrade recipe (will be filtered).")
+                            break
+                        # Add other placeholder checks if needed
+
+                    # Only add recipes if they seem to be base recipes for now
+                    if is_base_recipe:
+                        for item_name in block_items_row_data["items"]:
+                            if not item_name: continue
+                            print(f"  Successfully parsed (Block Base): {item_name} -> {inputs}")
+                            yield item_name, {
+                                "output_qty": 1, 
+                                "inputs": inputs.copy() # Use copy
+                            }
+
+                # Regardless of finding ingredients, reset expectation after checking this row
+                block_items_row_data = None 
+            else:
+                # If the next row wasn't ingredients, maybe the block ended?
+                block_items_row_data = None
+
+        # --- Fallback: Try parsing as simple row ---
+        elif len(cols) >= 2: 
+             output_col = None
+             materials_col = None
+             if (cols[0].find('a') or cols[0].find('img')) and (cols[-1].find('a') and DIGIT_RE.search(cols[-1].get_text())):
+                  output_col = cols[0]
+                  materials_col = cols[-1]
+
+             if output_col and materials_col:
+                 primary_output_name = None
+                 output_qty = 1
+                 links = output_col.find_all('a')
+                 spans = output_col.find_all('span', typeof='mw:File/Frameless')
+                 img = output_col.find('img')
+
+                 qty_match = OUTPUT_QTY_RE.match(output_col.get_text(strip=False))
+                 if qty_match: output_qty = int(qty_match.group(1))
+
+                 if links: primary_output_name = links[0].get('title') or links[0].text
+                 elif spans and spans[0].find('a'): primary_output_name = spans[0].find('a').get('title') or spans[0].find('a').text
+                 elif img: primary_output_name = img.get('title') or img.get('alt')
+
+                 if primary_output_name:
+                     primary_output_name = primary_output_name.strip()
+                     if primary_output_name:
+                         inputs = parse_ingredients_from_cell_cached(materials_col, cell_cache)
+                         if inputs:
+                             # Check for placeholders in fallback too
+                             is_base_recipe_fb = True
+                             for ingredient in inputs.keys():
+                                 if "Tier Weapon" in ingredient or "Gem Stones" in ingredient:
+                                     is_base_recipe_fb = False
+                                     break
+
+                             if is_base_recipe_fb:
+                                 print(f"  Successfully parsed (Block Fallback): {primary_output_name} -> {inputs}")
+                                 yield primary_output_name, {
+                                     "output_qty": output_qty,
+                                     "inputs": inputs
+                                 }
+
+def parse_additional_recipes_file(filename="AdditionalRecipes.html", engine=DEFAULT_WIKI_ENGINE):
     """Parses AdditionalRecipes.html, focusing on block-style tables (Refined)."""
     recipes = {}
+    cell_cache = {}
     print(f"--- Processing file (Refined Block): {filename} ---")
     try:
         with open(filename, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f, 'html.parser')
+            # Every table is kept: the parser falls back to all tables when no 'article-table' exists
+            soup = _load_wiki_soup(f, engine, SoupStrainer('table'))
 
         tables = soup.find_all('table', class_='article-table')
         if not tables:
@@ -275,125 +570,13 @@ def parse_additional_recipes_file(filename="AdditionalRecipes.html"):
         print(f"Found {len(tables)} potential recipe tables in {filename}. Processing...")
         file_recipes_found = 0
 
-        for table_index, table in enumerate(tables):
+        for table in tables:
             tbody = table.find('tbody')
             if not tbody: continue
-
-            rows = tbody.find_all('tr')
-            block_items_row_data = None # Store data like { "row_index": i, "items": [name1, name2,...] }
-
-            # print(f" Processing Table {table_index + 1}")
-            for i, row in enumerate(rows):
-                th = row.find('th')
-                if th and ('Gear Level' in th.get_text() or 'Crafting Costs' in th.get_text()):
-                    block_items_row_data = None # Reset when header found
-                    continue
-                
-                cols = row.find_all('td')
-                if not cols:
-                    continue
-
-                # --- Try to detect item row (multiple items displayed horizontally) ---
-                potential_items = []
-                potential_item_cells = [col for col in cols if col.find('a') and col.find('img')]
-                if len(potential_item_cells) > 1: 
-                    for col in potential_item_cells:
-                        link = col.find('a')
-                        if link:
-                           item_name = (link.get('title') or link.text).strip() 
-                           if item_name:
-                               potential_items.append(item_name)
-                    if potential_items:
-                        block_items_row_data = {"row_index": i, "items": potential_items}
-                        # print(f"   Detected item row {i+1}: {potential_items}")
-                        continue # Expect ingredients in the next row(s)
-
-                # --- Try to detect ingredient row (if we are expecting one) ---
-                if block_items_row_data and i > block_items_row_data["row_index"]:
-                    ingredient_col = None
-                    for col in cols:
-                        if (col.find('a') or col.find('span', style=lambda v: v and 'position: relative' in v)) and re.search(r'\d', col.get_text()):
-                            ingredient_col = col
-                            break 
-                    
-                    if ingredient_col:
-                        # print(f"   Detected ingredient row {i+1} for previous item row {block_items_row_data['row_index']+1}")
-                        inputs = parse_ingredients_from_cell(ingredient_col)
-                        if inputs:
-                            # Check if these are base ingredients or placeholders
-                            is_base_recipe = True
-                            for ingredient in inputs.keys():
-                                if "Tier Weapon" in ingredient or "Gem Stones" in ingredient:
-                                    is_base_recipe = False
-                                    # print(f"    Detected placeholder ingredient '{ingredient}', treating as upgrade recipe (will be filtered).")
-                                    break
-                                # Add other placeholder checks if needed
-                                
-                            # Only add recipes if they seem to be base recipes for now
-                            if is_base_recipe:
-                                for item_name in block_items_row_data["items"]:
-                                    if not item_name: continue
-                                    if item_name in recipes:
-                                        # print(f"Warning (Block Refined): Duplicate recipe for '{item_name}'. Overwriting.")
-                                        pass
-                                    recipes[item_name] = {
-                                        "output_qty": 1, 
-                                        "inputs": inputs.copy() # Use copy
-                                    }
-                                    file_recipes_found += 1
-                                    print(f"  Successfully parsed (Block Base): {item_name} -> {inputs}")
-                                    
-                        # Regardless of finding ingredients, reset expectation after checking this row
-                        block_items_row_data = None 
-                    else:
-                        # If the next row wasn't ingredients, maybe the block ended?
-                        block_items_row_data = None
-                
-                # --- Fallback: Try parsing as simple row --- (Keep this)
-                elif len(cols) >= 2: 
-                     # ... (Keep the fallback logic from previous version) ...
-                     output_col = None
-                     materials_col = None
-                     if (cols[0].find('a') or cols[0].find('img')) and (cols[-1].find('a') and re.search(r'\d+', cols[-1].get_text())):
-                          output_col = cols[0]
-                          materials_col = cols[-1]
-                     
-                     if output_col and materials_col:
-                         primary_output_name = None
-                         output_qty = 1
-                         links = output_col.find_all('a')
-                         spans = output_col.find_all('span', typeof='mw:File/Frameless')
-                         img = output_col.find('img')
-
-                         qty_match = re.match(r"^\s*(\d+)\s*(&nbsp;|\s)?", output_col.get_text(strip=False))
-                         if qty_match: output_qty = int(qty_match.group(1))
-
-                         if links: primary_output_name = links[0].get('title') or links[0].text
-                         elif spans and spans[0].find('a'): primary_output_name = spans[0].find('a').get('title') or spans[0].find('a').text
-                         elif img: primary_output_name = img.get('title') or img.get('alt')
-                         
-                         if primary_output_name:
-                             primary_output_name = primary_output_name.strip()
-                             if primary_output_name:
-                                 inputs = parse_ingredients_from_cell(materials_col)
-                                 if inputs:
-                                     # Check for placeholders in fallback too
-                                     is_base_recipe_fb = True
-                                     for ingredient in inputs.keys():
-                                         if "Tier Weapon" in ingredient or "Gem Stones" in ingredient:
-                                             is_base_recipe_fb = False
-                                             break
-                                     
-                                     if is_base_recipe_fb:
-                                         if primary_output_name in recipes:
-                                             # print(f"Warning (Block Fallback): Duplicate recipe for '{primary_output_name}'. Overwriting.")
-                                             pass
-                                         recipes[primary_output_name] = {
-                                             "output_qty": output_qty,
-                                             "inputs": inputs
-                                         }
-                                         file_recipes_found += 1
-                                         print(f"  Successfully parsed (Block Fallback): {primary_output_name} -> {inputs}")
+            for item_name, recipe in _iter_additional_table_recipes(tbody.find_all('tr'), cell_cache):
+                # A later table or row for the same item overwrites the earlier one
+                recipes[item_name] = recipe
+                file_recipes_found += 1
 
     except FileNotFoundError:
         print(f"Error: {filename} not found.")
@@ -407,6 +590,271 @@ def parse_additional_recipes_file(filename="AdditionalRecipes.html"):
     print(f"Found {file_recipes_found} recipes in {filename}.")
     return recipes
 
+def _release_element(element):
+    """Drops a fully read element and its already-read siblings from the incremental tree."""
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+def _wiki_row_soup(row_element):
+    """Re-parses one <tr> from the incremental lxml tree as BeautifulSoup, for the row parsers."""
+    row_html = etree.tostring(row_element, encoding='unicode', method='html', with_tail=False)
+    return BeautifulSoup(f"<table><tbody>{row_html}</tbody></table>", 'lxml').tr
+
+def iter_wiki_table_rows(filename, table_class=None, max_tables=None, stats=None):
+    """Streams (table_number, row) for the rows of each matching table's first <tbody>, like table.find('tbody').find_all('tr').
+
+    filename is read incrementally with lxml and every element is discarded once it has been passed
+    on, so only the current row is in memory however large the export is. row is a BeautifulSoup
+    tree of that row alone. table_class picks tables by class (None: every table); stats["tables"]
+    counts the tables matched. Requires lxml.
+    """
+    tables_matched = 0
+    table = None # Matching table being read, its first tbody, and whether that tbody has been seen
+    tbody = None
+    tbody_seen = False
+    for event, element in etree.iterparse(filename, events=("start", "end"), html=True, encoding='utf-8'):
+        if event == "start":
+            if table is None and element.tag == "table" and (table_class is None or table_class in (element.get("class") or "").split()):
+                table, tbody, tbody_seen = element, None, False
+                tables_matched += 1
+                if stats is not None:
+                    stats["tables"] = tables_matched
+            elif table is not None and element.tag == "tbody" and not tbody_seen:
+                tbody, tbody_seen = element, True
+            continue
+
+        if table is None:
+            _release_element(element)
+        elif element is table:
+            table = tbody = None
+            _release_element(element)
+            if max_tables and tables_matched >= max_tables:
+                return
+        elif element.tag == "tr" and tbody is not None and element.getparent() is tbody:
+            yield tables_matched, _wiki_row_soup(element)
+            _release_element(element)
+        # Anything else inside a matching table is kept until its row or the table ends
+
+def iter_item_recipes(filename="Item_Recipes.html"):
+    """Streaming parse_item_recipes_file: yields (name, recipe) row by row in document order, without loading the file.
+
+    Later rows for the same name win, as in the dict version. Falls back to parse_item_recipes_file
+    when lxml is not installed.
+    """
+    if etree is None:
+        yield from parse_item_recipes_file(filename).items()
+        return
+    print(f"--- Streaming file (Standard Table): {filename} ---")
+    cell_cache = {}
+    stats = {"tables": 0}
+    found = 0
+    try:
+        for _, row in iter_wiki_table_rows(filename, 'jquery-tablesorter', max_tables=1, stats=stats):
+            if len(cell_cache) > WIKI_CELL_CACHE_LIMIT:
+                cell_cache.clear()
+            record = _parse_item_recipe_row(row, cell_cache)
+            if record:
+                found += 1
+                yield record
+    except (IOError, etree.LxmlError) as e:
+        print(f"Error parsing {filename}: {e}")
+        return
+    if not stats["tables"]:
+        print(f"Warning: Could not find recipe table (jquery-tablesorter) in {filename}")
+    print(f"Streamed {found} recipe rows from {filename}.")
+
+def iter_additional_recipes(filename="AdditionalRecipes.html"):
+    """Streaming parse_additional_recipes_file: yields (name, recipe) table by table in document order.
+
+    Like the dict version, every table is read when the file has no 'article-table' (a second pass).
+    Falls back to parse_additional_recipes_file when lxml is not installed.
+    """
+    if etree is None:
+        yield from parse_additional_recipes_file(filename).items()
+        return
+    print(f"--- Streaming file (Refined Block): {filename} ---")
+    cell_cache = {}
+    found = 0
+    try:
+        for table_class in ('article-table', None):
+            stats = {"tables": 0}
+            for _, table_rows in groupby(iter_wiki_table_rows(filename, table_class, stats=stats), key=lambda entry: entry[0]):
+                if len(cell_cache) > WIKI_CELL_CACHE_LIMIT:
+                    cell_cache.clear()
+                for record in _iter_additional_table_recipes((row for _, row in table_rows), cell_cache):
+                    found += 1
+                    yield record
+            if stats["tables"]:
+                break
+            if table_class:
+                print(f"Warning: No 'article-table' tables found in {filename}. Falling back to all tables.")
+    except (IOError, etree.LxmlError) as e:
+        print(f"Error processing file {filename}: {e}")
+        return
+    print(f"Streamed {found} recipes from {filename}.")
+
+def write_recipes_jsonl(records, filename):
+    """Writes a (name, recipe) stream as JSON lines ({"name", "recipe"}), one record at a time. Returns the count."""
+    count = 0
+    with open(filename, "w", encoding='utf-8') as f:
+        for name, recipe in records:
+            f.write(json.dumps({"name": name, "recipe": recipe}, sort_keys=True) + "\n")
+            count += 1
+    return count
+
+def iter_recipes_jsonl(filename):
+    """Yields (name, recipe) from a write_recipes_jsonl file sorted by name, reading one record at a time.
+
+    Only the name -> offset index is held in memory; for repeated names the last line wins.
+    """
+    offsets = {}
+    with open(filename, 'rb') as f:
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            offsets[json.loads(line)["name"]] = offset
+        for name in sorted(offsets):
+            f.seek(offsets[name])
+            yield name, json.loads(f.readline())["recipe"]
+
+def compare_wiki_parsers(engines=("html.parser", DEFAULT_WIKI_ENGINE), repeat=5):
+    """Side-by-side timing harness for the wiki parsers: runs each parser under each engine,
+    checks that every engine returns exactly the reference (first) engine's output and prints the best-of-N times.
+
+    Returns True when all outputs match.
+    """
+    parsers = [parse_raw_resources, parse_item_recipes_file, parse_additional_recipes_file]
+    all_match = True
+    print(f"--- Comparing wiki parser engines ({', '.join(engines)}), best of {repeat} ---")
+    for parse_fn in parsers:
+        reference = None
+        timings = []
+        for engine in engines:
+            best = None
+            for _ in range(repeat):
+                with contextlib.redirect_stdout(io.StringIO()): # Parsers are chatty; keep the report readable
+                    start = time.perf_counter()
+                    result = parse_fn(engine=engine)
+                    elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            if reference is None:
+                reference = result
+                matches = True
+            else:
+                matches = result == reference
+                all_match = all_match and matches
+            timings.append((engine, best, matches))
+        base_time = timings[0][1]
+        for engine, best, matches in timings:
+            speedup = base_time / best if best else float('inf')
+            print(f"  {parse_fn.__name__:32} {engine:12} {best * 1000:8.1f} ms  x{speedup:4.2f}  {'identical' if matches else 'OUTPUT DIFFERS'}")
+    return all_match
+
+# --- Scrape metrics ---
+
+SCRAPE_PHASES = ["navigation", "wait", "extraction", "image_download"]
+
+class ScrapeMetrics:
+    """Thread-safe per-URL phase timings and event counts for one scrape.
+
+    Phases are navigation (driver.get / HTTP GET), wait (for h1.header-title and a table caption),
+    extraction (fields from the loaded page) and image_download. Events are things like "timeout",
+    "fallback", "error" and "missing_field:<field>".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {phase: [] for phase in SCRAPE_PHASES} # phase -> [(seconds, url)]
+        self._events = Counter()
+        self._event_urls = {}
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, phase, url):
+        """Times the enclosed block as one sample of phase for url, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._timings[phase].append((elapsed, url))
+
+    def event(self, name, url=None):
+        """Counts one occurrence of an event, keeping the first few URLs it happened on."""
+        with self._lock:
+            self._events[name] += 1
+            urls = self._event_urls.setdefault(name, [])
+            if url and len(urls) < 20:
+                urls.append(url)
+
+    def summary(self, slowest=10):
+        """Returns {"phases": {phase: count/total/p50/p95/max}, "events": ..., "slowest_pages": [...]}."""
+        with self._lock:
+            timings = {phase: list(samples) for phase, samples in self._timings.items()}
+            events = {name: {"count": count, "urls": list(self._event_urls.get(name, []))} for name, count in self._events.items()}
+
+        phases = {}
+        page_totals = {}
+        for phase, samples in timings.items():
+            values = sorted(seconds for seconds, _ in samples)
+            phases[phase] = {
+                "count": len(values),
+                "total_s": round(sum(values), 4),
+                "p50_s": round(calculator.percentile(values, 0.50), 4),
+                "p95_s": round(calculator.percentile(values, 0.95), 4),
+                "max_s": round(values[-1], 4) if values else 0.0,
+            }
+            if phase == "image_download":
+                continue # Keyed by image URL, not page
+            for seconds, url in samples:
+                page = page_totals.setdefault(url, {"url": url, "total_s": 0.0})
+                page[phase + "_s"] = round(page.get(phase + "_s", 0.0) + seconds, 4)
+                page["total_s"] += seconds
+
+        slowest_pages = sorted(page_totals.values(), key=lambda page: page["total_s"], reverse=True)[:slowest]
+        for page in slowest_pages:
+            page["total_s"] = round(page["total_s"], 4)
+        return {
+            "elapsed_s": round(time.perf_counter() - self.started, 2),
+            "phases": phases,
+            "events": events,
+            "slowest_pages": slowest_pages,
+        }
+
+    def write_report(self, filename=SCRAPE_REPORT_FILE):
+        """Saves the summary as JSON and prints the per-phase table."""
+        summary = self.summary()
+        with open(filename, "w", encoding='utf-8') as f:
+            json.dump(summary, f, indent=4, sort_keys=True)
+        print(f"--- Scrape timings ({summary['elapsed_s']} s wall clock) ---")
+        for phase, stats in summary["phases"].items():
+            if stats["count"]:
+                print(f"  {phase:15} n={stats['count']:<5} p50 {stats['p50_s'] * 1000:8.1f} ms  p95 {stats['p95_s'] * 1000:8.1f} ms  max {stats['max_s'] * 1000:8.1f} ms  total {stats['total_s']:7.1f} s")
+        for name, event in sorted(summary["events"].items()):
+            print(f"  {name}: {event['count']}")
+        print(f"Saved scrape report to {filename}")
+
+def _timed(metrics, phase, url):
+    """metrics.phase(phase, url), or a no-op when no metrics are being collected."""
+    return metrics.phase(phase, url) if metrics else contextlib.nullcontext()
+
+def _record_missing_fields(fields, recipe_url, metrics):
+    """Counts optional fields a page did not provide, so layout changes on the site show up in the report."""
+    if not metrics or fields is None:
+        return
+    if not fields.get("image_url"):
+        metrics.event("missing_field:image_url", recipe_url)
+    if fields.get("workstation") in (None, "", "Unknown"):
+        metrics.event("missing_field:workstation", recipe_url)
+    if not fields.get("description"):
+        metrics.event("missing_field:description", recipe_url)
+
 def get_safe_filename_from_url(url):
     """Extracts a filename from a URL, keeping it relatively simple."""
     if not url:
@@ -430,35 +878,544 @@ def get_safe_filename_from_url(url):
         print(f"Warning: Could not extract filename from URL '{url}': {e}")
         return None
 
-def download_image(url, save_path):
-    """Downloads an image from a URL and saves it to save_path."""
-    if not url or not save_path:
-        return False
+def create_image_session(pool_size=8):
+    """Creates a pooled session for image downloads that retries transient failures with backoff."""
+    session = requests.Session()
+    retries = Retry(total=4, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({'User-Agent': BROWSER_USER_AGENT})
+    return session
+
+def _load_image_cache(cache_file):
+    """Loads the {url: {path, etag, last_modified, sha256}} validator cache written by download_images."""
     try:
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'} # Mimic browser
-        response = requests.get(url, stream=True, headers=headers, timeout=15) # Use stream=True
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(1024*8): # Download in chunks
-                f.write(chunk)
-        # print(f"    Successfully downloaded image to: {save_path}")
-        return True
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (IOError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable image cache {cache_file}: {e}")
+        return {}
+
+def _download_one_image(session, url, save_path, cached, known_hashes, lock, metrics=None):
+    """Fetches one image, conditionally if we already hold a copy. Returns its cache entry, or None on failure."""
+    headers = {}
+    # A URL deduplicated onto another image's file is revalidated against that file
+    local_path = cached.get("path") or save_path
+    have_file = os.path.exists(local_path)
+    if have_file:
+        if cached.get("etag"):
+            headers['If-None-Match'] = cached["etag"]
+        if cached.get("last_modified"):
+            headers['If-Modified-Since'] = cached["last_modified"]
+        else:
+            # No validators recorded yet (e.g. images from before the cache existed): the file's mtime stands in
+            headers['If-Modified-Since'] = formatdate(os.path.getmtime(local_path), usegmt=True)
+
+    try:
+        with _timed(metrics, "image_download", url):
+            response = session.get(url, headers=headers, timeout=15)
+            if response.status_code == 304 and have_file:
+                return _not_modified_entry(cached, local_path, known_hashes, lock)
+            response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+            content = response.content
     except requests.exceptions.RequestException as e:
         print(f"    Error downloading image {url}: {e}")
-        return False
+        if metrics:
+            metrics.event("image_timeout" if isinstance(e, requests.exceptions.Timeout) else "image_error", url)
+        return None
+
+    sha256 = hashlib.sha256(content).hexdigest()
+    entry = {
+        "path": save_path,
+        "etag": response.headers.get('ETag'),
+        "last_modified": response.headers.get('Last-Modified'),
+        "sha256": sha256,
+        "status": "downloaded",
+    }
+    with lock:
+        # Many items share one icon under different URLs; keep a single copy per content hash. The hash is
+        # claimed before the file is written, so a concurrent download of the same content (which would not
+        # see the file yet) points at this copy instead of writing a second one
+        existing_path = known_hashes.get(sha256)
+        if existing_path and existing_path != save_path:
+            entry["path"] = existing_path
+            entry["status"] = "duplicate"
+            return entry
+        known_hashes[sha256] = save_path
+
+    try:
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        tmp_path = save_path + ".part"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, save_path)
     except IOError as e:
         print(f"    Error saving image to {save_path}: {e}")
-        return False
-    except Exception as e:
-        print(f"    Unexpected error downloading/saving {url}: {e}")
-        return False
+        with lock:
+            if known_hashes.get(sha256) == save_path:
+                del known_hashes[sha256]
+        return None
+    return entry
+
+def _not_modified_entry(cached, local_path, known_hashes, lock):
+    """Cache entry for an image the server reports unchanged (304).
+
+    Files from before the cache recorded hashes are hashed now, so they are deduplicated like fresh downloads.
+    """
+    entry = dict(cached, path=local_path, status="not_modified")
+    if not entry.get("sha256"):
+        try:
+            with open(local_path, 'rb') as f:
+                entry["sha256"] = hashlib.sha256(f.read()).hexdigest()
+        except IOError as e:
+            print(f"    Warning: Could not hash {local_path}: {e}")
+            return entry
+    with lock:
+        existing_path = known_hashes.setdefault(entry["sha256"], local_path)
+    if existing_path != local_path:
+        entry["path"] = existing_path
+        entry["status"] = "duplicate"
+    return entry
+
+def download_images(image_urls, item_image_dir, workers=8, cache_file=None, metrics=None):
+    """Downloads a batch of image URLs concurrently into item_image_dir.
+
+    URLs are deduplicated, unchanged images are revalidated with ETag/If-Modified-Since instead of
+    re-transferred, and images with identical content are stored once. Returns {url: local_path or None}.
+    """
+    cache_file = cache_file or os.path.join(item_image_dir, IMAGE_CACHE_FILENAME)
+    cache = _load_image_cache(cache_file)
+    # Only hashes whose file is still on disk; during the run a hash is claimed before its file is written
+    known_hashes = {entry["sha256"]: entry["path"] for entry in cache.values() if entry.get("sha256") and entry.get("path") and os.path.exists(entry["path"])}
+    lock = threading.Lock()
+
+    jobs = {}
+    for url in image_urls:
+        if not url or url in jobs:
+            continue
+        filename = get_safe_filename_from_url(url)
+        if not filename:
+            print(f"    Warning: Could not generate filename for image URL: {url}")
+            continue
+        # Use forward slashes for consistency
+        jobs[url] = os.path.join(item_image_dir, filename).replace("\\", "/")
+
+    results = {}
+    counts = {"downloaded": 0, "not_modified": 0, "duplicate": 0, "failed": 0}
+    if not jobs:
+        return results
+    print(f"--- Downloading {len(jobs)} unique images with {workers} worker(s) ---")
+    session = create_image_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_download_one_image, session, url, save_path, cache.get(url, {}), known_hashes, lock, metrics): url
+                for url, save_path in jobs.items()
+            }
+            for future in as_completed(futures):
+                url = futures[future]
+                entry = future.result()
+                if entry is None:
+                    counts["failed"] += 1
+                    # Keep a previously downloaded copy if the refresh failed; a deduplicated image lives at
+                    # the path its cache entry points to, not at its own filename
+                    cached_path = cache.get(url, {}).get("path")
+                    if cached_path and os.path.exists(cached_path):
+                        results[url] = cached_path
+                    else:
+                        results[url] = jobs[url] if os.path.exists(jobs[url]) else None
+                    continue
+                counts[entry.pop("status")] += 1
+                cache[url] = entry
+                results[url] = entry["path"]
+    finally:
+        session.close()
+
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=4, sort_keys=True)
+    except IOError as e:
+        print(f"Warning: Could not save image cache {cache_file}: {e}")
+
+    print(f"Images: {counts['downloaded']} downloaded, {counts['not_modified']} unchanged (304), {counts['duplicate']} duplicates, {counts['failed']} failed.")
+    return results
+
+def download_recipe_images(recipes, item_image_dir, workers=8, metrics=None):
+    """Download stage: fetches every recipe's image_url and replaces it with local_image_path."""
+    image_urls = [recipe.get("image_url") for recipe in recipes.values()]
+    local_paths = download_images(image_urls, item_image_dir, workers=workers, metrics=metrics)
+    for recipe in recipes.values():
+        image_url = recipe.pop("image_url", None)
+        recipe["local_image_path"] = local_paths.get(image_url) if image_url else None
+
+def resolve_browser_profile(name="standard", base_url=None, allowed_hosts=(), recycle_pages=DRIVER_RECYCLE_PAGES, max_rss_mb=DRIVER_MAX_RSS_MB):
+    """Returns the BROWSER_PROFILES entry for name with its host allowlist (LEAN_ALLOWED_HOSTS, base_url's
+    host and allowed_hosts) and driver recycling limits (0 or None turns a limit off)."""
+    profile = dict(BROWSER_PROFILES[name], recycle_pages=recycle_pages, max_rss_mb=max_rss_mb)
+    hosts = list(LEAN_ALLOWED_HOSTS)
+    if base_url and urlsplit(base_url).hostname:
+        hosts.append(urlsplit(base_url).hostname)
+    profile["allowed_hosts"] = list(dict.fromkeys(hosts + list(allowed_hosts)))
+    return profile
+
+def build_chrome_options(profile):
+    """ChromeOptions for a resolve_browser_profile result. Hosts outside the allowlist fail to resolve,
+    so third-party scripts, analytics and ads never reach the network."""
+    options = webdriver.ChromeOptions()
+    if profile["headless"]:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument(f"--window-size={profile['window_size']}")
+    options.add_argument(f"user-agent={BROWSER_USER_AGENT}") # Update user agent
+    options.page_load_strategy = profile["page_load_strategy"]
+    if profile["block_resources"]:
+        options.add_argument("--disable-dev-shm-usage") # Small /dev/shm on CI containers
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--mute-audio")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        exclusions = "".join(f", EXCLUDE {host}" for host in profile["allowed_hosts"])
+        options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND{exclusions}")
+    return options
+
+def create_chrome_driver(driver_path, profile=None):
+    """Creates a Chrome WebDriver for a browser profile (default: the standard, headed one)."""
+    profile = profile or resolve_browser_profile()
+    service = ChromeService(driver_path)
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(profile))
+    if profile["block_resources"]:
+        # Blocked in the network stack before a request is made, for allowlisted hosts too
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": [pattern for ext in LEAN_BLOCKED_EXTENSIONS for pattern in (f"*.{ext}", f"*.{ext}?*")]})
+    # No implicit wait: page readiness is waited for explicitly and lookups happen in-page,
+    # so a missing optional element must not stall the session
+    driver.implicitly_wait(0)
+    return driver
+
+class PageLoadTimeout(TimeoutException):
+    """driver.get hit PAGE_LOAD_TIMEOUT, unlike a TimeoutException from waiting for elements on a loaded page."""
+
+class ManagedDriver:
+    """One worker's Chrome, replaced when it has served recycle_pages pages, when its process tree's
+    memory passes max_rss_mb (needs psutil), or when it stops responding.
 
-def scrape_gaming_tools_recipes_selenium(base_url="https://vrising.gaming.tools", index_path="/recipes"):
-    """Scrapes recipe data using Selenium, downloading images locally."""
+    acquire() returns (driver, wait), starting a browser if there is none. Counts "driver_recycle" and
+    "driver_restart" events into metrics.
+    """
+
+    def __init__(self, driver_path, profile=None, recycle_pages=DRIVER_RECYCLE_PAGES, max_rss_mb=DRIVER_MAX_RSS_MB, metrics=None, name="Worker"):
+        self.driver_path = driver_path
+        self.profile = profile
+        self.recycle_pages = recycle_pages
+        self.max_rss_mb = max_rss_mb if psutil else None
+        self.metrics = metrics
+        self.name = name
+        self.driver = None
+        self.wait = None
+        self.pages = 0
+
+    def acquire(self):
+        if self.driver is None:
+            self.driver = create_chrome_driver(self.driver_path, self.profile)
+            self.driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            self.wait = WebDriverWait(self.driver, 20)
+            self.pages = 0
+        return self.driver, self.wait
+
+    def rss_mb(self):
+        """Resident memory of chromedriver and every browser process under it, in MB (None without psutil)."""
+        process = getattr(getattr(self.driver, "service", None), "process", None)
+        if not psutil or process is None:
+            return None
+        try:
+            root = psutil.Process(process.pid)
+            return sum(p.memory_info().rss for p in [root] + root.children(recursive=True)) / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def responsive(self):
+        """False if the browser crashed or hangs (a trivial script does not come back)."""
+        try:
+            return self.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def page_done(self):
+        """Counts a page and recycles the browser if it served its quota or grew too large."""
+        self.pages += 1
+        reason = None
+        if self.recycle_pages and self.pages >= self.recycle_pages:
+            reason = f"after {self.pages} pages"
+        elif self.max_rss_mb:
+            rss = self.rss_mb()
+            if rss and rss > self.max_rss_mb:
+                reason = f"at {rss:.0f} MB"
+        if reason:
+            print(f"{self.name}: Recycling Chrome {reason}.")
+            if self.metrics:
+                self.metrics.event("driver_recycle")
+            self.quit()
+
+    def restart(self, url=None, reason="stopped responding"):
+        """Drops a crashed or hung browser; the next acquire() starts a fresh one."""
+        print(f"{self.name}: Chrome {reason}{' on ' + url if url else ''}, restarting it.")
+        if self.metrics:
+            self.metrics.event("driver_restart", url)
+        self.quit()
+
+    def quit(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"{self.name}: Could not quit Chrome cleanly: {e}")
+        self.driver = self.wait = None
+
+def scrape_recipe_index(driver, base_url, index_url, archive=None):
+    """Collects the relative /recipes/xxx links from the recipe index page."""
+    recipe_links = set()
+    print(f"Navigating to index page: {index_url}")
+    driver.get(index_url)
+    wait = WebDriverWait(driver, 20) # Explicit wait (up to 20 seconds)
+
+    # Wait for the recipe grid to be present
+    # Use a simpler, potentially more stable selector
+    grid_selector = "main > div.grid.grid-cols-1" 
+    try:
+         wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, grid_selector)))
+         print("Recipe grid located.")
+         if archive:
+             archive.record(index_url, driver.page_source)
+         recipe_grid = driver.find_element(By.CSS_SELECTOR, grid_selector)
+         links_elements = recipe_grid.find_elements(By.TAG_NAME, 'a')
+         for link_element in links_elements:
+             href = link_element.get_attribute('href')
+             if href and href.startswith(base_url + '/recipes/'):
+                 # Get the relative path
+                 relative_href = href.replace(base_url, '') 
+                 if relative_href.count('/') == 2: # Simple check for /recipes/xxx
+                     recipe_links.add(relative_href)
+         print(f"Found {len(recipe_links)} unique potential recipe links.")
+         if not recipe_links:
+             print("Error: No recipe links found in the grid. Page source snippet:")
+             print(driver.page_source[:1000]) # Print source if links not found
+    except TimeoutException:
+         print("Error: Timed out waiting for recipe grid to load.")
+         print(f"Page title: {driver.title}")
+         print(f"Current URL: {driver.current_url}")
+         # print(driver.page_source[:2000]) # Debug: print page source
+    return recipe_links
+
+def scrape_recipe_page(driver, wait, recipe_url, archive=None, metrics=None):
+    """Scrapes a single recipe page. Returns (item_name, recipe) or None if the page has no title.
+
+    Raises PageLoadTimeout if the page never finishes loading and TimeoutException if its content never appears.
+    """
+    fields = extract_recipe_fields_selenium(driver, wait, recipe_url, archive, metrics)
+    if fields is None:
+        return None
+    _record_missing_fields(fields, recipe_url, metrics)
+    return build_recipe_record(fields)
+
+def extract_recipe_fields_selenium(driver, wait, recipe_url, archive=None, metrics=None):
+    """Extracts the raw recipe fields from a live page with a single in-page script call."""
+    with _timed(metrics, "navigation", recipe_url):
+        try:
+            driver.get(recipe_url)
+        except TimeoutException as e:
+            raise PageLoadTimeout(f"Page did not load within {PAGE_LOAD_TIMEOUT} s") from e
+    # Wait for the main content elements: Title and at least one table caption
+    with _timed(metrics, "wait", recipe_url):
+        wait.until(lambda d: d.execute_script(RECIPE_PAGE_READY_SCRIPT))
+    if archive:
+        # The rendered DOM, so replay can parse it without a browser
+        archive.record(recipe_url, driver.page_source)
+
+    with _timed(metrics, "extraction", recipe_url):
+        return _parse_recipe_fields_script(driver, recipe_url, metrics)
+
+def _parse_recipe_fields_script(driver, recipe_url, metrics=None):
+    """Runs RECIPE_FIELDS_SCRIPT on the loaded page and normalizes its result into recipe fields."""
+    # --- Parse Recipe Page in one WebDriver round trip ---
+    page = driver.execute_script(RECIPE_FIELDS_SCRIPT)
+    output_item_name = (page.get("name") or "").strip()
+    if not output_item_name:
+        print(f"    Warning: Could not find output item name tag for {recipe_url}")
+        if metrics:
+            metrics.event("missing_field:name", recipe_url)
+        return None
+
+    # Get output quantity (the Outputs table is optional; null means it isn't there)
+    output_qty = 1
+    if page.get("outputQty") is not None:
+        try:
+            output_qty = int(page["outputQty"].strip())
+        except ValueError:
+            output_qty = 1
+
+    # Get required ingredients (null: no Requirements table, e.g. base items)
+    inputs = {}
+    for row in page.get("requirements") or []:
+        try:
+            ingredient_name = (row.get("name") or "").strip()
+            quantity = int((row.get("qty") or "").strip())
+            if ingredient_name and quantity > 0:
+                inputs[ingredient_name] = quantity
+        except ValueError:
+            print(f"    Warning: Could not parse an ingredient row for {output_item_name}")
+
+    # Workstation: assume first workstation listed is the primary one
+    workstation = (page.get("workstation") or "").strip() or "Unknown"
+
+    return {
+        "name": output_item_name,
+        "output_qty": output_qty,
+        "inputs": inputs,
+        "image_url": page.get("imageUrl"),
+        "workstation": workstation,
+        "description": (page.get("description") or "").strip(),
+    }
+
+def build_recipe_record(fields):
+    """Turns extracted page fields into (item_name, recipe).
+
+    The recipe keeps the remote image_url until download_recipe_images swaps it for local_image_path.
+    """
+    rarity = "common" # Default rarity
+    return fields["name"], {
+        "output_qty": fields["output_qty"],
+        "inputs": fields["inputs"],
+        "image_url": fields["image_url"],
+        "local_image_path": None, # Filled in by the image download stage
+        "workstation": fields["workstation"],
+        "description": fields["description"],
+        "rarity": rarity
+    }
+
+def _record_page_result(link, result, recipes, progress, lock, journal=None):
+    """Stores one page result (in the journal if there is one, else the shared recipes dict) and updates the progress counters."""
+    if journal:
+        journal.append(link, result)
+    with lock:
+        if result is None:
+            progress["errors"] += 1
+        else:
+            if not journal:
+                output_item_name, recipe = result
+                recipes[output_item_name] = recipe
+            progress["parsed"] += 1
+        done = progress["parsed"] + progress["errors"]
+        if done % 50 == 0 and done > 0:
+             print(f"  Processed {done} / {progress['total']} links (Recipes: {progress['parsed']}, Errors: {progress['errors']})")
+
+def _recipe_page_worker(worker_id, driver_path, base_url, link_queue, recipes, progress, lock, archive, journal, metrics=None, browser_profile=None, attempts=None):
+    """Worker loop: owns one WebDriver and scrapes links from the shared queue until it is empty.
+
+    The browser is recycled per browser_profile's recycle_pages/max_rss_mb. If it crashes, stops responding
+    or a page load times out, it is restarted and the page goes back on the queue, up to MAX_PAGE_ATTEMPTS
+    times (attempts is the shared {link: failures} count). A page whose content never appears is an error.
+    """
+    profile = browser_profile or resolve_browser_profile()
+    browser = ManagedDriver(driver_path, profile, profile["recycle_pages"], profile["max_rss_mb"], metrics, name=f"Worker {worker_id}")
+    attempts = {} if attempts is None else attempts
+    try:
+        while True:
+            try:
+                link = link_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            recipe_url = base_url + link
+            result = None
+            try:
+                driver, wait = browser.acquire()
+            except Exception as worker_e:
+                print(f"Worker {worker_id}: WebDriver failed: {worker_e}")
+                link_queue.put(link) # Another worker may still get to it
+                break
+            try:
+                result = scrape_recipe_page(driver, wait, recipe_url, archive, metrics)
+            except Exception as page_e:
+                # A page load that hits PAGE_LOAD_TIMEOUT often means a hung renderer that still answers
+                # scripts, so it is retried in a fresh browser like a crash
+                timed_out = isinstance(page_e, PageLoadTimeout)
+                if timed_out or not browser.responsive():
+                    if timed_out and metrics:
+                        metrics.event("timeout", recipe_url)
+                    browser.restart(recipe_url, "timed out" if timed_out else "stopped responding")
+                    with lock:
+                        attempts[link] = attempts.get(link, 0) + 1
+                        retry = attempts[link] < MAX_PAGE_ATTEMPTS
+                    if retry:
+                        if metrics:
+                            metrics.event("requeue", recipe_url)
+                        link_queue.put(link)
+                        continue
+                    print(f"Error: Giving up on recipe page {recipe_url} after {MAX_PAGE_ATTEMPTS} {'timeouts' if timed_out else 'browser failures'}")
+                    if metrics:
+                        metrics.event("error", recipe_url)
+                elif isinstance(page_e, TimeoutException):
+                    # The page loaded but its title and tables never appeared: a page error, not a browser fault
+                    print(f"Error: Timed out waiting for elements on recipe page {recipe_url}")
+                    if metrics:
+                        metrics.event("timeout", recipe_url)
+                        metrics.event("error", recipe_url)
+                else:
+                    print(f"Error processing recipe page {recipe_url}: {page_e}")
+                    if metrics:
+                        metrics.event("error", recipe_url)
+            _record_page_result(link, result, recipes, progress, lock, journal)
+            browser.page_done()
+    finally:
+        browser.quit()
+
+def _skip_completed_links(recipe_links, journal):
+    """Drops links the journal already holds a parsed recipe for (--resume)."""
+    if not journal:
+        return recipe_links
+    completed = journal.completed_links()
+    remaining = {link for link in recipe_links if link not in completed}
+    if len(remaining) < len(recipe_links):
+        print(f"Resuming: {len(recipe_links) - len(remaining)} links already in {journal.filename}, {len(remaining)} left to scrape.")
+    return remaining
+
+def scrape_recipe_links_selenium(base_url, recipe_links, workers, recipes, progress, lock, driver_path, archive=None, journal=None, metrics=None, browser_profile=None):
+    """Scrapes the given recipe links with a pool of WebDriver workers sharing one queue."""
+    link_queue = queue.Queue()
+    for link in recipe_links:
+        link_queue.put(link)
+    workers = max(1, min(workers, len(recipe_links)))
+    print(f"Scraping {len(recipe_links)} recipe pages with {workers} WebDriver worker(s)...")
+
+    threads = []
+    attempts = {}
+    for worker_id in range(workers):
+        thread = threading.Thread(
+            target=_recipe_page_worker,
+            args=(worker_id, driver_path, base_url, link_queue, recipes, progress, lock, archive, journal, metrics, browser_profile, attempts),
+            name=f"recipe-worker-{worker_id}",
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    unvisited = link_queue.qsize()
+    if unvisited:
+        print(f"Warning: {unvisited} recipe links were never visited (all workers failed).")
+        with lock:
+            progress["errors"] += unvisited
+
+def scrape_gaming_tools_recipes_selenium(base_url="https://vrising.gaming.tools", index_path="/recipes", workers=1, image_workers=8, archive=None, journal=None, metrics=None, browser_profile=None):
+    """Scrapes recipe data using a pool of Selenium drivers, then downloads images locally.
+
+    With a journal, recipes are streamed to it instead of being returned, and links it already
+    completed are skipped. Phase timings and events are recorded into metrics if given. Drivers
+    are set up from browser_profile (resolve_browser_profile; default: standard).
+    """
     recipes = {}
     recipe_links = set()
     index_url = base_url + index_path
@@ -469,211 +1426,1068 @@ def scrape_gaming_tools_recipes_selenium(base_url="https://vrising.gaming.tools"
     item_image_dir = os.path.join(image_base_dir, "items")
     os.makedirs(item_image_dir, exist_ok=True) # Ensure base dir exists
 
-    # Setup WebDriver using webdriver-manager
-    options = webdriver.ChromeOptions()
-    # options.add_argument("--headless") # Optional: run headless
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36") # Update user agent
-    
+    progress = {"parsed": 0, "errors": 0, "total": 0}
     driver = None # Initialize driver variable
     try:
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
-        driver.implicitly_wait(5) # Implicit wait for elements
+        # Resolve the chromedriver binary once; every worker shares it
+        driver_path = ChromeDriverManager().install()
 
         # 1. Fetch index page and get links
-        print(f"Navigating to index page: {index_url}")
-        driver.get(index_url)
-        wait = WebDriverWait(driver, 20) # Explicit wait (up to 20 seconds)
+        driver = create_chrome_driver(driver_path, browser_profile)
+        recipe_links = scrape_recipe_index(driver, base_url, index_url, archive)
+        driver.quit()
+        driver = None
+        if not recipe_links:
+            return {}
+        recipe_links = _skip_completed_links(recipe_links, journal)
 
-        # Wait for the recipe grid to be present
-        # Use a simpler, potentially more stable selector
-        grid_selector = "main > div.grid.grid-cols-1" 
-        try:
-             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, grid_selector)))
-             print("Recipe grid located.")
-             recipe_grid = driver.find_element(By.CSS_SELECTOR, grid_selector)
-             links_elements = recipe_grid.find_elements(By.TAG_NAME, 'a')
-             count = 0
-             for link_element in links_elements:
-                 href = link_element.get_attribute('href')
-                 if href and href.startswith(base_url + '/recipes/'):
-                     # Get the relative path
-                     relative_href = href.replace(base_url, '') 
-                     if relative_href.count('/') == 2: # Simple check for /recipes/xxx
-                         recipe_links.add(relative_href)
-                         count += 1
-             print(f"Found {len(recipe_links)} unique potential recipe links.")
-             if not recipe_links:
-                 print("Error: No recipe links found in the grid. Page source snippet:")
-                 print(driver.page_source[:1000]) # Print source if links not found
-                 return {}
-        except TimeoutException:
-             print("Error: Timed out waiting for recipe grid to load.")
-             print(f"Page title: {driver.title}")
-             print(f"Current URL: {driver.current_url}")
-             # print(driver.page_source[:2000]) # Debug: print page source
-             return {}
+        # 2. Fan the recipe links out to a pool of drivers sharing one queue
+        progress["total"] = len(recipe_links)
+        if recipe_links:
+            scrape_recipe_links_selenium(base_url, recipe_links, workers, recipes, progress, threading.Lock(), driver_path, archive, journal, metrics, browser_profile)
 
-        # 2. Loop through each recipe link and scrape the individual page
-        parsed_count = 0
-        error_count = 0
-        total_links = len(recipe_links)
-        for link_num, link in enumerate(list(recipe_links)): 
-            recipe_url = base_url + link
-            # print(f"  Navigating to recipe {link_num + 1}/{total_links}: {recipe_url}")
-            
-            try:
-                driver.get(recipe_url)
-                # Wait for the main content elements: Title and at least one table caption
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.header-title")))
-                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "table caption"))) 
-
-                # --- Parse Recipe Page using Selenium's finders --- 
-                output_item_name = None
-                output_qty = 1
-                inputs = {}
-                image_url = None
-                local_image_path = None # Store local path here
-                workstation = "Unknown"
-                description = ""
-                rarity = "common" # Default rarity
+    except Exception as main_e:
+        print(f"An error occurred during Selenium setup or index page processing: {main_e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        if driver:
+            print("Closing WebDriver.")
+            driver.quit()
 
-                try:
-                    output_item_name = driver.find_element(By.CSS_SELECTOR, "h1.header-title").text.strip()
-                except NoSuchElementException:
-                    print(f"    Warning: Could not find output item name tag for {recipe_url}")
-                    error_count += 1
-                    continue
-                
-                # Get output quantity
-                try:
-                    outputs_caption = driver.find_element(By.XPATH, "//caption[contains(text(), 'Outputs')]")
-                    outputs_table = outputs_caption.find_element(By.XPATH, "./parent::table")
-                    output_amount_cell = outputs_table.find_element(By.CSS_SELECTOR, "tbody tr td:last-child")
-                    output_qty = int(output_amount_cell.text.strip())
-                except (NoSuchElementException, ValueError):
-                    # print(f"    Info: Could not find/parse output quantity for {output_item_name}, defaulting to 1.")
-                    output_qty = 1
-                    
-                # Get required ingredients
-                try:
-                    req_caption = driver.find_element(By.XPATH, "//caption[contains(text(), 'Requirements')]")
-                    req_table = req_caption.find_element(By.XPATH, "./parent::table")
-                    req_rows = req_table.find_elements(By.CSS_SELECTOR, "tbody tr")
-                    for row in req_rows:
-                        cols = row.find_elements(By.TAG_NAME, 'td')
-                        if len(cols) >= 2:
-                            try:
-                                ingredient_name_element = cols[0].find_element(By.TAG_NAME, 'a')
-                                ingredient_name = ingredient_name_element.text.strip()
-                                if not ingredient_name: # Fallback using image alt
-                                     img = cols[0].find_element(By.TAG_NAME, 'img')
-                                     ingredient_name = img.get_attribute('alt').strip()
-                                
-                                quantity = int(cols[-1].text.strip())
-                                if ingredient_name and quantity > 0:
-                                    inputs[ingredient_name] = quantity
-                            except (NoSuchElementException, ValueError, IndexError):
-                                print(f"    Warning: Could not parse an ingredient row for {output_item_name}")
-                except NoSuchElementException:
-                    # It's okay if requirements table doesn't exist (e.g., base items)
-                    # print(f"    Info: No Requirements table found for {output_item_name}.")
-                    pass
-
-                # Get image URL
-                try:
-                    # Find the specific div containing the main image
-                    img_container = driver.find_element(By.CSS_SELECTOR, "div.tooltip-body > div.w-\[128px\].h-\[128px\].absolute")
-                    img_element = img_container.find_element(By.TAG_NAME, "img")
-                    image_url = img_element.get_attribute('src')
-                except NoSuchElementException:
-                    # print(f"    Warning: Could not find image for {output_item_name}")
-                    image_url = None
-
-                # Get workstation
-                try:
-                    ws_caption = driver.find_element(By.XPATH, "//caption[contains(text(), 'Workstations')]")
-                    ws_table = ws_caption.find_element(By.XPATH, "./parent::table")
-                    # Assume first workstation listed is the primary one
-                    ws_link = ws_table.find_element(By.CSS_SELECTOR, "tbody tr td a") 
-                    workstation = ws_link.text.strip()
-                except NoSuchElementException:
-                    # print(f"    Info: No workstation table found for {output_item_name}.")
-                    workstation = "Unknown" # Or maybe "Inventory" / "By Hand"?
-                    
-                # Get description
-                try:
-                     desc_element = driver.find_element(By.CSS_SELECTOR, "p.header-desc")
-                     description = desc_element.text.strip()
-                except NoSuchElementException:
-                     description = "" # Optional
+    print(f"--- Scraping finished. Successfully processed {progress['parsed']} recipes. Encountered {progress['errors']} errors. ---")
+
+    # Image download stage: runs once every page is parsed, so it never blocks navigation
+    if journal:
+        download_journal_images(journal, item_image_dir, workers=image_workers, metrics=metrics)
+    else:
+        download_recipe_images(recipes, item_image_dir, workers=image_workers, metrics=metrics)
+    return recipes
 
-                # Get Image URL and Download Image
+# --- Browser-free HTTP scraping ---
+
+def create_http_session(pool_size=16):
+    """Creates a keep-alive requests.Session whose connection pool fits pool_size concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({'User-Agent': BROWSER_USER_AGENT})
+    return session
+
+def scrape_recipe_index_http(session, base_url, index_url, archive=None):
+    """Collects the relative /recipes/xxx links from the server-rendered index page."""
+    print(f"Fetching index page: {index_url}")
+    response = session.get(index_url, timeout=20)
+    response.raise_for_status()
+    if archive:
+        archive.record(index_url, response.text)
+    recipe_links = parse_recipe_index_html(response.text, base_url, index_url)
+    print(f"Found {len(recipe_links)} unique potential recipe links.")
+    return recipe_links
+
+def parse_recipe_index_html(html, base_url, index_url):
+    """Extracts the relative /recipes/xxx links from index page HTML."""
+    recipe_links = set()
+    soup = BeautifulSoup(html, 'html.parser')
+    for link_element in soup.select("main > div.grid.grid-cols-1 a[href]"):
+        href = urljoin(index_url, link_element['href'])
+        if href.startswith(base_url + '/recipes/'):
+            relative_href = href.replace(base_url, '')
+            if relative_href.count('/') == 2: # Simple check for /recipes/xxx
+                recipe_links.add(relative_href)
+    return recipe_links
+
+def _element_text(element):
+    """Returns an element's text roughly as the browser renders it (<br> becomes a newline)."""
+    parts = []
+    for node in element.descendants:
+        if isinstance(node, NavigableString):
+            parts.append(str(node))
+        elif node.name == 'br':
+            parts.append("\n")
+    return "".join(parts).strip()
+
+def _find_captioned_table(soup, caption_text):
+    """Finds the table whose <caption> contains caption_text (mirrors //caption[contains(text(), ...)]/parent::table)."""
+    caption = soup.find(lambda tag: tag.name == 'caption' and caption_text in tag.get_text())
+    if caption and caption.parent is not None and caption.parent.name == 'table':
+        return caption.parent
+    return None
+
+def extract_recipe_fields_html(html, recipe_url):
+    """Extracts recipe fields from static page HTML with BeautifulSoup.
+
+    Returns the same fields as extract_recipe_fields_selenium, or None when the static HTML
+    lacks the title or the recipe tables (i.e. the page needs a browser to render).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.select_one("h1.header-title")
+    if not title or not soup.select_one("table caption"):
+        return None
+    output_item_name = _element_text(title)
+    if not output_item_name:
+        return None
+
+    output_qty = 1
+    inputs = {}
+    image_url = None
+    workstation = "Unknown"
+    description = ""
+
+    # Get output quantity
+    outputs_table = _find_captioned_table(soup, 'Outputs')
+    if outputs_table:
+        output_amount_cell = outputs_table.select_one("tbody tr td:last-child")
+        try:
+            output_qty = int(_element_text(output_amount_cell))
+        except (TypeError, ValueError, AttributeError):
+            output_qty = 1
+
+    # Get required ingredients
+    req_table = _find_captioned_table(soup, 'Requirements')
+    if req_table:
+        for row in req_table.select("tbody tr"):
+            cols = row.find_all('td')
+            if len(cols) >= 2:
                 try:
-                    if image_url:
-                        filename = get_safe_filename_from_url(image_url)
-                        if filename:
-                            # Use the specific item image directory
-                            local_image_path = os.path.join(item_image_dir, filename).replace("\\", "/") # Use forward slashes for consistency
-                            if not os.path.exists(local_image_path): # Only download if it doesn't exist
-                                if download_image(image_url, local_image_path):
-                                    pass # Success message is inside download_image
-                                else:
-                                    local_image_path = None # Download failed
-                            else:
-                                # print(f"    Image already exists: {local_image_path}")
-                                pass
-                        else:
-                             print(f"    Warning: Could not generate filename for image URL: {image_url}")
-                except NoSuchElementException:
-                    image_url = None # Keep image_url as None if not found
-                
-                # Store the enriched recipe data with local image path
-                if output_item_name:
-                    if output_item_name in recipes:
-                        pass
-                    recipes[output_item_name] = {
-                        "output_qty": output_qty,
-                        "inputs": inputs,
-                        "local_image_path": local_image_path, # Changed from image_url
-                        "workstation": workstation,
-                        "description": description,
-                        "rarity": rarity
-                    }
-                    parsed_count += 1
-            
-            except TimeoutException:
-                 print(f"Error: Timed out waiting for elements on recipe page {recipe_url}")
-                 error_count += 1
+                    ingredient_name = _element_text(cols[0].find('a'))
+                    if not ingredient_name: # Fallback using image alt
+                        ingredient_name = cols[0].find('img').get('alt', '').strip()
+
+                    quantity = int(_element_text(cols[-1]))
+                    if ingredient_name and quantity > 0:
+                        inputs[ingredient_name] = quantity
+                except (AttributeError, ValueError):
+                    print(f"    Warning: Could not parse an ingredient row for {output_item_name}")
+
+    # Get image URL
+    img_element = soup.select_one(r"div.tooltip-body > div.w-\[128px\].h-\[128px\].absolute img")
+    if img_element and img_element.get('src'):
+        image_url = urljoin(recipe_url, img_element['src'])
+
+    # Get workstation
+    ws_table = _find_captioned_table(soup, 'Workstations')
+    if ws_table:
+        ws_link = ws_table.select_one("tbody tr td a")
+        if ws_link:
+            workstation = _element_text(ws_link)
+
+    # Get description
+    desc_element = soup.select_one("p.header-desc")
+    if desc_element:
+        description = _element_text(desc_element)
+
+    return {
+        "name": output_item_name,
+        "output_qty": output_qty,
+        "inputs": inputs,
+        "image_url": image_url,
+        "workstation": workstation,
+        "description": description,
+    }
+
+def _scrape_recipe_page_http(session, recipe_url, archive=None, metrics=None):
+    """Fetches and parses one recipe page over HTTP. Returns (item_name, recipe), or None if it needs a browser."""
+    with _timed(metrics, "navigation", recipe_url):
+        response = session.get(recipe_url, timeout=20)
+        response.raise_for_status()
+        html = response.text
+    if archive:
+        archive.record(recipe_url, html)
+    with _timed(metrics, "extraction", recipe_url):
+        fields = extract_recipe_fields_html(html, recipe_url)
+    if fields is None:
+        return None
+    _record_missing_fields(fields, recipe_url, metrics)
+    return build_recipe_record(fields)
+
+def scrape_gaming_tools_recipes_http(base_url="https://vrising.gaming.tools", index_path="/recipes", workers=16, selenium_workers=2, image_workers=8, archive=None, journal=None, metrics=None, browser_profile=None):
+    """Scrapes recipe data over plain HTTP, using Selenium only for pages whose static HTML is incomplete.
+
+    The journal, metrics and browser_profile behave as in scrape_gaming_tools_recipes_selenium.
+    """
+    recipes = {}
+    index_url = base_url + index_path
+    print(f"--- Scraping recipe index from: {index_url} over HTTP ---")
+
+    # Define image directory
+    image_base_dir = "images"
+    item_image_dir = os.path.join(image_base_dir, "items")
+    os.makedirs(item_image_dir, exist_ok=True) # Ensure base dir exists
+
+    progress = {"parsed": 0, "errors": 0, "total": 0}
+    lock = threading.Lock()
+    fallback_links = []
+    session = create_http_session(workers)
+    try:
+        try:
+            recipe_links = scrape_recipe_index_http(session, base_url, index_url, archive)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching index page {index_url}: {e}")
+            recipe_links = set()
+        if not recipe_links:
+            print("No recipe links in the static index page, falling back to the Selenium scraper.")
+            return scrape_gaming_tools_recipes_selenium(base_url, index_path, workers=selenium_workers, image_workers=image_workers, archive=archive, journal=journal, metrics=metrics, browser_profile=browser_profile)
+        recipe_links = _skip_completed_links(recipe_links, journal)
+
+        progress["total"] = len(recipe_links)
+        print(f"Fetching {len(recipe_links)} recipe pages with {workers} HTTP worker(s)...")
+
+        def fetch_one(link):
+            recipe_url = base_url + link
+            try:
+                result = _scrape_recipe_page_http(session, recipe_url, archive, metrics)
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching recipe page {recipe_url}: {e}")
+                if metrics:
+                    metrics.event("timeout" if isinstance(e, requests.exceptions.Timeout) else "error", recipe_url)
+                result = None
             except Exception as page_e:
                 print(f"Error processing recipe page {recipe_url}: {page_e}")
-                error_count += 1
-            
-            if (parsed_count + error_count) % 50 == 0 and (parsed_count + error_count) > 0:
-                 print(f"  Processed {parsed_count + error_count} / {total_links} links (Recipes: {parsed_count}, Errors: {error_count})")
+                if metrics:
+                    metrics.event("error", recipe_url)
+                result = None
+            else:
+                if result is None:
+                    # Static HTML lacks the recipe content; leave it for the browser
+                    if metrics:
+                        metrics.event("fallback", recipe_url)
+                    with lock:
+                        fallback_links.append(link)
+                    return
+            _record_page_result(link, result, recipes, progress, lock, journal)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(fetch_one, recipe_links))
+
+        if fallback_links:
+            print(f"{len(fallback_links)} pages need a browser, falling back to Selenium for them.")
+            driver_path = ChromeDriverManager().install()
+            scrape_recipe_links_selenium(base_url, fallback_links, selenium_workers, recipes, progress, lock, driver_path, archive, journal, metrics, browser_profile)
 
     except Exception as main_e:
-        print(f"An error occurred during Selenium setup or index page processing: {main_e}")
+        print(f"An error occurred during HTTP scraping: {main_e}")
         import traceback
         traceback.print_exc()
     finally:
-        if driver:
-            print("Closing WebDriver.")
-            driver.quit()
+        session.close()
 
-    print(f"--- Scraping finished. Successfully processed {parsed_count} recipes. Encountered {error_count} errors. ---")
+    print(f"--- Scraping finished. Successfully processed {progress['parsed']} recipes ({len(fallback_links)} via Selenium fallback). Encountered {progress['errors']} errors. ---")
+
+    # Image download stage: runs once every page is parsed, so it never blocks navigation
+    if journal:
+        download_journal_images(journal, item_image_dir, workers=image_workers, metrics=metrics)
+    else:
+        download_recipe_images(recipes, item_image_dir, workers=image_workers, metrics=metrics)
+    return recipes
+
+class _FixtureSiteHandler(http.server.BaseHTTPRequestHandler):
+    """A miniature gaming.tools for check_http_mode: /recipes lists the saved pages in server.fixture_pages,
+    /recipes/<slug> serves one, /icons/<file> serves a stand-in icon."""
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        pages = self.server.fixture_pages
+        if path == "/recipes":
+            links = "".join(f'<a href="/recipes/{slug}">{slug}</a>' for slug in sorted(pages))
+            body, content_type = f'<html><body><main><div class="grid grid-cols-1">{links}</div></main></body></html>'.encode('utf-8'), "text/html; charset=utf-8"
+        elif path.startswith("/recipes/") and path[len("/recipes/"):] in pages:
+            body, content_type = pages[path[len("/recipes/"):]], "text/html; charset=utf-8"
+        elif path.startswith("/icons/"):
+            body, content_type = path.encode('utf-8'), "image/webp" # Distinct bytes per icon, so none are deduplicated
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Keep the check's output to the scraper's own messages
+
+def check_http_mode(fixture_dir=RECIPE_FIXTURE_DIR):
+    """Runs the http mode end to end against a local http.server serving the saved pages in fixture_dir
+    (through base_url, as --base-url does) and checks each scraped recipe against expected.json.
+
+    The scrape runs in a temporary working directory, so downloaded icons do not touch images/.
+    Returns True when every page produced its expected record.
+    """
+    with open(os.path.join(fixture_dir, "expected.json"), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    pages = {}
+    for filename in expected:
+        with open(os.path.join(fixture_dir, filename), 'rb') as f:
+            pages[filename[:-len(".html")]] = f.read()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _FixtureSiteHandler)
+    server.fixture_pages = pages
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"--- Checking http mode against {len(pages)} saved pages in {fixture_dir} served at {base_url} ---")
+
+    problems = []
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="http-mode-check-")
+    try:
+        os.chdir(work_dir) # The scraper writes images/ relative to the working directory
+        recipes = scrape_gaming_tools_recipes_http(base_url=base_url, workers=4, image_workers=4)
+        for filename, fields in sorted(expected.items()):
+            recipe = recipes.get(fields["name"])
+            if recipe is None:
+                problems.append(f"{filename}: no recipe named {fields['name']!r}")
+                continue
+            for field in ("output_qty", "inputs", "workstation", "description"):
+                if recipe.get(field) != fields[field]:
+                    problems.append(f"{filename}: {field} is {recipe.get(field)!r}, expected {fields[field]!r}")
+            # The icon is fetched from the local server, so only its file name can match expected.json's URL
+            icon_path = os.path.join("images", "items", get_safe_filename_from_url(fields["image_url"])).replace("\\", "/")
+            if recipe.get("local_image_path") != icon_path or not os.path.exists(icon_path):
+                problems.append(f"{filename}: icon saved as {recipe.get('local_image_path')!r}, expected {icon_path!r}")
+        extra = sorted(set(recipes) - {fields["name"] for fields in expected.values()})
+        if extra:
+            problems.append(f"Unexpected recipes: {', '.join(extra)}")
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for problem in problems:
+        print(f"  MISMATCH {problem}")
+    print(f"http mode check: {len(problems)} problem(s) in {len(expected)} pages." if problems else f"http mode check: all {len(expected)} pages OK.")
+    return not problems
+
+# --- Checkpoint journal (crash-safe scraping and --resume) ---
+
+class RecipeJournal:
+    """Append-only JSONL log of scraped pages, written as each page completes.
+
+    Each line is {"link", "status": "ok", "name", "recipe"} or {"link", "status": "error"}; for a link
+    the last line wins. Lines are fsynced, so a crash loses at most the page being written.
+    """
+
+    def __init__(self, filename=RECIPE_JOURNAL_FILE, resume=False):
+        self.filename = filename
+        self._lock = threading.Lock()
+        if not resume and os.path.exists(filename):
+            os.remove(filename)
+        # A crash can leave a torn last line; start new entries on a fresh line
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            with open(filename, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+            if needs_newline:
+                with open(filename, 'a', encoding='utf-8') as f:
+                    f.write("\n")
+
+    def append(self, link, result):
+        """Records one page outcome: result is (item_name, recipe), or None for a failed page."""
+        if result is None:
+            entry = {"link": link, "status": "error"}
+        else:
+            output_item_name, recipe = result
+            entry = {"link": link, "status": "ok", "name": output_item_name, "recipe": recipe}
+        line = json.dumps(entry, sort_keys=True) + "\n"
+        with self._lock:
+            with open(self.filename, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _iter_entries(self):
+        """Yields (offset, entry) for every readable line, skipping a torn trailing line."""
+        try:
+            with open(self.filename, 'rb') as f:
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    try:
+                        yield offset, json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def _latest_by_link(self):
+        """Returns {link: (status, name, offset)} for the last entry of each link."""
+        latest = {}
+        for offset, entry in self._iter_entries():
+            latest[entry["link"]] = (entry["status"], entry.get("name"), offset)
+        return latest
+
+    def completed_links(self):
+        """Links whose latest entry parsed successfully; --resume skips these."""
+        return {link for link, (status, _, _) in self._latest_by_link().items() if status == "ok"}
+
+    def image_urls(self):
+        """Streams the image URLs of completed pages."""
+        for _, entry in self._iter_entries():
+            if entry["status"] == "ok" and entry["recipe"].get("image_url"):
+                yield entry["recipe"]["image_url"]
+
+    def iter_recipes(self):
+        """Yields (item_name, recipe) sorted by name, reading one record at a time from disk.
+
+        Only the name -> offset index is held in memory; for repeated names the latest page wins.
+        """
+        offsets = {}
+        for status, name, offset in sorted(self._latest_by_link().values(), key=lambda v: v[2]):
+            if status == "ok":
+                offsets[name] = offset
+        with open(self.filename, 'rb') as f:
+            for name in sorted(offsets):
+                f.seek(offsets[name])
+                entry = json.loads(f.readline())
+                yield name, entry["recipe"]
+
+def download_journal_images(journal, item_image_dir, workers=8, metrics=None):
+    """Image download stage for journaled scrapes; local paths are resolved from the image cache at build time."""
+    download_images(journal.image_urls(), item_image_dir, workers=workers, metrics=metrics)
+
+def iter_journal_recipes_with_images(journal, item_image_dir):
+    """Streams journal recipes with image_url replaced by the downloaded local_image_path."""
+    cache = _load_image_cache(os.path.join(item_image_dir, IMAGE_CACHE_FILENAME))
+    for name, recipe in journal.iter_recipes():
+        image_url = recipe.pop("image_url", None)
+        cached_path = cache.get(image_url, {}).get("path") if image_url else None
+        recipe["local_image_path"] = cached_path if cached_path and os.path.exists(cached_path) else None
+        yield name, recipe
+
+# --- Multi-source ingest and merge ---
+
+# Recipe sources in default precedence order (first wins); --sources picks and reorders them
+RECIPE_SOURCES = ["gaming_tools", "item_recipes", "additional_recipes"]
+
+# Local wiki sources: streaming parser and file, run in the ingest process pool
+WIKI_SOURCE_PARSERS = {
+    "item_recipes": (iter_item_recipes, "Item_Recipes.html"),
+    "additional_recipes": (iter_additional_recipes, "AdditionalRecipes.html"),
+}
+
+# Shape of a recipes.json record; sources that only know some fields get the rest from here
+RECIPE_DEFAULTS = {
+    "output_qty": 1,
+    "inputs": {},
+    "local_image_path": None,
+    "workstation": "Unknown",
+    "description": "",
+    "rarity": "common",
+}
+
+def _is_missing_field(field, value):
+    """True when a field holds a placeholder that a lower-precedence source may fill in."""
+    if value is None or value == "" or value == {}:
+        return True
+    return field == "workstation" and value == "Unknown"
+
+def merge_recipe_sources(sources, report):
+    """Merges name-sorted (name, recipe) streams, given as [(source_name, items)] in precedence order.
+
+    For each recipe the highest-precedence source wins; fields it leaves empty (e.g. workstation
+    "Unknown") are filled from the next source that has them. Streams are merged lazily, so a
+    journal-backed source is never loaded whole. report[name] records the winner and filled fields.
+    """
+    def ranked(rank, items):
+        for name, recipe in items:
+            yield name, rank, recipe
+
+    streams = [ranked(rank, items) for rank, (_, items) in enumerate(sources)]
+    for name, group in groupby(heapq.merge(*streams, key=lambda entry: (entry[0], entry[1])), key=lambda entry: entry[0]):
+        candidates = [(sources[rank][0], recipe) for _, rank, recipe in group]
+        winner_source, winner = candidates[0]
+        merged = dict(RECIPE_DEFAULTS)
+        merged.update(winner)
+        filled = {}
+        for field in RECIPE_DEFAULTS:
+            if not _is_missing_field(field, merged[field]):
+                continue
+            for source_name, recipe in candidates[1:]:
+                if not _is_missing_field(field, recipe.get(field)):
+                    merged[field] = recipe[field]
+                    filled[field] = source_name
+                    break
+        report[name] = {"source": winner_source, "filled": filled}
+        yield name, merged
+
+def _parse_wiki_source(source_name, spool_dir):
+    """Process-pool task: streams one local wiki source into its JSONL spool in spool_dir. Returns the spool's filename."""
+    stream_fn, filename = WIKI_SOURCE_PARSERS[source_name]
+    spool_file = os.path.join(spool_dir, WIKI_SPOOL_FILE.format(source=source_name))
+    write_recipes_jsonl(stream_fn(filename), spool_file)
+    return spool_file
+
+def write_merge_report(report, filename=MERGE_REPORT_FILE):
+    """Saves which source won each recipe (and which filled its fields) and prints a summary."""
+    winners = Counter(entry["source"] for entry in report.values())
+    fills = Counter(f"{field} <- {source}" for entry in report.values() for field, source in entry["filled"].items())
+    with open(filename, "w", encoding='utf-8') as f:
+        json.dump({"winners": dict(winners), "fills": dict(fills), "recipes": report}, f, indent=4, sort_keys=True)
+    print(f"Merge: recipes per winning source {dict(winners)}")
+    for fill, count in sorted(fills.items()):
+        print(f"  Filled {fill}: {count}")
+    print(f"Saved merge report to {filename}")
+
+# --- Output ---
+
+def clean_recipes(items, stats):
+    """Cleanup filter over (name, recipe) pairs: drops recipes without an inputs dict or that list themselves.
+
+    Counts the removed recipes in stats["removed"].
+    """
+    for name, data in items:
+        # Check if inputs exist and is a dict. Allow empty inputs dict for now.
+        if isinstance(data.get('inputs'), dict) and name not in data.get("inputs",{}):
+            yield name, data
+        else:
+            # print(f"Removing potentially invalid/self-referencing recipe: {name}")
+            stats["removed"] += 1
+
+def write_recipes_json(items, filename="recipes.json"):
+    """Writes name-sorted (name, recipe) pairs as the same indented JSON object json.dump would, one recipe at a time."""
+    count = 0
+    with open(filename, "w", encoding='utf-8') as f:
+        for name, data in items:
+            f.write("{\n" if count == 0 else ",\n")
+            # Dump a one-key object and strip its braces to get the indented member text
+            f.write(json.dumps({name: data}, indent=4, sort_keys=True)[2:-2])
+            count += 1
+        f.write("\n}" if count else "{}")
+    return count
+
+# --- Compiled frontend bundle ---
+
+def _display_sort_key(name):
+    """Case-insensitive order for the item picker."""
+    return (name.casefold(), name)
+
+def _compact_number(value):
+    """Writes whole floats as ints (4.0 -> 4) to keep the bundle small."""
+    return int(value) if float(value).is_integer() else value
+
+def build_recipe_bundle(recipes, raw_materials, graph=None, unit_costs=None):
+    """Compiles recipes into the frontend's (bundle, meta) pair.
+
+    Items get integer IDs: recipes first (0 .. recipe_count-1, in picker order), then raw and unknown
+    items. Per-recipe arrays hold output_qty, workstation, crafting depth, inputs as flat
+    offsets/ids/qty arrays and the precomputed per-unit raw-material vector in the same layout.
+    Recipes listed as raw materials get no inputs and depth 0, as the calculator treats them as raw.
+    meta holds descriptions and image paths by recipe ID. graph is calculator.compile_recipe_graph's
+    result for recipes and unit_costs their per-unit costs, both computed if not given. Raises
+    ValueError on cyclic recipes.
+    """
+    graph = graph or calculator.compile_recipe_graph(recipes, raw_materials)
+    unit_costs = unit_costs or calculator.compute_unit_costs(recipes, raw_materials, graph)
+    recipe_names = sorted(recipes, key=_display_sort_key)
+    other_names = {ingredient for name in recipe_names for ingredient in (recipes[name].get("inputs") or {}) if ingredient and ingredient not in recipes}
+    other_names.update(material for cost in unit_costs.values() for material in cost if material not in recipes)
+    items = recipe_names + sorted(other_names, key=_display_sort_key)
+    item_ids = {name: item_id for item_id, name in enumerate(items)}
+
+    workstations = sorted({recipes[name].get("workstation") or "Unknown" for name in recipe_names})
+    workstation_ids = {workstation: index for index, workstation in enumerate(workstations)}
+    bundle = {
+        "format": 1,
+        "items": items,
+        "recipe_count": len(recipe_names),
+        "workstations": workstations,
+        "output_qty": [], "workstation": [], "depth": [],
+        "input_offsets": [0], "input_ids": [], "input_qty": [],
+        "cost_offsets": [0], "cost_ids": [], "cost_qty": [],
+    }
+    meta = {"format": 1, "descriptions": [], "images": []}
+    for name in recipe_names:
+        recipe = recipes[name]
+        bundle["output_qty"].append(recipe.get("output_qty") or 1)
+        bundle["workstation"].append(workstation_ids[recipe.get("workstation") or "Unknown"])
+        bundle["depth"].append(graph["depth"].get(name, 0))
+        if name not in raw_materials:
+            for ingredient, amount in (recipe.get("inputs") or {}).items():
+                if ingredient:
+                    bundle["input_ids"].append(item_ids[ingredient])
+                    bundle["input_qty"].append(amount)
+        bundle["input_offsets"].append(len(bundle["input_ids"]))
+        for material, amount in sorted(unit_costs[name].items(), key=lambda entry: item_ids[entry[0]]):
+            bundle["cost_ids"].append(item_ids[material])
+            bundle["cost_qty"].append(_compact_number(amount))
+        bundle["cost_offsets"].append(len(bundle["cost_ids"]))
+        meta["descriptions"].append(recipe.get("description") or "")
+        meta["images"].append(recipe.get("local_image_path"))
+
+    # Lets the page notice a meta file from a different build
+    build_id = hashlib.sha1(json.dumps([bundle, meta], sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    bundle["build_id"] = meta["build_id"] = build_id
+    return bundle, meta
+
+def build_where_used_index(recipes, raw_materials, bundle, graph=None):
+    """Compiles calculator.compute_where_used into flat arrays over the bundle's item IDs.
+
+    For item id, the recipes using it are ids[offsets[id] .. offsets[id + 1]] with qty per unit of
+    each recipe, in "direct" and "transitive" sections.
+    """
+    item_ids = {name: item_id for item_id, name in enumerate(bundle["items"])}
+    index = {"format": 1, "build_id": bundle["build_id"]}
+    for section, usage in zip(("direct", "transitive"), calculator.compute_where_used(recipes, raw_materials, graph)):
+        arrays = {"offsets": [0], "ids": [], "qty": []}
+        for name in bundle["items"]:
+            for recipe_name, qty in sorted(usage.get(name, {}).items(), key=lambda entry: item_ids[entry[0]]):
+                arrays["ids"].append(item_ids[recipe_name])
+                arrays["qty"].append(_compact_number(qty))
+            arrays["offsets"].append(len(arrays["ids"]))
+        index[section] = arrays
+    return index
+
+def normalize_search_text(text):
+    """Folds text for searching: accents and case dropped, apostrophes removed, other punctuation to single spaces.
+
+    Must stay in step with normalizeSearchText in static/js/script.js.
+    """
+    text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    text = re.sub(r"['\u2019]", "", text.lower())
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _load_item_aliases(filename=ITEM_ALIASES_FILE):
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (IOError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable alias file {filename}: {e}")
+        return {}
+
+def build_search_index(bundle, aliases):
+    """Builds the item picker's search index over the bundle's recipe IDs.
+
+    Every recipe's name, aliases and workstation are normalized; "trigrams" maps each 3-character
+    slice of them to the recipe IDs containing it and "prefixes" maps 1- and 2-character word
+    prefixes, for queries too short to have trigrams. The page intersects the posting lists of a
+    query and ranks only those candidates.
+    """
+    names = []
+    item_aliases = {}
+    trigrams = {}
+    prefixes = {}
+    workstations = [normalize_search_text(workstation) for workstation in bundle["workstations"]]
+    for item_id in range(bundle["recipe_count"]):
+        name = normalize_search_text(bundle["items"][item_id])
+        names.append(name)
+        terms = [name]
+        alias_terms = [normalize_search_text(alias) for alias in aliases.get(bundle["items"][item_id], [])]
+        if alias_terms:
+            item_aliases[str(item_id)] = alias_terms
+            terms.extend(alias_terms)
+        terms.append(workstations[bundle["workstation"][item_id]])
+        for term in terms:
+            for trigram in _trigrams(term):
+                postings = trigrams.setdefault(trigram, [])
+                if not postings or postings[-1] != item_id:
+                    postings.append(item_id)
+            for word in term.split():
+                for length in (1, 2):
+                    postings = prefixes.setdefault(word[:length], [])
+                    if not postings or postings[-1] != item_id:
+                        postings.append(item_id)
+    return {
+        "format": 1,
+        "build_id": bundle["build_id"],
+        "names": names,
+        "aliases": item_aliases,
+        "workstations": workstations,
+        "trigrams": dict(sorted(trigrams.items())),
+        "prefixes": dict(sorted(prefixes.items())),
+    }
+
+def build_graph_report(recipes, graph):
+    """graph_report.json content from calculator.compile_recipe_graph: cycles, unresolved inputs
+    (placeholder names from the wiki tables listed apart), recipes per depth level and the build order.
+    """
+    levels = {}
+    for name in graph["order"]:
+        levels.setdefault(graph["depth"][name], []).append(name)
+    return {
+        "recipes": len(recipes),
+        "max_depth": max(levels, default=0),
+        "cycles": graph["cycles"],
+        "placeholders": {name: users for name, users in graph["unresolved"].items() if PLACEHOLDER_NAME_RE.search(name)},
+        "unresolved": {name: users for name, users in graph["unresolved"].items() if not PLACEHOLDER_NAME_RE.search(name)},
+        "levels": {str(level): sorted(names, key=_display_sort_key) for level, names in sorted(levels.items())},
+        "order": graph["order"],
+    }
+
+def compile_recipes(recipes, raw_materials, strict=False, report_file=GRAPH_REPORT_FILE):
+    """Build-time compile stage: checks the recipe graph and writes report_file.
+
+    Cycles and unresolved inputs (neither a recipe nor raw, so the calculator would count them as raw
+    materials) are printed as warnings, and recipes on a cycle are dropped so everything downstream
+    works on an acyclic graph. With strict either one fails the build instead. Returns (recipes, graph),
+    or None if strict and problems were found.
+    """
+    graph = calculator.compile_recipe_graph(recipes, raw_materials)
+    report = build_graph_report(recipes, graph)
+    with open(report_file, "w", encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+
+    for cycle in report["cycles"]:
+        print(f"Warning: Recipe cycle between {', '.join(cycle)}")
+    for section, label in (("placeholders", "Placeholder ingredient"), ("unresolved", "Unresolved ingredient")):
+        for name, users in report[section].items():
+            print(f"Warning: {label} '{name}' (used by {len(users)} recipe(s), e.g. {users[0]!r}) is neither a recipe nor a raw material")
+    problems = len(report["cycles"]) + len(report["placeholders"]) + len(report["unresolved"])
+    print(f"Compiled {len(graph['order'])} recipes into {report['max_depth']} depth levels, {problems} problem(s); saved {report_file}")
+    if problems and strict:
+        print(f"Error: Recipe graph has {problems} problem(s) and --strict is set, see {report_file}")
+        return None
+
+    if graph["cycles"]:
+        recipes = calculator.without_cycles(recipes, graph)
+        print(f"Dropped {sum(len(cycle) for cycle in graph['cycles'])} recipes on cycles; they are treated as raw materials.")
+        graph = calculator.compile_recipe_graph(recipes, raw_materials)
+    return recipes, graph
+
+def refresh_cost_table(recipes, raw_materials, graph, filename=COST_TABLE_FILE):
+    """Loads the last build's calculator.CostTable from filename and updates it to recipes, recomputing
+    only the changed recipes and their consumers; builds it from scratch if there is none."""
+    try:
+        table = calculator.CostTable.load(filename)
+        recomputed = table.refresh(recipes, raw_materials)
+        print(f"Cost table: recomputed {len(recomputed)} of {len(table.costs)} recipes.")
+        return table
+    except FileNotFoundError:
+        pass
+    except (IOError, ValueError, KeyError, TypeError) as e:
+        print(f"Warning: Rebuilding {filename}: {e}")
+    table = calculator.CostTable(recipes, raw_materials, graph)
+    print(f"Cost table: computed all {len(table.costs)} recipes.")
+    return table
+
+def write_recipe_bundle(recipes_file="recipes.json", raw_materials_file="raw_materials.json", bundle_file=RECIPE_BUNDLE_FILE, meta_file=RECIPE_META_FILE, where_used_file=WHERE_USED_FILE, search_index_file=SEARCH_INDEX_FILE, store_file=binary_store.RECIPE_STORE_FILE, cost_table_file=COST_TABLE_FILE, strict=False):
+    """Compiles the written recipes.json/raw_materials.json into the frontend bundle, meta, where-used and search files,
+    and copies them into the binary recipe store for Python consumers. The cost table they are priced from is
+    saved to cost_table_file for the next build to refresh.
+
+    Returns False (writing nothing but the graph report) if the data cannot be compiled or the cost table not saved.
+    """
+    try:
+        recipes, raw_materials = calculator.load_recipe_data(recipes_file, raw_materials_file)
+        source_recipes = recipes # The store mirrors recipes.json as written, cycles included
+        compiled = compile_recipes(recipes, raw_materials, strict=strict)
+        if compiled is None:
+            return False
+        recipes, graph = compiled
+        cost_table = refresh_cost_table(recipes, raw_materials, graph, cost_table_file)
+        bundle, meta = build_recipe_bundle(recipes, raw_materials, graph, cost_table.costs)
+        where_used = build_where_used_index(recipes, raw_materials, bundle, graph)
+        search_index = build_search_index(bundle, _load_item_aliases())
+        cost_table.save(cost_table_file)
+    except (IOError, ValueError) as e:
+        print(f"Error: Could not build {bundle_file}: {e}")
+        return False
+    for filename, data in ((bundle_file, bundle), (meta_file, meta), (where_used_file, where_used), (search_index_file, search_index)):
+        with open(filename, "w", encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+    try:
+        binary_store.write_binary_store(source_recipes, raw_materials, store_file)
+    except (IOError, ValueError) as e:
+        print(f"Error: Could not write {store_file}: {e}")
+        return False
+    sizes = ", ".join(f"{filename} ({os.path.getsize(filename) // 1024} KB)" for filename in (meta_file, where_used_file, search_index_file, store_file))
+    print(f"Saved {bundle_file} ({os.path.getsize(bundle_file) // 1024} KB, {bundle['recipe_count']} recipes, {len(bundle['items'])} items), {sizes}")
+    return True
+
+def publish_dataset_snapshot(snapshot_dir=dataset_versions.SNAPSHOT_DIR):
+    """Publishes recipes.json/raw_materials.json as a dataset version. Only called after a successful build,
+    so data that fails to compile (e.g. under --strict) never becomes a version clients sync to."""
+    try:
+        dataset_versions.publish_snapshot(snapshot_dir=snapshot_dir)
+    except (IOError, ValueError) as e:
+        print(f"Error: Could not publish a dataset snapshot: {e}")
+
+# --- Icon sprite atlases ---
+
+def _prepare_icon(job):
+    """Process-pool task: hashes one icon and downscales it to every size. Returns (path, sha256, {size: RGBA bytes}) or (path, None, error)."""
+    path, sizes = job
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        with Image.open(io.BytesIO(content)) as image:
+            image = image.convert("RGBA")
+            return path, hashlib.sha256(content).hexdigest(), {size: image.resize((size, size), Image.LANCZOS).tobytes() for size in sizes}
+    except (IOError, ValueError) as e:
+        return path, None, str(e)
+
+def build_sprite_atlases(recipes_file="recipes.json", atlas_dir=SPRITE_ATLAS_DIR, index_file=SPRITE_INDEX_FILE, sizes=SPRITE_SIZES, workers=None):
+    """Packs every recipe icon into a few sprite sheets per size and writes the name -> position index.
+
+    Icons are hashed and downscaled in a process pool; identical icons (by content hash) share one
+    cell. All sizes use the same layout, so an entry [atlas, column, row] is valid at every size.
+    """
+    if Image is None:
+        print("Warning: Pillow is not installed, skipping the sprite atlases.")
+        return False
+    try:
+        with open(recipes_file, 'r', encoding='utf-8') as f:
+            recipes = json.load(f)
+    except (IOError, ValueError) as e:
+        print(f"Error: Could not build sprite atlases from {recipes_file}: {e}")
+        return False
+
+    icon_paths = {}
+    for name, recipe in recipes.items():
+        path = recipe.get("local_image_path")
+        if path and os.path.exists(path):
+            icon_paths[name] = path
+    unique_paths = sorted(set(icon_paths.values()))
+    if not unique_paths:
+        print("No recipe icons on disk, skipping the sprite atlases.")
+        return False
+
+    workers = workers or os.cpu_count() or 1
+    print(f"--- Building sprite atlases from {len(unique_paths)} icons with {workers} process(es) ---")
+    cell_by_hash = {}
+    cell_by_path = {}
+    cells = [] # Downscaled pixels of each unique icon, in cell order
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, sha256, result in executor.map(_prepare_icon, [(path, tuple(sizes)) for path in unique_paths], chunksize=8):
+            if sha256 is None:
+                print(f"    Warning: Could not read icon {path}: {result}")
+                continue
+            if sha256 not in cell_by_hash:
+                cell_by_hash[sha256] = len(cells)
+                cells.append(result)
+            cell_by_path[path] = cell_by_hash[sha256]
+
+    per_atlas = SPRITE_ATLAS_COLUMNS * SPRITE_ATLAS_ROWS
+    atlas_count = (len(cells) + per_atlas - 1) // per_atlas
+    os.makedirs(atlas_dir, exist_ok=True)
+    atlases = {}
+    for size in sizes:
+        atlases[str(size)] = []
+        for atlas_index in range(atlas_count):
+            atlas_cells = cells[atlas_index * per_atlas:(atlas_index + 1) * per_atlas]
+            rows = (len(atlas_cells) + SPRITE_ATLAS_COLUMNS - 1) // SPRITE_ATLAS_COLUMNS
+            sheet = Image.new("RGBA", (SPRITE_ATLAS_COLUMNS * size, rows * size), (0, 0, 0, 0))
+            for cell_index, pixels in enumerate(atlas_cells):
+                column, row = cell_index % SPRITE_ATLAS_COLUMNS, cell_index // SPRITE_ATLAS_COLUMNS
+                sheet.paste(Image.frombytes("RGBA", (size, size), pixels[size]), (column * size, row * size))
+            atlas_path = os.path.join(atlas_dir, f"icons-{size}-{atlas_index}.webp").replace("\\", "/")
+            sheet.save(atlas_path, "WEBP", quality=90, method=6)
+            atlases[str(size)].append(atlas_path)
+
+    icons = {}
+    for name, path in sorted(icon_paths.items()):
+        if path in cell_by_path:
+            cell = cell_by_path[path]
+            atlas_index, cell_index = divmod(cell, per_atlas)
+            icons[name] = [atlas_index, cell_index % SPRITE_ATLAS_COLUMNS, cell_index // SPRITE_ATLAS_COLUMNS]
+    index = {
+        "format": 1,
+        "columns": SPRITE_ATLAS_COLUMNS,
+        "sizes": list(sizes),
+        "atlases": atlases,
+        "icons": icons,
+        # Changes whenever the sheets do, so the page can bust cached copies
+        "version": hashlib.sha1("".join(sorted(cell_by_hash)).encode('utf-8')).hexdigest()[:12],
+    }
+    with open(index_file, "w", encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'), sort_keys=True, ensure_ascii=False)
+    atlas_bytes = sum(os.path.getsize(path) for paths in atlases.values() for path in paths)
+    print(f"Saved {index_file}: {len(icons)} items on {len(cells)} unique icons ({len(unique_paths) - len(cells)} duplicates), {atlas_count} atlas(es) per size, {atlas_bytes // 1024} KB in total")
+    return True
+
+# --- Raw page archive (record / replay) ---
+
+class PageArchive:
+    """Append-only, gzip-compressed store of fetched pages keyed by URL and fetch time.
+
+    Layout: <archive_dir>/index.jsonl holds one {"url", "fetched_at", "file"} line per capture and
+    <archive_dir>/pages/ holds the compressed HTML. Safe to record into from several threads.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.pages_dir = os.path.join(archive_dir, "pages")
+        self.index_file = os.path.join(archive_dir, "index.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(self.pages_dir, exist_ok=True)
+
+    def record(self, url, html):
+        """Stores one capture of url. Failures are reported but never abort the scrape."""
+        fetched_at = time.time()
+        url_key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        filename = f"{url_key}-{int(fetched_at * 1000)}.html.gz"
+        try:
+            with gzip.open(os.path.join(self.pages_dir, filename), 'wt', encoding='utf-8') as f:
+                f.write(html)
+            entry = {
+                "url": url,
+                "fetched_at": datetime.fromtimestamp(fetched_at, timezone.utc).isoformat(),
+                "file": "pages/" + filename,
+            }
+            with self._lock:
+                with open(self.index_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + "\n")
+        except IOError as e:
+            print(f"    Warning: Could not archive {url}: {e}")
+
+    def latest_captures(self):
+        """Returns {url: path to the most recent capture}."""
+        latest = {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry["url"] not in latest or entry["fetched_at"] >= latest[entry["url"]]["fetched_at"]:
+                        latest[entry["url"]] = entry
+        except FileNotFoundError:
+            print(f"Error: No page archive index at {self.index_file}")
+        return {url: os.path.join(self.archive_dir, entry["file"]) for url, entry in latest.items()}
+
+def read_archived_page(path):
+    """Reads one compressed page capture."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return f.read()
+
+def _replay_recipe_page(job):
+    """Process-pool task: parses one archived recipe page. Returns (recipe_url, (item_name, recipe) or None)."""
+    recipe_url, path = job
+    try:
+        fields = extract_recipe_fields_html(read_archived_page(path), recipe_url)
+    except Exception as page_e:
+        print(f"Error processing archived page {recipe_url}: {page_e}")
+        return recipe_url, None
+    if fields is None:
+        print(f"    Warning: Archived page {recipe_url} has no recipe content")
+        return recipe_url, None
+    return recipe_url, build_recipe_record(fields)
+
+def resolve_local_images(recipes, item_image_dir):
+    """Offline counterpart of download_recipe_images: maps image_url to images already on disk."""
+    cache = _load_image_cache(os.path.join(item_image_dir, IMAGE_CACHE_FILENAME))
+    for recipe in recipes.values():
+        image_url = recipe.pop("image_url", None)
+        local_image_path = None
+        if image_url:
+            cached_path = cache.get(image_url, {}).get("path")
+            filename = get_safe_filename_from_url(image_url)
+            candidate = cached_path or (os.path.join(item_image_dir, filename).replace("\\", "/") if filename else None)
+            if candidate and os.path.exists(candidate):
+                local_image_path = candidate
+        recipe["local_image_path"] = local_image_path
+
+def replay_recipes_from_archive(archive_dir=PAGE_ARCHIVE_DIR, base_url="https://vrising.gaming.tools", index_path="/recipes", workers=None):
+    """Re-runs the full extraction pipeline over archived pages, with no network or browser, across all cores."""
+    recipes = {}
+    index_url = base_url + index_path
+    print(f"--- Replaying recipes from archive: {archive_dir} ---")
+    captures = PageArchive(archive_dir).latest_captures()
+    if index_url not in captures:
+        print(f"Error: The archive has no capture of the index page {index_url}")
+        return {}
+
+    recipe_links = parse_recipe_index_html(read_archived_page(captures[index_url]), base_url, index_url)
+    jobs = []
+    missing = 0
+    for link in sorted(recipe_links):
+        recipe_url = base_url + link
+        if recipe_url in captures:
+            jobs.append((recipe_url, captures[recipe_url]))
+        else:
+            print(f"    Warning: No archived capture of {recipe_url}")
+            missing += 1
+
+    parsed_count = 0
+    error_count = missing
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for recipe_url, result in executor.map(_replay_recipe_page, jobs, chunksize=16):
+            if result is None:
+                error_count += 1
+                continue
+            output_item_name, recipe = result
+            recipes[output_item_name] = recipe
+            parsed_count += 1
+
+    print(f"--- Replay finished. Successfully processed {parsed_count} recipes with {workers} process(es). Encountered {error_count} errors. ---")
+    resolve_local_images(recipes, os.path.join("images", "items"))
     return recipes
 
 if __name__ == "__main__":
-    raw_materials_list = parse_raw_resources()
+    parser = argparse.ArgumentParser(description="Builds recipes.json and raw_materials.json for the crafting calculator.")
+    parser.add_argument("--mode", choices=["http", "selenium"], default="http", help="http: fetch pages with requests and only use Chrome for pages missing static content; selenium: render every page in Chrome (default: http)")
+    parser.add_argument("--base-url", default="https://vrising.gaming.tools", help="Site to scrape, e.g. a local server of saved pages (default: https://vrising.gaming.tools)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of parallel WebDriver workers used to scrape recipe pages (default: 4)")
+    parser.add_argument("--browser-profile", choices=sorted(BROWSER_PROFILES), default="standard", help="Chrome setup for Selenium: standard (headed, loads everything) or lean (headless, blocks images, fonts, media and non-allowlisted hosts) (default: standard)")
+    parser.add_argument("--allow-host", action="append", default=[], help="Extra host the lean profile may load from (repeatable; wildcards like *.example.com work)")
+    parser.add_argument("--recycle-pages", type=int, default=DRIVER_RECYCLE_PAGES, help=f"Replace each worker's Chrome after this many pages, 0 for never (default: {DRIVER_RECYCLE_PAGES})")
+    parser.add_argument("--max-browser-rss-mb", type=int, default=DRIVER_MAX_RSS_MB, help=f"Replace a worker's Chrome once it uses more memory than this, 0 for no limit; needs psutil (default: {DRIVER_MAX_RSS_MB})")
+    parser.add_argument("--http-workers", type=int, default=16, help="Number of concurrent HTTP fetches in http mode (default: 16)")
+    parser.add_argument("--image-workers", type=int, default=8, help="Number of concurrent image downloads (default: 8)")
+    parser.add_argument("--archive-dir", default=PAGE_ARCHIVE_DIR, help=f"Where fetched pages are archived and replayed from (default: {PAGE_ARCHIVE_DIR})")
+    parser.add_argument("--no-archive", action="store_true", help="Do not archive fetched pages")
+    parser.add_argument("--replay", action="store_true", help="Re-parse the latest archived pages instead of scraping (no network or browser)")
+    parser.add_argument("--journal", default=RECIPE_JOURNAL_FILE, help=f"Checkpoint journal of scraped pages (default: {RECIPE_JOURNAL_FILE})")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted scrape: skip links already in the journal and retry only the rest")
+    parser.add_argument("--sources", default=",".join(RECIPE_SOURCES), help=f"Comma-separated recipe sources in precedence order, first wins (default: {','.join(RECIPE_SOURCES)})")
+    parser.add_argument("--metrics-report", default=SCRAPE_REPORT_FILE, help=f"Where to write per-phase scrape timings and events (default: {SCRAPE_REPORT_FILE})")
+    parser.add_argument("--snapshot-dir", default=dataset_versions.SNAPSHOT_DIR, help=f"Where each successful build's dataset version, delta and manifest are published (default: {dataset_versions.SNAPSHOT_DIR})")
+    parser.add_argument("--strict", action="store_true", help=f"Fail the build on recipe cycles or unresolved ingredients instead of warning (see {GRAPH_REPORT_FILE})")
+    parser.add_argument("--build-only", action="store_true", help=f"Only rebuild {RECIPE_BUNDLE_FILE}, {RECIPE_META_FILE}, {WHERE_USED_FILE}, {SEARCH_INDEX_FILE}, {binary_store.RECIPE_STORE_FILE}, {COST_TABLE_FILE} and the sprite atlases ({SPRITE_INDEX_FILE}) from the existing recipes.json and raw_materials.json, then publish a dataset snapshot if the build succeeded")
+    parser.add_argument("--check-http-mode", action="store_true", help=f"Run the http mode against a local server of the saved pages in {RECIPE_FIXTURE_DIR}, check the records match expected.json, then exit")
+    parser.add_argument("--compare-parsers", action="store_true", help="Time the wiki parsers under html.parser and lxml, check their outputs match, then exit")
+    args = parser.parse_args()
 
-    scraped_recipes = scrape_gaming_tools_recipes_selenium()
+    if args.compare_parsers:
+        sys.exit(0 if compare_wiki_parsers() else 1)
+    if args.check_http_mode:
+        sys.exit(0 if check_http_mode() else 1)
+    if args.build_only:
+        built = write_recipe_bundle(strict=args.strict)
+        if built:
+            publish_dataset_snapshot(args.snapshot_dir)
+        build_sprite_atlases()
+        sys.exit(0 if built else 1)
 
-    merged_recipes = scraped_recipes 
+    sources = [name.strip() for name in args.sources.split(",") if name.strip()]
+    unknown_sources = [name for name in sources if name not in RECIPE_SOURCES]
+    if unknown_sources:
+        parser.error(f"Unknown source(s): {', '.join(unknown_sources)}. Choose from {', '.join(RECIPE_SOURCES)}")
+
+    # Ingest: the wiki files parse in a process pool while the scraper runs in this process
+    scraped_recipes = {}
+    journal = None
+    metrics = None
+    spool_dir = tempfile.mkdtemp(prefix="wiki-spools-") # Removed once recipes.json is written
+    with ProcessPoolExecutor(max_workers=1 + len(WIKI_SOURCE_PARSERS)) as ingest_pool:
+        raw_materials_future = ingest_pool.submit(parse_raw_resources)
+        wiki_futures = {name: ingest_pool.submit(_parse_wiki_source, name, spool_dir) for name in sources if name in WIKI_SOURCE_PARSERS}
+
+        if "gaming_tools" in sources:
+            archive = None if args.no_archive or args.replay else PageArchive(args.archive_dir)
+            journal = None if args.replay else RecipeJournal(args.journal, resume=args.resume)
+            metrics = None if args.replay else ScrapeMetrics()
+            browser_profile = resolve_browser_profile(args.browser_profile, args.base_url, args.allow_host, args.recycle_pages, args.max_browser_rss_mb)
+            if args.replay:
+                scraped_recipes = replay_recipes_from_archive(args.archive_dir, base_url=args.base_url)
+            elif args.mode == "http":
+                scrape_gaming_tools_recipes_http(base_url=args.base_url, workers=args.http_workers, selenium_workers=args.workers, image_workers=args.image_workers, archive=archive, journal=journal, metrics=metrics, browser_profile=browser_profile)
+            else:
+                scrape_gaming_tools_recipes_selenium(base_url=args.base_url, workers=args.workers, image_workers=args.image_workers, archive=archive, journal=journal, metrics=metrics, browser_profile=browser_profile)
+            if metrics:
+                metrics.write_report(args.metrics_report)
 
-    print(f"--- Processing complete. Total recipes found: {len(merged_recipes)} --- ")
+        raw_materials_list = raw_materials_future.result()
+        wiki_spools = {name: future.result() for name, future in wiki_futures.items()}
 
     if raw_materials_list:
         with open("raw_materials.json", "w", encoding='utf-8') as f:
@@ -684,28 +2498,34 @@ if __name__ == "__main__":
             json.dump([], f, indent=4)
          print("Saved empty raw_materials.json")
 
-    if merged_recipes:
-         cleaned_recipes = {}
-         removed_count = 0
-         # Cleanup: Remove recipes with empty inputs (optional), keep others
-         for name, data in merged_recipes.items():
-             # Check if inputs exist and is a dict. Allow empty inputs dict for now.
-             if isinstance(data.get('inputs'), dict) and name not in data.get("inputs",{}):
-                 cleaned_recipes[name] = data
-             # elif isinstance(data.get('inputs'), dict) and not data['inputs']:
-                  # print(f"Info: Recipe for '{name}' has no ingredients listed, keeping.") 
-                  # cleaned_recipes[name] = data # Keep items with no ingredients
-             else:
-                 # print(f"Removing potentially invalid/self-referencing recipe: {name}")
-                 removed_count += 1
-
-         print(f"Removed {removed_count} invalid or self-referencing recipes during cleanup.")
-         with open("recipes.json", "w", encoding='utf-8') as f:
-             json.dump(cleaned_recipes, f, indent=4, sort_keys=True)
-         print(f"Saved {len(cleaned_recipes)} recipes to recipes.json")
-    else: 
-         with open("recipes.json", "w", encoding='utf-8') as f:
-            json.dump({}, f, indent=4)
-         print("Saved empty recipes.json")
-
-    print("Script finished.") 
\ No newline at end of file
+    # Stream every source (the scraper's from its journal) through the merge and cleanup into recipes.json
+    source_streams = []
+    for name in sources:
+        if name == "gaming_tools":
+            if journal:
+                source_streams.append((name, iter_journal_recipes_with_images(journal, os.path.join("images", "items"))))
+            else:
+                source_streams.append((name, iter(sorted(scraped_recipes.items()))))
+        else:
+            source_streams.append((name, iter_recipes_jsonl(wiki_spools[name])))
+    merge_report = {}
+    cleanup_stats = {"removed": 0}
+    try:
+        saved_count = write_recipes_json(clean_recipes(merge_recipe_sources(source_streams, merge_report), cleanup_stats))
+    finally:
+        shutil.rmtree(spool_dir, ignore_errors=True)
+    write_merge_report(merge_report)
+
+    print(f"--- Processing complete. Total recipes found: {saved_count + cleanup_stats['removed']} --- ")
+    print(f"Removed {cleanup_stats['removed']} invalid or self-referencing recipes during cleanup.")
+    if saved_count:
+        print(f"Saved {saved_count} recipes to recipes.json")
+    else:
+        print("Saved empty recipes.json")
+    built = write_recipe_bundle(strict=args.strict)
+    if built:
+        publish_dataset_snapshot(args.snapshot_dir)
+    build_sprite_atlases()
+
+    print("Script finished.")
+    sys.exit(0 if built else 1)
@@ -0,0 +1,342 @@
+"""Local HTTP service for the crafting calculator, for bots and dashboards.
+
+Serves the same raw-material math as the page over recipes.json/raw_materials.json:
+
+    GET  /materials?item=Iron%20Ingot&qty=10    raw materials for one item
+    POST /materials/batch                        {"items": {"Iron Ingot": 10, ...}} -> per item, totals and crafting plan
+    GET  /where-used?item=Iron%20Ore&transitive=1 recipes consuming an item, with quantity per unit
+    GET  /stats                                  request counts, throughput, latency and cache statistics
+
+Per-unit raw-material costs are kept in an LRU cache (shared subtrees are resolved once) and the cache
+is dropped whenever either data file changes on disk. Requests are handled on one asyncio event loop
+with HTTP/1.1 keep-alive.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import math
+import os
+import time
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+import calculator
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_ITEMS = 1000
+MAX_HEADERS = 100
+
+class RecipeStore:
+    """The loaded data files plus the unit-cost cache, reloaded when a file's mtime changes."""
+
+    def __init__(self, recipes_file="recipes.json", raw_materials_file="raw_materials.json", cache_size=4096):
+        self.recipes_file = recipes_file
+        self.raw_materials_file = raw_materials_file
+        self.cache_size = cache_size
+        self.reloads = 0
+        self._mtimes = None
+        self.refresh()
+
+    def _current_mtimes(self):
+        return (os.stat(self.recipes_file).st_mtime_ns, os.stat(self.raw_materials_file).st_mtime_ns)
+
+    def refresh(self):
+        """Reloads the data and clears the cache if either file changed since the last load."""
+        mtimes = self._current_mtimes()
+        if mtimes == self._mtimes:
+            return False
+        recipes, self.raw_materials = calculator.load_recipe_data(self.recipes_file, self.raw_materials_file)
+        self.graph = calculator.compile_recipe_graph(recipes, self.raw_materials)
+        if self.graph["cycles"]:
+            # The resolvers below assume an acyclic graph, as the build does
+            print(f"Warning: Ignoring {len(self.graph['cycles'])} recipe cycle(s): {self.graph['cycles']}")
+            recipes = calculator.without_cycles(recipes, self.graph)
+            self.graph = calculator.compile_recipe_graph(recipes, self.raw_materials)
+        self.recipes = recipes
+        self.unit_cost = calculator.make_unit_cost_resolver(self.recipes, self.raw_materials, maxsize=self.cache_size)
+        self.direct_uses, self.transitive_uses = calculator.compute_where_used(self.recipes, self.raw_materials, self.graph)
+        if self._mtimes is not None:
+            self.reloads += 1
+            print(f"Data files changed, reloaded {len(self.recipes)} recipes and cleared the cost cache.")
+        self._mtimes = mtimes
+        return True
+
+    def knows(self, item_name):
+        return item_name in self.recipes or item_name in self.raw_materials
+
+    def materials(self, item_name, quantity):
+        """Raw materials for quantity x item_name, rounded as on the page."""
+        return calculator.scale_unit_cost(self.unit_cost(item_name), quantity)
+
+    def cache_info(self):
+        info = self.unit_cost.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize, "reloads": self.reloads}
+
+class ServiceStats:
+    """Request counters and a sliding window of recent latencies."""
+
+    def __init__(self, window=2000):
+        self.started = time.time()
+        self.requests = collections.Counter()
+        self.statuses = collections.Counter()
+        self.latencies = collections.deque(maxlen=window)
+        self.recent = collections.deque() # Completion times over the last minute
+
+    def record(self, endpoint, status, elapsed):
+        now = time.time()
+        self.requests[endpoint] += 1
+        self.statuses[status] += 1
+        self.latencies.append(elapsed)
+        self.recent.append(now)
+        while self.recent and self.recent[0] < now - 60:
+            self.recent.popleft()
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        def percentile(fraction):
+            return round(calculator.percentile(latencies, fraction) * 1000, 3)
+        uptime = time.time() - self.started
+        total = sum(self.requests.values())
+        window = min(60.0, uptime) or 1.0
+        return {
+            "uptime_s": round(uptime, 1),
+            "requests": total,
+            "by_endpoint": dict(self.requests),
+            "by_status": {str(status): count for status, count in self.statuses.items()},
+            "requests_per_s": round(total / uptime, 1) if uptime else 0.0,
+            "requests_per_s_last_minute": round(len(self.recent) / window, 1),
+            "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99), "max": round(latencies[-1] * 1000, 3) if latencies else 0.0},
+        }
+
+class RequestError(Exception):
+    """A client error, answered with its status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _parse_quantity(value):
+    """A query-string or JSON quantity as an int; JSON booleans, fractions and non-finite numbers are rejected."""
+    if isinstance(value, str):
+        try:
+            quantity = int(value)
+        except ValueError:
+            raise RequestError(400, f"Quantity must be a whole number, got {value!r}")
+    elif isinstance(value, bool) or not isinstance(value, (int, float)) or (isinstance(value, float) and not (math.isfinite(value) and value.is_integer())):
+        raise RequestError(400, f"Quantity must be a whole number, got {value!r}")
+    else:
+        quantity = int(value)
+    if quantity < 1:
+        raise RequestError(400, "Quantity must be at least 1")
+    return quantity
+
+def handle_materials(store, query):
+    """GET /materials?item=...&qty=..."""
+    item_name = (query.get("item") or [""])[0]
+    if not item_name:
+        raise RequestError(400, "Missing 'item' parameter")
+    quantity = _parse_quantity((query.get("qty") or ["1"])[0])
+    if not store.knows(item_name):
+        raise RequestError(404, f"Unknown item '{item_name}'")
+    return {"item": item_name, "quantity": quantity, "materials": store.materials(item_name, quantity)}
+
+def handle_where_used(store, query):
+    """GET /where-used?item=...[&transitive=1]"""
+    item_name = (query.get("item") or [""])[0]
+    if not item_name:
+        raise RequestError(400, "Missing 'item' parameter")
+    if not store.knows(item_name) and item_name not in store.direct_uses:
+        raise RequestError(404, f"Unknown item '{item_name}'")
+    transitive = (query.get("transitive") or ["0"])[0].lower() in ("1", "true", "yes")
+    uses = (store.transitive_uses if transitive else store.direct_uses).get(item_name, {})
+    return {"item": item_name, "transitive": transitive, "used_in": dict(sorted(uses.items()))}
+
+def handle_batch(store, body):
+    """POST /materials/batch with {"items": {name: quantity}}: per-item materials, totals and the crafting plan."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError as e:
+        raise RequestError(400, f"Body is not valid JSON: {e}")
+    items = payload.get("items") if isinstance(payload, dict) else None
+    if not isinstance(items, dict) or not items:
+        raise RequestError(400, "Body must be {\"items\": {\"<item>\": <quantity>, ...}}")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise RequestError(400, f"At most {MAX_BATCH_ITEMS} items per batch")
+
+    shopping_list = {}
+    errors = {}
+    for item_name, value in items.items():
+        if not store.knows(item_name):
+            errors[item_name] = "Unknown item"
+            continue
+        try:
+            shopping_list[item_name] = _parse_quantity(value)
+        except RequestError as e:
+            errors[item_name] = str(e)
+
+    per_item = {}
+    totals = collections.Counter()
+    for item_name, quantity in list(shopping_list.items()):
+        # Like the page: each item is rounded on its own, then the list is summed
+        try:
+            per_item[item_name] = store.materials(item_name, quantity)
+        except OverflowError:
+            # A whole number too large to price (e.g. 1e308) only fails its own item
+            errors[item_name] = "Quantity is too large"
+            del shopping_list[item_name]
+            continue
+        totals.update(per_item[item_name])
+    return {
+        "items": per_item,
+        "totals": dict(sorted(totals.items())),
+        "plan": calculator.plan_crafting(shopping_list, store.recipes, store.raw_materials, store.graph),
+        "errors": errors,
+    }
+
+ROUTES = {
+    ("GET", "/materials"): "materials",
+    ("POST", "/materials/batch"): "batch",
+    ("GET", "/where-used"): "where_used",
+    ("GET", "/stats"): "stats",
+}
+
+class CalculatorService:
+    """asyncio HTTP/1.1 server dispatching to the handlers above."""
+
+    def __init__(self, store):
+        self.store = store
+        self.stats = ServiceStats()
+
+    def dispatch(self, method, target, body):
+        """Returns (status, payload, endpoint) for one request."""
+        url = urlsplit(target)
+        endpoint = ROUTES.get((method, url.path))
+        if endpoint is None:
+            if any(path == url.path for _, path in ROUTES):
+                return 405, {"error": f"{method} not allowed on {url.path}"}, "other"
+            return 404, {"error": f"No endpoint {url.path}"}, "other"
+        try:
+            self.store.refresh()
+            if endpoint == "materials":
+                return 200, handle_materials(self.store, parse_qs(url.query)), endpoint
+            if endpoint == "batch":
+                return 200, handle_batch(self.store, body), endpoint
+            if endpoint == "where_used":
+                return 200, handle_where_used(self.store, parse_qs(url.query)), endpoint
+            return 200, dict(self.stats.summary(), cache=self.store.cache_info()), endpoint
+        except RequestError as e:
+            return e.status, {"error": str(e)}, endpoint
+        except OverflowError:
+            # A whole number too large to price, e.g. qty with 400 digits
+            return 400, {"error": "Quantity is too large"}, endpoint
+        except (IOError, ValueError) as e:
+            print(f"Error handling {method} {target}: {e}")
+            return 500, {"error": str(e)}, endpoint
+        except Exception as e:
+            print(f"Unexpected error handling {method} {target}: {e!r}")
+            return 500, {"error": "Internal server error"}, endpoint
+
+    async def respond(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Access-Control-Allow-Origin: *\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+        )
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await read_request_head(reader)
+                except RequestError as e:
+                    # The rest of the stream cannot be framed, so answer and close the connection
+                    started = time.perf_counter()
+                    await self.respond(writer, e.status, {"error": str(e)}, False)
+                    self.stats.record("other", e.status, time.perf_counter() - started)
+                    break
+                if head is None:
+                    break
+                started = time.perf_counter()
+                method, target, version, headers = head
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Without a valid length the body cannot be skipped, so the connection is closed
+                    status, payload, endpoint = 400, {"error": "Invalid Content-Length header"}, "other"
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, payload, endpoint = 413, {"error": "Request body too large"}, "other"
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload, endpoint = self.dispatch(method, target, body)
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+
+                await self.respond(writer, status, payload, keep_alive)
+                self.stats.record(endpoint, status, time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+async def read_request_head(reader):
+    """(method, target, version, headers) of the next request, or None once the client is done.
+
+    Raises RequestError for a malformed or overlong request line (400) and for an overlong
+    header line or more than MAX_HEADERS headers (431).
+    """
+    # readline raises ValueError (wrapping LimitOverrunError) for a line longer than the reader's limit
+    try:
+        request_line = await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise RequestError(400, "Request line too long")
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise RequestError(400, "Malformed request line")
+
+    headers = {}
+    for _ in range(MAX_HEADERS + 1):
+        try:
+            line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            raise RequestError(431, "Header line too long")
+        if line in (b"\r\n", b"\n", b""):
+            return method, target, version, headers
+        name, _, value = line.decode('latin-1').partition(":")
+        headers[name.strip().lower()] = value.strip()
+    raise RequestError(431, f"More than {MAX_HEADERS} headers")
+
+async def serve(host, port, store):
+    service = CalculatorService(store)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving {len(store.recipes)} recipes on http://{host}:{port} (cache size {store.cache_size})")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the crafting calculator's raw-material math over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--recipes", default="recipes.json", help="Recipes file (default: recipes.json)")
+    parser.add_argument("--raw-materials", default="raw_materials.json", help="Raw materials file (default: raw_materials.json)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="Per-item unit costs kept in the LRU cache (default: 4096)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, RecipeStore(args.recipes, args.raw_materials, args.cache_size)))
+    except KeyboardInterrupt:
+        print("Server stopped.")
@@ -1,8 +1,10 @@
 // Global variables to store fetched data
-window.recipesData = {};
-window.rawMaterialsSet = new Set();
-window.shoppingList = new Map(); // Map<itemName, quantity>
-window.recipeMeta = []; // For storing { name, image_path, description }
+window.recipeBundle = null; // Compiled recipes (recipes.bundle.json)
+window.recipeMeta = null; // { descriptions, images } by recipe ID, loaded after the first render
+window.spriteIndex = null; // Icon positions in the sprite atlases (sprites.json), loaded after the first render
+window.searchIndex = null; // Trigram/prefix index of recipe names (search_index.json)
+const itemSearch = { results: [], active: -1, selectedId: -1 }; // Type-ahead state
+window.shoppingList = new Map(); // Map<itemId, quantity>
 
 // --- Utility Functions ---
 function getSafeQuantity(value) {
@@ -10,147 +12,136 @@ function getSafeQuantity(value) {
     return isNaN(num) || num < 1 ? 1 : num;
 }
 
-// --- Recursive Calculation Logic (JavaScript Version) ---
-function getBaseMaterials(itemName, quantity, recipes, rawMaterials) {
-    const baseMaterials = new Map(); // Use Map for easier handling
-    const materialsToProcess = [[itemName, parseFloat(quantity)]]; // Stack: [item, quantity_needed]
-    const processedRecipes = new Map(); // Track processed recipes to prevent cycles: key=itemName, value=Set of input tuples
+// --- Calculation Logic (over the compiled recipe bundle) ---
+// recipes.bundle.json is written by parse_data.py. Item IDs index into bundle.items; IDs below
+// bundle.recipe_count are recipes, whose inputs and per-unit raw-material costs are stored as flat
+// arrays: the entries for recipe id are input_ids/input_qty[input_offsets[id] .. input_offsets[id + 1]]
+// (and likewise cost_*).
 
-    const maxDepth = 100; // Safety break
-    let currentDepth = 0;
-
-    while (materialsToProcess.length > 0 && currentDepth < maxDepth) {
-        const [currentItem, currentQtyNeeded] = materialsToProcess.pop();
-        currentDepth++;
-
-        // console.log(`Processing: ${currentItem} x ${currentQtyNeeded}`);
-
-        // Is it a raw material?
-        if (rawMaterials.has(currentItem)) {
-            baseMaterials.set(currentItem, (baseMaterials.get(currentItem) || 0) + currentQtyNeeded);
-            // console.log(`  -> Raw material found. Added ${currentQtyNeeded} to ${currentItem}. Total: ${baseMaterials.get(currentItem)}`);
-            continue;
-        }
-
-        // Is it a known recipe?
-        if (recipes[currentItem]) {
-            const recipe = recipes[currentItem];
-            const outputQty = recipe.output_qty || 1;
-            const inputs = recipe.inputs || {};
-            const inputItems = Object.entries(inputs).sort((a, b) => a[0].localeCompare(b[0])); // Sort for consistent key
-
-            // Calculate how many times we need to craft this recipe
-            const craftCount = currentQtyNeeded / outputQty;
-            // console.log(`  -> Recipe found: ${currentItem} produces ${outputQty}. Need ${currentQtyNeeded}, so craft ${craftCount.toFixed(2)} times.`);
-
-            // Check for cycles: has this item been processed with these exact inputs in this path?
-            // Note: A simpler cycle check just using the item name might be sufficient for most cases
-            //       but this version tries to mimic the Python logic slightly more closely.
-            // A very basic cycle check: If we are asked to craft something we are already calculating higher up.
-            // This needs a more robust path tracking for full cycle detection, but let's keep it simple for now.
-            // We'll rely primarily on maxDepth.
-            /*
-            const inputsKey = JSON.stringify(inputItems);
-            if (processedRecipes.has(currentItem) && processedRecipes.get(currentItem).has(inputsKey)) {
-                 console.warn(`Cycle detected or recipe re-processed: ${currentItem}. Skipping.`);
-                 continue;
-            }
-            if (!processedRecipes.has(currentItem)) {
-                 processedRecipes.set(currentItem, new Set());
-            }
-            processedRecipes.get(currentItem).add(inputsKey);
-            */
-
-            // Add its ingredients to the stack
-            for (const [ingredient, amountPerCraft] of Object.entries(inputs)) {
-                if (ingredient) {
-                    const ingredientNeededTotal = amountPerCraft * craftCount;
-                    materialsToProcess.push([ingredient, ingredientNeededTotal]);
-                    // console.log(`    Added ingredient to stack: ${ingredient} x ${ingredientNeededTotal.toFixed(2)}`);
-                }
-            }
-        } else {
-            // Item is not raw and not in recipes
-            console.warn(`Warning: Item '${currentItem}' is not found in recipes or raw materials. Treating as raw.`);
-            baseMaterials.set(currentItem, (baseMaterials.get(currentItem) || 0) + currentQtyNeeded);
-        }
-    }
+// Recipes with depth 0 are raw materials that also have a recipe; like unknown items they are not crafted
+function isCraftable(itemId, bundle) {
+    return itemId < bundle.recipe_count && bundle.depth[itemId] > 0;
+}
 
-    if (currentDepth >= maxDepth) {
-        console.warn("Warning: Reached maximum calculation depth. Results might be incomplete.");
+function getBaseMaterials(itemId, quantity, bundle) {
+    // The per-unit raw-material vector is precomputed, so this is one multiply per raw material
+    const finalMaterials = new Map(); // Map<materialId, amount>
+    if (itemId >= bundle.recipe_count) {
+        finalMaterials.set(itemId, Math.round(quantity + 0.00001)); // Not a recipe: it is its own raw material
+        return finalMaterials;
     }
-
-    // Convert Map to object and round quantities up (ceil) or just round
-    const finalMaterials = {};
-    for (const [key, value] of baseMaterials.entries()) {
-        const roundedValue = Math.round(value + 0.00001);
+    for (let k = bundle.cost_offsets[itemId]; k < bundle.cost_offsets[itemId + 1]; k++) {
+        const roundedValue = Math.round(bundle.cost_qty[k] * quantity + 0.00001);
         if (roundedValue > 0) {
-            finalMaterials[key] = roundedValue;
+            finalMaterials.set(bundle.cost_ids[k], roundedValue);
         }
     }
-
     return finalMaterials;
 }
 
-// --- Crafting Steps Calculation and Rendering ---
-function getCraftingSteps(itemName, quantity, recipes, rawMaterials, steps = [], parentMultiplier = 1, visited = new Set()) {
-    // Prevent cycles
-    if (visited.has(itemName)) return steps;
-    visited.add(itemName);
-
-    if (rawMaterials.has(itemName) || !recipes[itemName]) {
-        // Raw material or unknown, no crafting step needed
-        return steps;
+// --- Crafting Plan Calculation and Rendering ---
+// Mirrors calculator.plan_crafting: demand is summed over the whole list, visiting items from the
+// deepest down (a recipe is always deeper than its inputs, so an item's demand is complete when it is
+// reached), and each item is crafted once, in ceil(demand / output_qty) batches.
+function planCrafting(shoppingList, bundle) {
+    const demand = new Map(); // Map<itemId, quantity>
+    const buckets = []; // depth -> item IDs first demanded at that depth
+    const addDemand = (itemId, quantity) => {
+        if (!demand.has(itemId)) {
+            demand.set(itemId, 0);
+            const depth = itemId < bundle.recipe_count ? bundle.depth[itemId] : 0;
+            (buckets[depth] = buckets[depth] || []).push(itemId);
+        }
+        demand.set(itemId, demand.get(itemId) + quantity);
+    };
+    for (const [itemId, quantity] of shoppingList.entries()) {
+        if (quantity > 0) addDemand(itemId, quantity);
     }
 
-    const recipe = recipes[itemName];
-    const outputQty = recipe.output_qty || 1;
-    const craftCount = Math.ceil((quantity * parentMultiplier) / outputQty);
-    const inputs = recipe.inputs || {};
-    const workstation = recipe.workstation || 'Unknown';
-
-    // Add this crafting step
-    steps.push({
-        item: itemName,
-        quantity: craftCount * outputQty,
-        inputs: Object.entries(inputs).map(([name, qty]) => ({ name, qty: qty * craftCount })),
-        workstation
-    });
+    const steps = [];
+    for (let depth = buckets.length - 1; depth > 0; depth--) {
+        for (const itemId of buckets[depth] || []) {
+            const outputQty = bundle.output_qty[itemId];
+            const crafts = Math.ceil(demand.get(itemId) / outputQty);
+            const inputs = [];
+            for (let k = bundle.input_offsets[itemId]; k < bundle.input_offsets[itemId + 1]; k++) {
+                const qty = bundle.input_qty[k] * crafts;
+                addDemand(bundle.input_ids[k], qty);
+                inputs.push({ name: bundle.items[bundle.input_ids[k]], qty });
+            }
+            steps.push({
+                item: itemId,
+                crafts,
+                quantity: crafts * outputQty,
+                inputs,
+                workstation: bundle.workstations[bundle.workstation[itemId]],
+                depth
+            });
+        }
+    }
 
-    // Recurse for each input
-    for (const [inputName, inputQty] of Object.entries(inputs)) {
-        getCraftingSteps(inputName, inputQty, recipes, rawMaterials, steps, craftCount, visited);
+    // Inputs first; same tie order as the Python planner (plain string comparison)
+    const names = bundle.items;
+    steps.sort((a, b) => a.depth - b.depth || (names[a.item] < names[b.item] ? -1 : names[a.item] > names[b.item] ? 1 : 0));
+    const byWorkstation = new Map(); // Map<workstation, steps>, in order of first use
+    for (const step of steps) {
+        if (!byWorkstation.has(step.workstation)) byWorkstation.set(step.workstation, []);
+        byWorkstation.get(step.workstation).push(step);
     }
-    return steps;
+    return { steps, byWorkstation };
 }
 
-function getOrderedCraftingSteps(shoppingList, recipes, rawMaterials) {
-    // Use a map to accumulate steps and avoid duplicates
-    const allSteps = [];
-    for (const [itemName, quantity] of shoppingList.entries()) {
-        getCraftingSteps(itemName, quantity, recipes, rawMaterials, allSteps, 1, new Set());
-    }
-    // Topological sort: ensure dependencies come before their consumers
-    // We'll use a simple stable sort by depth (inputs first)
-    const stepDepth = {};
-    function calcDepth(item) {
-        if (rawMaterials.has(item) || !recipes[item]) return 0;
-        const inputs = Object.keys(recipes[item].inputs || {});
-        if (inputs.length === 0) return 1;
-        return 1 + Math.max(...inputs.map(calcDepth));
+// --- Where-used queries (where_used.json, written next to the bundle) ---
+// Same flat layout as the bundle: the recipes using item id are ids[offsets[id] .. offsets[id + 1]],
+// with qty of the item needed per unit of each recipe.
+let whereUsedRequest = null;
+function loadWhereUsedIndex(bundle) {
+    // Fetched on first use only; later calls share the same request
+    whereUsedRequest = whereUsedRequest || fetch('where_used.json')
+        .then(res => {
+            if (!res.ok) throw new Error(`where_used.json: ${res.statusText} (${res.status})`);
+            return res.json();
+        })
+        .then(index => {
+            if (index.build_id !== bundle.build_id) throw new Error("where_used.json does not match recipes.bundle.json");
+            return index;
+        });
+    return whereUsedRequest;
+}
+
+// Recipes consuming itemId, directly or at any depth below them: [{ id, name, qty per unit }]
+function getWhereUsed(itemId, bundle, index, transitive = false) {
+    const section = transitive ? index.transitive : index.direct;
+    const result = [];
+    for (let k = section.offsets[itemId]; k < section.offsets[itemId + 1]; k++) {
+        result.push({ id: section.ids[k], name: bundle.items[section.ids[k]], qty: section.qty[k] });
     }
-    allSteps.forEach(step => {
-        step.depth = calcDepth(step.item);
-    });
-    allSteps.sort((a, b) => a.depth - b.depth);
-    // Remove duplicates (keep the one with the highest quantity)
-    const seen = new Map();
-    for (const step of allSteps) {
-        if (!seen.has(step.item) || step.quantity > seen.get(step.item).quantity) {
-            seen.set(step.item, step);
+    return result;
+}
+
+// Recipes whose direct inputs are all in stockpile (Map<itemId, quantity>): Map<recipeId, units craftable>
+function getCraftableFrom(stockpile, bundle, index) {
+    const craftable = new Map();
+    for (const itemId of stockpile.keys()) {
+        for (let k = index.direct.offsets[itemId]; k < index.direct.offsets[itemId + 1]; k++) {
+            const recipeId = index.direct.ids[k];
+            if (craftable.has(recipeId)) continue;
+            let crafts = Infinity;
+            for (let j = bundle.input_offsets[recipeId]; j < bundle.input_offsets[recipeId + 1]; j++) {
+                crafts = Math.min(crafts, Math.floor((stockpile.get(bundle.input_ids[j]) || 0) / bundle.input_qty[j]));
+            }
+            if (crafts > 0 && crafts !== Infinity) craftable.set(recipeId, crafts * bundle.output_qty[recipeId]);
         }
     }
-    return Array.from(seen.values());
+    return craftable;
+}
+
+// By name, for other scripts and the console, e.g. whereUsed('Iron Ingot') or whereUsed('Iron Ore', true)
+function whereUsed(itemName, transitive = false) {
+    const bundle = window.recipeBundle;
+    const itemId = bundle.items.indexOf(itemName);
+    if (itemId < 0) return Promise.reject(new Error(`Unknown item '${itemName}'`));
+    return loadWhereUsedIndex(bundle).then(index => getWhereUsed(itemId, bundle, index, transitive));
 }
 
 function renderCraftingSteps() {
@@ -160,22 +151,43 @@ function renderCraftingSteps() {
         listElement.innerHTML = '<li class="text-gray-500 italic">List is empty</li>';
         return;
     }
-    const steps = getOrderedCraftingSteps(window.shoppingList, window.recipesData, window.rawMaterialsSet);
-    if (steps.length === 0) {
+    const plan = planCrafting(window.shoppingList, window.recipeBundle);
+    if (plan.steps.length === 0) {
         listElement.innerHTML = '<li class="text-gray-500 italic">No crafting steps required.</li>';
         return;
     }
-    steps.forEach(step => {
-        const inputStr = step.inputs.map(i => `${i.qty} × ${i.name}`).join(', ');
-        const workstationStr = step.workstation && step.workstation !== 'Unknown' ? ` at <span class="font-semibold text-blue-300">${step.workstation}</span>` : '';
-        const li = document.createElement('li');
-        li.className = 'mb-2';
-        li.innerHTML = `Craft <span class="font-semibold text-green-300">${step.quantity}</span> <span class="font-semibold text-gray-100">${step.item}</span> with <span class="text-gray-200">${inputStr}</span>${workstationStr}`;
-        listElement.appendChild(li);
-    });
+    let stepNumber = 1;
+    for (const [workstation, steps] of plan.byWorkstation.entries()) {
+        const header = document.createElement('li');
+        header.className = 'list-none mt-3 mb-1 font-semibold text-blue-300';
+        header.textContent = workstation && workstation !== 'Unknown' ? workstation : 'Unknown workstation';
+        listElement.appendChild(header);
+        steps.forEach(step => {
+            const inputStr = step.inputs.map(i => `${i.qty} × ${i.name}`).join(', ');
+            const li = document.createElement('li');
+            li.className = 'mb-2';
+            li.value = stepNumber++; // Keep numbering continuous across the workstation headers
+            li.innerHTML = `Craft <span class="font-semibold text-green-300">${step.quantity}</span> <span class="font-semibold text-gray-100">${window.recipeBundle.items[step.item]}</span> with <span class="text-gray-200">${inputStr}</span>`;
+            listElement.appendChild(li);
+        });
+    }
 }
 
 // --- DOM Update Functions ---
+const ICON_SIZE = 32; // CSS pixels of a list icon
+
+// Inline style showing an item's icon from the sprite atlases, or null if it has none
+function getSpriteStyle(itemName) {
+    const sprites = window.spriteIndex;
+    const position = sprites?.icons[itemName];
+    if (!position) return null;
+    const [atlas, column, row] = position;
+    // Use the 2x sheet on high-density screens when there is one
+    const size = window.devicePixelRatio > 1 && sprites.atlases['64'] ? 64 : 32;
+    const url = `${sprites.atlases[size][atlas]}?v=${sprites.version}`;
+    return `background-image: url('${url}'); background-size: ${sprites.columns * ICON_SIZE}px auto; background-position: -${column * ICON_SIZE}px -${row * ICON_SIZE}px;`;
+}
+
 function renderShoppingList() {
     const listElement = document.getElementById('shopping-list-items');
     listElement.innerHTML = ''; // Clear current list
@@ -185,18 +197,22 @@ function renderShoppingList() {
         return;
     }
 
-    const sortedList = Array.from(window.shoppingList.entries()).sort((a, b) => a[0].localeCompare(b[0]));
+    const items = window.recipeBundle.items;
+    const sortedList = Array.from(window.shoppingList.entries()).sort((a, b) => items[a[0]].localeCompare(items[b[0]]));
 
-    sortedList.forEach(([itemName, quantity]) => {
-        const meta = window.recipeMeta.find(r => r.name === itemName);
-        const imagePath = meta?.image_path && meta.image_path !== 'null' ? meta.image_path : null;
+    sortedList.forEach(([itemId, quantity]) => {
+        const itemName = items[itemId];
+        const spriteStyle = getSpriteStyle(itemName);
+        const imagePath = window.recipeMeta?.images[itemId] || null; // No icon until the metadata has loaded
 
         const li = document.createElement('li');
         li.className = 'flex items-center gap-3 px-3 py-2 border-b border-gray-700 last:border-b-0 hover:bg-gray-700 transition duration-150 ease-in-out';
-        li.dataset.itemName = itemName;
+        li.dataset.itemId = itemId;
 
-        // Image (optional)
-        if (imagePath) {
+        // Image (optional): a cell of the sprite atlas, else the single icon file
+        if (spriteStyle) {
+            li.innerHTML += `<div role="img" aria-label="${itemName}" class="w-8 h-8 flex-shrink-0 rounded-sm bg-gray-600 bg-no-repeat" style="${spriteStyle}"></div>`;
+        } else if (imagePath) {
             li.innerHTML += `<img src="${imagePath}" alt="${itemName}" class="w-8 h-8 object-contain flex-shrink-0 rounded-sm bg-gray-600 p-0.5">`;
         } else {
             li.innerHTML += `<div class="w-8 h-8 flex-shrink-0 rounded-sm bg-gray-600"></div>`; // Placeholder
@@ -208,14 +224,14 @@ function renderShoppingList() {
         // Quantity Controls
         li.innerHTML += `
             <div class="flex items-center gap-1 flex-shrink-0">
-                <button class="decrease-qty-btn p-1 rounded bg-gray-600 hover:bg-red-700 text-white leading-none" data-item="${itemName}">-</button>
-                <input type="number" value="${quantity}" min="1" class="list-quantity-input w-12 text-center p-1 bg-gray-600 border border-gray-500 rounded text-sm" data-item="${itemName}">
-                <button class="increase-qty-btn p-1 rounded bg-gray-600 hover:bg-green-700 text-white leading-none" data-item="${itemName}">+</button>
+                <button class="decrease-qty-btn p-1 rounded bg-gray-600 hover:bg-red-700 text-white leading-none" data-item="${itemId}">-</button>
+                <input type="number" value="${quantity}" min="1" class="list-quantity-input w-12 text-center p-1 bg-gray-600 border border-gray-500 rounded text-sm" data-item="${itemId}">
+                <button class="increase-qty-btn p-1 rounded bg-gray-600 hover:bg-green-700 text-white leading-none" data-item="${itemId}">+</button>
             </div>
         `;
 
         // Remove Button
-        li.innerHTML += `<button class="remove-item-btn p-1 rounded bg-red-600 hover:bg-red-800 text-white leading-none flex-shrink-0" data-item="${itemName}">&times;</button>`;
+        li.innerHTML += `<button class="remove-item-btn p-1 rounded bg-red-600 hover:bg-red-800 text-white leading-none flex-shrink-0" data-item="${itemId}">&times;</button>`;
 
         listElement.appendChild(li);
     });
@@ -240,10 +256,10 @@ function renderTotalMaterials() {
     let calculationError = false;
 
     try {
-        for (const [itemName, quantity] of window.shoppingList.entries()) {
+        for (const [itemId, quantity] of window.shoppingList.entries()) {
             if (quantity > 0) {
-                const itemMaterials = getBaseMaterials(itemName, quantity, window.recipesData, window.rawMaterialsSet);
-                for (const [material, amount] of Object.entries(itemMaterials)) {
+                const itemMaterials = getBaseMaterials(itemId, quantity, window.recipeBundle);
+                for (const [material, amount] of itemMaterials.entries()) {
                     totalBaseMaterials.set(material, (totalBaseMaterials.get(material) || 0) + amount);
                 }
             }
@@ -261,7 +277,8 @@ function renderTotalMaterials() {
     }
     
     if (!calculationError) {
-        const sortedMaterials = Array.from(totalBaseMaterials.entries()).sort((a, b) => a[0].localeCompare(b[0]));
+        const items = window.recipeBundle.items;
+        const sortedMaterials = Array.from(totalBaseMaterials.entries()).map(([id, amount]) => [items[id], amount]).sort((a, b) => a[0].localeCompare(b[0]));
         sortedMaterials.forEach(([material, amount]) => {
             const li = document.createElement('li');
             li.className = 'text-sm text-gray-300 py-1 flex justify-between';
@@ -272,41 +289,182 @@ function renderTotalMaterials() {
     renderCraftingSteps();
 }
 
+// --- Item Search (type-ahead) ---
+// Same folding as parse_data.normalize_search_text, so queries match the prebuilt index
+function normalizeSearchText(text) {
+    return text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase()
+        .replace(/['\u2019]/g, '').replace(/[^a-z0-9]+/g, ' ').trim();
+}
+
+// Intersection of ascending ID lists, smallest first
+function intersectPostings(lists) {
+    lists.sort((a, b) => a.length - b.length);
+    let result = lists[0];
+    for (let i = 1; i < lists.length && result.length > 0; i++) {
+        const other = new Set(lists[i]);
+        result = result.filter(id => other.has(id));
+    }
+    return result;
+}
+
+// How well a recipe matches the folded query: name beats alias beats workstation; 0 = no match
+function scoreSearchMatch(itemId, query, index, bundle) {
+    const score = (text, base) => {
+        if (text === query) return base + 30;
+        if (text.startsWith(query)) return base + 20;
+        if ((' ' + text).includes(' ' + query)) return base + 10;
+        return text.includes(query) ? base : 0;
+    };
+    let best = score(index.names[itemId], 60);
+    for (const alias of index.aliases[itemId] || []) best = Math.max(best, score(alias, 40));
+    return best || score(index.workstations[bundle.workstation[itemId]], 1);
+}
+
+// Ranked recipe IDs for a query. Only the index's candidates are scored, never the whole list
+function searchItems(query, bundle, index, limit = 12) {
+    const folded = normalizeSearchText(query);
+    if (!folded) return [];
+    let candidates;
+    if (!index) {
+        // Index failed to load: score every recipe (slow path)
+        index = { names: bundle.items.slice(0, bundle.recipe_count).map(normalizeSearchText), aliases: {}, workstations: bundle.workstations.map(normalizeSearchText) };
+        candidates = index.names.map((_, itemId) => itemId);
+    } else if (folded.length < 3) {
+        candidates = index.prefixes[folded] || [];
+    } else {
+        const lists = [];
+        for (let i = 0; i + 3 <= folded.length; i++) {
+            const postings = index.trigrams[folded.slice(i, i + 3)];
+            if (!postings) return [];
+            lists.push(postings);
+        }
+        candidates = intersectPostings(lists);
+    }
+    const ranked = [];
+    for (const itemId of candidates) {
+        const score = scoreSearchMatch(itemId, folded, index, bundle);
+        if (score > 0) ranked.push([score, itemId]);
+    }
+    // Best score, then shorter names, then display order
+    ranked.sort((a, b) => b[0] - a[0] || index.names[a[1]].length - index.names[b[1]].length || a[1] - b[1]);
+    return ranked.slice(0, limit).map(([, itemId]) => itemId);
+}
+
+function renderSearchResults() {
+    const input = document.getElementById('item-search');
+    const listElement = document.getElementById('item-search-results');
+    listElement.innerHTML = '';
+    input.setAttribute('aria-expanded', itemSearch.results.length > 0 ? 'true' : 'false');
+    listElement.classList.toggle('hidden', itemSearch.results.length === 0);
+    const bundle = window.recipeBundle;
+    itemSearch.results.forEach((itemId, position) => {
+        const li = document.createElement('li');
+        li.id = `item-search-option-${position}`;
+        li.setAttribute('role', 'option');
+        li.dataset.itemId = itemId;
+        li.className = 'px-3 py-1 cursor-pointer text-sm ' + (position === itemSearch.active ? 'bg-gray-600 text-white' : 'text-gray-300 hover:bg-gray-600');
+        const workstation = bundle.workstations[bundle.workstation[itemId]];
+        li.innerHTML = `${bundle.items[itemId]}${workstation !== 'Unknown' ? ` <span class="text-xs text-gray-400">${workstation}</span>` : ''}`;
+        listElement.appendChild(li);
+    });
+    if (itemSearch.active >= 0) {
+        input.setAttribute('aria-activedescendant', `item-search-option-${itemSearch.active}`);
+    } else {
+        input.removeAttribute('aria-activedescendant');
+    }
+}
+
+function selectSearchResult(itemId) {
+    const input = document.getElementById('item-search');
+    itemSearch.selectedId = itemId;
+    itemSearch.results = [];
+    itemSearch.active = -1;
+    input.value = window.recipeBundle.items[itemId].replace(/\s+/g, ' ');
+    renderSearchResults();
+}
+
+function attachItemSearchListeners() {
+    const input = document.getElementById('item-search');
+    const listElement = document.getElementById('item-search-results');
+    input.addEventListener('input', () => {
+        itemSearch.selectedId = -1;
+        itemSearch.results = searchItems(input.value, window.recipeBundle, window.searchIndex);
+        itemSearch.active = itemSearch.results.length > 0 ? 0 : -1;
+        renderSearchResults();
+    });
+    input.addEventListener('keydown', (e) => {
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            if (itemSearch.results.length === 0) return;
+            e.preventDefault();
+            const step = e.key === 'ArrowDown' ? 1 : -1;
+            itemSearch.active = (itemSearch.active + step + itemSearch.results.length) % itemSearch.results.length;
+            renderSearchResults();
+        } else if (e.key === 'Enter') {
+            e.preventDefault();
+            if (itemSearch.active >= 0) {
+                selectSearchResult(itemSearch.results[itemSearch.active]);
+            } else if (itemSearch.selectedId >= 0) {
+                handleAddItem();
+            }
+        } else if (e.key === 'Escape') {
+            itemSearch.results = [];
+            itemSearch.active = -1;
+            renderSearchResults();
+        }
+    });
+    input.addEventListener('blur', () => {
+        // Let a click on a result land before the list closes
+        setTimeout(() => { itemSearch.results = []; itemSearch.active = -1; renderSearchResults(); }, 150);
+    });
+    listElement.addEventListener('mousedown', (e) => {
+        const option = e.target.closest('[data-item-id]');
+        if (option) {
+            e.preventDefault();
+            selectSearchResult(Number(option.dataset.itemId));
+        }
+    });
+}
+
 // --- Event Handling ---
 function handleAddItem() {
-    const itemSelect = document.getElementById('item-select');
     const quantityInput = document.getElementById('quantity-input');
     const addErrorMsg = document.getElementById('add-error-message');
     addErrorMsg.textContent = ''; // Clear previous errors
 
-    const itemName = itemSelect.value;
+    // The picked item, else the best match for what was typed
+    let itemId = itemSearch.selectedId;
+    if (itemId < 0) {
+        const input = document.getElementById('item-search');
+        itemId = searchItems(input.value, window.recipeBundle, window.searchIndex, 1)[0] ?? -1;
+        if (itemId >= 0) selectSearchResult(itemId);
+    }
     const quantity = getSafeQuantity(quantityInput.value);
 
-    if (!itemName) {
+    if (!(itemId >= 0 && itemId < window.recipeBundle.recipe_count)) {
         addErrorMsg.textContent = 'Please select an item.';
         return;
     }
 
-    const currentQuantity = window.shoppingList.get(itemName) || 0;
-    window.shoppingList.set(itemName, currentQuantity + quantity);
+    const currentQuantity = window.shoppingList.get(itemId) || 0;
+    window.shoppingList.set(itemId, currentQuantity + quantity);
 
     renderShoppingList();
     renderTotalMaterials();
 }
 
-function updateItemQuantity(itemName, newQuantity) {
+function updateItemQuantity(itemId, newQuantity) {
     const quantity = getSafeQuantity(newQuantity);
      if (quantity <= 0) { // Should not happen with getSafeQuantity but safety check
-         window.shoppingList.delete(itemName);
+         window.shoppingList.delete(itemId);
      } else {
-         window.shoppingList.set(itemName, quantity);
+         window.shoppingList.set(itemId, quantity);
      }
      renderShoppingList(); // Re-render to update input value if needed
      renderTotalMaterials();
 }
 
-function removeItem(itemName) {
-     window.shoppingList.delete(itemName);
+function removeItem(itemId) {
+     window.shoppingList.delete(itemId);
      renderShoppingList();
      renderTotalMaterials();
 }
@@ -320,12 +478,12 @@ function addShoppingListEventListeners() {
         // Remove old listener before adding new one to prevent duplicates
         button.onclick = null;
         button.onclick = (e) => {
-            const itemName = e.target.dataset.item;
-            const currentQuantity = window.shoppingList.get(itemName) || 1;
+            const itemId = Number(e.target.dataset.item);
+            const currentQuantity = window.shoppingList.get(itemId) || 1;
             if (currentQuantity > 1) {
-               updateItemQuantity(itemName, currentQuantity - 1);
+               updateItemQuantity(itemId, currentQuantity - 1);
             } else {
-               removeItem(itemName); // Remove if quantity becomes 0 or less
+               removeItem(itemId); // Remove if quantity becomes 0 or less
             }
         };
     });
@@ -333,9 +491,9 @@ function addShoppingListEventListeners() {
     listContainer.querySelectorAll('.increase-qty-btn').forEach(button => {
         button.onclick = null;
         button.onclick = (e) => {
-            const itemName = e.target.dataset.item;
-            const currentQuantity = window.shoppingList.get(itemName) || 0;
-            updateItemQuantity(itemName, currentQuantity + 1);
+            const itemId = Number(e.target.dataset.item);
+            const currentQuantity = window.shoppingList.get(itemId) || 0;
+            updateItemQuantity(itemId, currentQuantity + 1);
         };
     });
 
@@ -343,12 +501,12 @@ function addShoppingListEventListeners() {
         input.onchange = null;
         input.onblur = null; // Remove old listeners
         input.onchange = (e) => { 
-            const itemName = e.target.dataset.item;
-            updateItemQuantity(itemName, e.target.value);
+            const itemId = Number(e.target.dataset.item);
+            updateItemQuantity(itemId, e.target.value);
         };
          input.onblur = (e) => { 
-             const itemName = e.target.dataset.item;
-             updateItemQuantity(itemName, e.target.value);
+             const itemId = Number(e.target.dataset.item);
+             updateItemQuantity(itemId, e.target.value);
          };
     });
 
@@ -356,9 +514,9 @@ function addShoppingListEventListeners() {
         button.onclick = null;
         button.onclick = (e) => {
             // Use closest to ensure we get the item name even if click is on icon inside button
-            const itemName = e.target.closest('[data-item-name]')?.dataset.itemName; 
-             if (itemName) {
-                removeItem(itemName);
+            const itemId = e.target.closest('[data-item-id]')?.dataset.itemId; 
+             if (itemId !== undefined) {
+                removeItem(Number(itemId));
              } else {
                  console.error('Could not find item name for remove button');
              }
@@ -366,62 +524,90 @@ function addShoppingListEventListeners() {
     });
 }
 
+// --- Deferred Data Loading (metadata and sprites, after first render) ---
+function loadRecipeMeta(bundle) {
+    // Descriptions and image paths are only needed for display, so they load after the calculator is usable
+    fetch('recipes.meta.json')
+    .then(res => {
+        if (!res.ok) throw new Error(`recipes.meta.json: ${res.statusText} (${res.status})`);
+        return res.json();
+    })
+    .then(meta => {
+        if (meta.build_id !== bundle.build_id) {
+            console.warn("recipes.meta.json does not match recipes.bundle.json; item images disabled.");
+            return;
+        }
+        window.recipeMeta = meta;
+        renderShoppingList();
+    })
+    .catch(error => console.warn('Could not load item metadata:', error));
+}
+
+function loadSpriteIndex() {
+    // Without sprites.json (e.g. built without Pillow) the list uses the single icon files
+    fetch('sprites.json')
+    .then(res => {
+        if (!res.ok) throw new Error(`sprites.json: ${res.statusText} (${res.status})`);
+        return res.json();
+    })
+    .then(sprites => {
+        window.spriteIndex = sprites;
+        renderShoppingList();
+    })
+    .catch(error => console.warn('Could not load sprite index, using single icons:', error));
+}
+
 // --- Initialization ---
 document.addEventListener('DOMContentLoaded', () => {
     console.log("DOM fully loaded and parsed");
 
     // Select critical elements needed immediately or for error display
-    const itemSelect = document.getElementById('item-select');
+    const itemSearchInput = document.getElementById('item-search');
     const listErrorMsg = document.getElementById('list-error-message');
     const addErrorMsg = document.getElementById('add-error-message');
 
     // Initial UI state checks
-    if (!itemSelect || !listErrorMsg || !addErrorMsg) {
-        console.error("Fatal Error: One or more critical UI elements are missing (select/error msg)!");
+    if (!itemSearchInput || !listErrorMsg || !addErrorMsg) {
+        console.error("Fatal Error: One or more critical UI elements are missing (search/error msg)!");
         document.body.innerHTML = '<p class="text-red-500 p-4">Fatal Error: UI elements missing. Cannot initialize calculator.</p>';
         return; // Stop execution
     }
 
     // Initial state for elements we know exist
-    itemSelect.innerHTML = '<option value="">Loading data...</option>'; // Initial loading message
-    itemSelect.disabled = true; // Disable select until data loads
+    itemSearchInput.placeholder = 'Loading data...'; // Initial loading message
+    itemSearchInput.disabled = true; // Disable search until data loads
 
-    // Fetch data
+    // Fetch data: the compiled bundle is all the calculator needs and the search index makes the picker
+    // usable; descriptions and images follow later
     Promise.all([
-        fetch('recipes.json')
+        fetch('recipes.bundle.json')
            .then(res => {
-                if (!res.ok) throw new Error(`recipes.json: ${res.statusText} (${res.status})`);
+                if (!res.ok) throw new Error(`recipes.bundle.json: ${res.statusText} (${res.status})`);
                 return res.json();
             }),
-        fetch('raw_materials.json')
+        fetch('search_index.json')
            .then(res => {
-                if (!res.ok) throw new Error(`raw_materials.json: ${res.statusText} (${res.status})`);
+                if (!res.ok) throw new Error(`search_index.json: ${res.statusText} (${res.status})`);
                 return res.json();
             })
+           .catch(error => {
+                console.warn('Could not load search index, searching without it:', error);
+                return null;
+            })
     ])
-    .then(([recipeJson, rawMaterialList]) => {
+    .then(([bundle, searchIndex]) => {
         console.log("Data fetch successful");
-        window.recipesData = recipeJson;
-        window.rawMaterialsSet = new Set(rawMaterialList);
-
-        // Prepare metadata for dropdown
-        window.recipeMeta = Object.entries(recipeJson).map(([name, data]) => ({
-            name: name,
-            image_path: data.local_image_path,
-            description: data.description
-        })).sort((a, b) => a.name.localeCompare(b.name));
-
-        // Populate dropdown
-        itemSelect.innerHTML = '<option value="">-- Select Item --</option>'; 
-        window.recipeMeta.forEach(recipe => {
-            const option = document.createElement('option');
-            option.value = recipe.name;
-            option.textContent = recipe.name;
-            itemSelect.appendChild(option);
-        });
-        
-        // Enable item select now that it's populated
-        itemSelect.disabled = false;
+        window.recipeBundle = bundle;
+        if (searchIndex && searchIndex.build_id !== bundle.build_id) {
+            console.warn("search_index.json does not match recipes.bundle.json; searching without it.");
+            searchIndex = null;
+        }
+        window.searchIndex = searchIndex;
+
+        // Enable the item search now that it can answer
+        itemSearchInput.placeholder = `Search ${bundle.recipe_count} items...`;
+        itemSearchInput.disabled = false;
+        attachItemSearchListeners();
 
         // --- Defer button selection and listener attachment --- 
         setTimeout(() => {
@@ -442,14 +628,16 @@ document.addEventListener('DOMContentLoaded', () => {
         renderTotalMaterials();
         console.log("Initial render complete.");
 
+        loadRecipeMeta(bundle);
+        loadSpriteIndex();
     })
     .catch(error => {
         console.error('Error loading data files:', error);
         const errorTarget = addErrorMsg || listErrorMsg || document.body;
         errorTarget.textContent = `Fatal Error loading data: ${error.message}. Please refresh.`;
         errorTarget.classList.remove('h-4'); 
-        itemSelect.innerHTML = '<option value="">Error</option>';
-        itemSelect.disabled = true;
+        itemSearchInput.placeholder = 'Error';
+        itemSearchInput.disabled = true;
         // Attempt to disable button if it exists, even on error
         const addToListButton = document.getElementById('add-to-list-button');
         if (addToListButton) addToListButton.disabled = true;